@@ -0,0 +1,135 @@
+"""
+Compares ways of finding an Astir character's moves in their BY5:ES200 move tables, for a multiclassed sheet.
+Run from the repository root with "python -m benchmarks.astir_moves".
+
+The move data isn't part of the repository, so a similarly sized set of made up moves is used instead.
+"""
+
+import random
+import string
+import timeit
+
+from src.astir.AstirMove import AstirMove
+from src.astir.utils import MoveIndex, load_moves
+from src.utils.sheet_grid import SheetGrid, normalise
+
+NUM_PLAYBOOKS = 17
+NUM_MOVES_PER_PLAYBOOK = 20
+NUM_ROWS = 196
+NUM_COLUMNS = 72 # BY5:ES200
+NUM_PLAYBOOKS_ON_SHEET = 3 # Their own, and two they've multiclassed into
+NUM_REPEATS = 20
+
+WORDS = [
+    'iron', 'storm', 'veil', 'hollow', 'star', 'oath', 'ember', 'gravity', 'shard', 'tide', 'lance', 'echo', 'bastion',
+    'wake', 'thorn', 'glass', 'signal', 'drift', 'crown', 'ash', 'field', 'scout', 'witness', 'anchor', 'spark',
+]
+
+def make_moves():
+    random.seed(0)
+
+    all_moves = {}
+
+    for playbook_number in range(NUM_PLAYBOOKS):
+        playbook = f'playbook {playbook_number}'
+
+        all_moves[playbook] = {}
+
+        while len(all_moves[playbook]) < NUM_MOVES_PER_PLAYBOOK:
+            move_name = ' '.join(random.choice(WORDS).title() for _ in range(random.randint(1, 3)))
+
+            all_moves[playbook][move_name.lower()] = AstirMove(
+                name=move_name,
+                description_template=string.Template(f'When you {move_name.lower()}, roll +Defy.'),
+                playbook=playbook
+            )
+
+    return all_moves
+
+def make_rows(all_moves):
+    random.seed(1)
+
+    playbooks_on_sheet = list(all_moves.values())[:NUM_PLAYBOOKS_ON_SHEET]
+    move_names = [move.name for playbook_moves in playbooks_on_sheet for move in playbook_moves.values()]
+    other_move_names = [move.name for playbook_moves in all_moves.values() for move in playbook_moves.values()]
+
+    rows = []
+    for _ in range(NUM_ROWS):
+        row = []
+
+        for _ in range(NUM_COLUMNS):
+            kind = random.random()
+
+            if kind < 0.02:
+                row.append(random.choice(move_names))
+            elif kind < 0.03:
+                row.append(f'{random.choice(move_names)} (Multiclass)')
+            elif kind < 0.08:
+                row.append(f'When you use {random.choice(other_move_names)}, take +1 forward and mark a danger. ' * 2)
+            elif kind < 0.4:
+                row.append(random.choice(['TRUE', 'FALSE']))
+            elif kind < 0.5:
+                row.append(str(random.randint(-3, 3)))
+            else:
+                row.append('')
+
+        rows.append(row)
+
+    return rows
+
+def scan_every_move(rows, all_moves):
+    # Before SheetGrid: every move lowercased every cell again
+    found = {}
+
+    for playbook, playbook_moves in all_moves.items():
+        for move_name, move in playbook_moves.items():
+            if any(normalise(cell) == normalise(move_name) for row in rows for cell in row):
+                found[move_name] = move
+
+    return found
+
+def search_every_move(grid, all_moves):
+    # Normalised grid, but still a search per move
+    found = {}
+
+    for playbook, playbook_moves in all_moves.items():
+        for move_name, move in playbook_moves.items():
+            if grid.contains_value(move_name):
+                found[move_name] = move
+
+    return found
+
+def main():
+    all_moves = make_moves()
+    rows = make_rows(all_moves)
+
+    load_moves.all_moves = all_moves # Stands in for the data files
+
+    move_index = MoveIndex(all_moves)
+
+    exact_moves = search_every_move(SheetGrid(rows), all_moves)
+    indexed_moves = move_index.find_moves(SheetGrid(rows))
+
+    print(f'{sum(len(playbook_moves) for playbook_moves in all_moves.values())} moves, {NUM_ROWS}x{NUM_COLUMNS} cells')
+    print(f'Exact matches found: {len(exact_moves)}, indexed found: {len(indexed_moves)} (includes names embedded in short cells)')
+
+    if not set(exact_moves).issubset(indexed_moves):
+        raise ValueError('Index missed moves that the per move search found.')
+
+    warm_grid = SheetGrid(rows)
+    warm_grid.normalised_values # As when the cache hands back the same grid
+
+    timings = {
+        'Scan every cell per move': timeit.timeit(lambda: scan_every_move(rows, all_moves), number=1),
+        'Search per move (fresh grid)': timeit.timeit(lambda: search_every_move(SheetGrid(rows), all_moves), number=NUM_REPEATS) / NUM_REPEATS,
+        'Search per move (cached grid)': timeit.timeit(lambda: search_every_move(warm_grid, all_moves), number=NUM_REPEATS) / NUM_REPEATS,
+        'Index (fresh grid)': timeit.timeit(lambda: move_index.find_moves(SheetGrid(rows)), number=NUM_REPEATS) / NUM_REPEATS,
+        'Index (cached grid)': timeit.timeit(lambda: move_index.find_moves(warm_grid), number=NUM_REPEATS) / NUM_REPEATS,
+        'Building the index': timeit.timeit(lambda: MoveIndex(all_moves), number=NUM_REPEATS) / NUM_REPEATS,
+    }
+
+    for name, seconds in timings.items():
+        print(f'{name:<32}{seconds * 1000:>10.3f}ms')
+
+if __name__ == '__main__':
+    main()
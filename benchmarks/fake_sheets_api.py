@@ -0,0 +1,457 @@
+"""
+A stand-in for the parts of the Sheets API the bots use - spreadsheet metadata, values/{range} and values:batchGet - so
+benchmarks and load tests can run offline. Point the bots at it by setting SHEETS_API_URL, e.g.
+
+    python -m benchmarks.fake_sheets_api --port 8765 --latency 0.08 --jitter 0.04 --rate-limit 0.02
+    SHEETS_API_URL=http://localhost:8765/v4/spreadsheets python -m src.run_vermissian
+
+Spreadsheet IDs pick what gets served: "spire", "heart", "astir", "die" or "bloodheist" for a tracker with a handful of
+generated characters, "<game>-<n>" for one with n of them (e.g. "spire-500"), or the ID of any tracker recorded with
+--record / loaded from --recordings.
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import os
+import random
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+from src.utils.sheet_references import CellRef, RangeRef, to_reference, column_offset_to_column_name
+from src.vermissian.ResistanceCharacterSheet import SpireCharacter, HeartCharacter
+from src.astir.AstirCharacterSheet import AstirCharacter, AstirTrait
+from src.overcharge.DieCharacter import DieCharacter
+from src.bloodheist.BloodheistCharacterSheet import BloodheistCharacterSheet
+
+API_PREFIX = '/v4/spreadsheets'
+
+DEFAULT_NUM_CHARACTERS = 4
+
+GENERATED_TRACKER_PATTERN = re.compile('(spire|heart|astir|die|bloodheist)(?:-([0-9]+))?')
+
+ASTIR_MOVES = ['Sharpshooter', 'Read the Room', 'Field Scout', 'Arcane Augments', 'Stand Fast', 'Second Wind']
+
+Cells = Dict[Tuple[int, int], Any] # (zero-based column, one-based row) -> typed value
+
+@dataclasses.dataclass
+class FakeSheet:
+    gid: int
+    title: str
+    cells: Cells = dataclasses.field(default_factory=dict)
+
+    def set(self, reference: str, value: Any):
+        cell = to_reference(reference)
+
+        self.cells[(cell.column, cell.row)] = value
+
+    def get_rows(self, range_or_cell: str) -> List[List[Any]]:
+        """
+        The range as the API gives it back: rows with trailing blanks trimmed, and trailing empty rows dropped.
+        """
+
+        reference = to_reference(range_or_cell)
+
+        if isinstance(reference, CellRef):
+            reference = RangeRef.from_offsets(reference.column, reference.row, reference.column, reference.row)
+
+        rows = []
+        for row in range(reference.min_row, reference.max_row + 1):
+            row_values = [self.cells.get((column, row), '') for column in range(reference.min_column, reference.max_column + 1)]
+
+            while len(row_values) and row_values[-1] == '':
+                row_values.pop()
+
+            rows.append(row_values)
+
+        while len(rows) and len(rows[-1]) == 0:
+            rows.pop()
+
+        return rows
+
+@dataclasses.dataclass
+class FakeSpreadsheet:
+    spreadsheet_id: str
+    sheets: List[FakeSheet] = dataclasses.field(default_factory=list)
+
+    def add_sheet(self, title: str) -> FakeSheet:
+        sheet = FakeSheet(gid=len(self.sheets) * 1000, title=title)
+
+        self.sheets.append(sheet)
+
+        return sheet
+
+    def get_sheet(self, title: str) -> Optional[FakeSheet]:
+        for sheet in self.sheets:
+            if sheet.title == title:
+                return sheet
+
+        return None
+
+    def to_json(self) -> Dict:
+        return {
+            'spreadsheet_id': self.spreadsheet_id,
+            'sheets': [
+                {
+                    'sheetId': sheet.gid,
+                    'title': sheet.title,
+                    'values': sheet.get_rows(f'A1:{column_offset_to_column_name(max((column for column, _ in sheet.cells), default=0))}{max((row for _, row in sheet.cells), default=1)}')
+                } for sheet in self.sheets
+            ]
+        }
+
+    @classmethod
+    def from_json(cls, spreadsheet_json: Dict) -> 'FakeSpreadsheet':
+        spreadsheet = cls(spreadsheet_json['spreadsheet_id'])
+
+        for sheet_json in spreadsheet_json['sheets']:
+            sheet = FakeSheet(gid=sheet_json['sheetId'], title=sheet_json['title'])
+
+            for row_index, row in enumerate(sheet_json.get('values', [])):
+                for column, value in enumerate(row):
+                    if value != '':
+                        sheet.cells[(column, row_index + 1)] = value
+
+            spreadsheet.sheets.append(sheet)
+
+        return spreadsheet
+
+def _add_biography(sheet: FakeSheet, character_cls, character_number: int):
+    sheet.set(character_cls.CELL_REFERENCES['name_label'], character_cls.EXPECTED_NAME_LABEL)
+    sheet.set(character_cls.CELL_REFERENCES['biography']['discord_username'], f'player{character_number}')
+    sheet.set(character_cls.CELL_REFERENCES['biography']['character_name'], f'Character {character_number}')
+
+def _add_resistance_character(sheet: FakeSheet, character_cls, character_number: int, rng: random.Random):
+    _add_biography(sheet, character_cls, character_number)
+
+    for reference in list(character_cls.CELL_REFERENCES['skills'].values()) + list(character_cls.CELL_REFERENCES['domains'].values()):
+        sheet.set(reference, rng.random() < 0.3)
+
+    for resistance_references in character_cls.CELL_REFERENCES['stress'].values():
+        sheet.set(resistance_references['fallout'], rng.randint(0, 9))
+
+def _add_astir_character(sheet: FakeSheet, character_number: int, rng: random.Random):
+    _add_biography(sheet, AstirCharacter, character_number)
+
+    playbook = rng.choice(['Arcanist', 'Captain', 'Witch', 'Scout'])
+
+    sheet.set(AstirCharacter.CELL_REFERENCES['playbook_name'], playbook)
+
+    for trait, reference in AstirCharacter.CELL_REFERENCES['traits'].items():
+        if reference.sheet_name is None:
+            sheet.set(reference, rng.randint(-1, 2))
+            sheet.set(AstirCharacter.get_trait_label_reference(reference), trait.value)
+
+    for move_number, move_name in enumerate(rng.sample(ASTIR_MOVES, 3)):
+        sheet.set(CellRef.from_offsets(to_reference('BY5').column + move_number * 30, 5), move_name)
+
+    for danger_row in range(rng.randint(0, 3)):
+        sheet.set(f'C{21 + danger_row}', 'Some danger')
+
+def _add_die_character(sheet: FakeSheet, character_number: int, rng: random.Random):
+    _add_biography(sheet, DieCharacter, character_number)
+
+    for reference in DieCharacter.CELL_REFERENCES['stats'].values():
+        sheet.set(reference, rng.randint(0, 12))
+
+def _add_bloodheist_character(sheet: FakeSheet, character_number: int, rng: random.Random):
+    _add_biography(sheet, BloodheistCharacterSheet, character_number)
+
+    doom = rng.randint(0, 6)
+
+    for doom_number, reference in BloodheistCharacterSheet.CELL_REFERENCES['doom'].items():
+        sheet.set(reference, doom_number == doom)
+
+def generate_tracker(spreadsheet_id: str, game: str, num_characters: int, seed: int = 0) -> FakeSpreadsheet:
+    """
+    A tracker with a cover tab (and for Astir, the shared Cause / Factions tab) followed by the given number of characters.
+    """
+
+    rng = random.Random(seed)
+
+    spreadsheet = FakeSpreadsheet(spreadsheet_id)
+
+    spreadsheet.add_sheet('Cover').set('A1', f'{game.title()} Tracker')
+
+    if game == 'astir':
+        factions_sheet = spreadsheet.add_sheet('Cause / Factions')
+
+        crew_reference = AstirCharacter.CELL_REFERENCES['traits'][AstirTrait.CREW].local
+
+        factions_sheet.set(crew_reference, 1)
+        factions_sheet.set(AstirCharacter.get_trait_label_reference(crew_reference), AstirTrait.CREW.value)
+
+    for character_number in range(1, num_characters + 1):
+        sheet = spreadsheet.add_sheet(f'Character {character_number}')
+
+        if game == 'spire':
+            _add_resistance_character(sheet, SpireCharacter, character_number, rng)
+        elif game == 'heart':
+            _add_resistance_character(sheet, HeartCharacter, character_number, rng)
+        elif game == 'astir':
+            _add_astir_character(sheet, character_number, rng)
+        elif game == 'die':
+            _add_die_character(sheet, character_number, rng)
+        elif game == 'bloodheist':
+            _add_bloodheist_character(sheet, character_number, rng)
+        else:
+            raise ValueError(f'Unknown game: "{game}"')
+
+    return spreadsheet
+
+def _format_value(value: Any) -> Any:
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    elif isinstance(value, (int, float)):
+        return str(value)
+
+    return value
+
+@dataclasses.dataclass
+class FaultConfig:
+    latency: float = 0 # Seconds added to every response
+    jitter: float = 0 # Up to this many more seconds, chosen uniformly
+    slow: float = 0 # Chance of a response being held up by slow_latency on top, for a long tail
+    slow_latency: float = 0
+    rate_limit: float = 0 # Chance of a 429
+    forbidden: float = 0 # Chance of a 403, on top of any spreadsheets that are always forbidden
+    retry_after: Optional[float] = None # Sent with 429s if set
+    forbidden_spreadsheet_ids: Tuple[str, ...] = ()
+
+class FakeSheetsApi:
+    def __init__(self, faults: Optional[FaultConfig] = None, seed: int = 0):
+        self.faults = faults if faults is not None else FaultConfig()
+
+        self.random = random.Random(seed)
+
+        self.spreadsheets: Dict[str, FakeSpreadsheet] = {}
+
+        self.stats = {
+            'requests': 0,
+            'ranges': 0,
+            'rate_limited': 0,
+            'forbidden': 0,
+        }
+
+    def add_spreadsheet(self, spreadsheet: FakeSpreadsheet):
+        self.spreadsheets[spreadsheet.spreadsheet_id] = spreadsheet
+
+    def load_recordings(self, dirpath: str):
+        for filename in os.listdir(dirpath):
+            if filename.endswith('.json'):
+                with open(os.path.join(dirpath, filename), 'r', encoding='utf-8') as f:
+                    self.add_spreadsheet(FakeSpreadsheet.from_json(json.load(f)))
+
+    def get_spreadsheet(self, spreadsheet_id: str) -> Optional[FakeSpreadsheet]:
+        if spreadsheet_id not in self.spreadsheets:
+            match = GENERATED_TRACKER_PATTERN.fullmatch(spreadsheet_id)
+
+            if match is None:
+                return None
+
+            num_characters = int(match.group(2)) if match.group(2) is not None else DEFAULT_NUM_CHARACTERS
+
+            self.add_spreadsheet(generate_tracker(spreadsheet_id, match.group(1), num_characters))
+
+        return self.spreadsheets[spreadsheet_id]
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+
+        app.router.add_get(API_PREFIX + '/{spreadsheet_id}/values:batchGet', self.handle_batch_get)
+        app.router.add_get(API_PREFIX + '/{spreadsheet_id}/values/{range:.+}', self.handle_get)
+        app.router.add_get(API_PREFIX + '/{spreadsheet_id}', self.handle_metadata)
+
+        return app
+
+    @staticmethod
+    def _error(status: int, status_name: str, message: str, headers: Optional[Dict[str, str]] = None) -> web.Response:
+        return web.json_response({'error': {'code': status, 'message': message, 'status': status_name}}, status=status, headers=headers)
+
+    async def _prepare(self, request: web.Request) -> Tuple[Optional[FakeSpreadsheet], Optional[web.Response]]:
+        """
+        Applies the configured latency and faults, then finds the spreadsheet - or the error response to send instead.
+        """
+
+        self.stats['requests'] += 1
+
+        delay = self.faults.latency + self.random.uniform(0, self.faults.jitter)
+
+        if self.random.random() < self.faults.slow:
+            delay += self.faults.slow_latency
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        spreadsheet_id = request.match_info['spreadsheet_id']
+
+        if 'key' not in request.query:
+            return None, self._error(403, 'PERMISSION_DENIED', 'The request is missing a valid API key.')
+
+        if self.random.random() < self.faults.rate_limit:
+            self.stats['rate_limited'] += 1
+
+            headers = {'Retry-After': str(self.faults.retry_after)} if self.faults.retry_after is not None else None
+
+            return None, self._error(429, 'RESOURCE_EXHAUSTED', 'Quota exceeded.', headers=headers)
+
+        if spreadsheet_id in self.faults.forbidden_spreadsheet_ids or self.random.random() < self.faults.forbidden:
+            self.stats['forbidden'] += 1
+
+            return None, self._error(403, 'PERMISSION_DENIED', 'The caller does not have permission')
+
+        spreadsheet = self.get_spreadsheet(spreadsheet_id)
+
+        if spreadsheet is None:
+            return None, self._error(404, 'NOT_FOUND', 'Requested entity was not found.')
+
+        return spreadsheet, None
+
+    def _get_value_range(self, spreadsheet: FakeSpreadsheet, requested_range: str, formatted: bool) -> Dict:
+        self.stats['ranges'] += 1
+
+        sheet_name, range_or_cell = requested_range.rsplit('!', 1)
+
+        sheet = spreadsheet.get_sheet(sheet_name)
+
+        if sheet is None:
+            raise web.HTTPBadRequest(text=json.dumps({'error': {'code': 400, 'message': f'Unable to parse range: {requested_range}', 'status': 'INVALID_ARGUMENT'}}), content_type='application/json')
+
+        rows = sheet.get_rows(range_or_cell)
+
+        value_range = {
+            'range': f"'{sheet_name}'!{range_or_cell}",
+            'majorDimension': 'ROWS',
+        }
+
+        if len(rows):
+            value_range['values'] = [[_format_value(value) for value in row] for row in rows] if formatted else rows
+
+        return value_range
+
+    @staticmethod
+    def _apply_fields(response_json: Dict, fields: Optional[str]) -> Dict:
+        if fields == 'values':
+            return {key: value for key, value in response_json.items() if key == 'values'}
+        elif fields == 'valueRanges(values)':
+            return {
+                'valueRanges': [{key: value for key, value in value_range.items() if key == 'values'} for value_range in response_json['valueRanges']]
+            }
+
+        return response_json
+
+    async def handle_get(self, request: web.Request) -> web.Response:
+        spreadsheet, error_response = await self._prepare(request)
+
+        if error_response is not None:
+            return error_response
+
+        formatted = request.query.get('valueRenderOption', 'FORMATTED_VALUE') == 'FORMATTED_VALUE'
+
+        value_range = self._get_value_range(spreadsheet, request.match_info['range'], formatted)
+
+        return web.json_response(self._apply_fields(value_range, request.query.get('fields')))
+
+    async def handle_batch_get(self, request: web.Request) -> web.Response:
+        spreadsheet, error_response = await self._prepare(request)
+
+        if error_response is not None:
+            return error_response
+
+        formatted = request.query.get('valueRenderOption', 'FORMATTED_VALUE') == 'FORMATTED_VALUE'
+
+        response_json = {
+            'spreadsheetId': spreadsheet.spreadsheet_id,
+            'valueRanges': [self._get_value_range(spreadsheet, requested_range, formatted) for requested_range in request.query.getall('ranges', [])]
+        }
+
+        return web.json_response(self._apply_fields(response_json, request.query.get('fields')))
+
+    async def handle_metadata(self, request: web.Request) -> web.Response:
+        spreadsheet, error_response = await self._prepare(request)
+
+        if error_response is not None:
+            return error_response
+
+        return web.json_response({
+            'sheets': [{'properties': {'sheetId': sheet.gid, 'title': sheet.title}} for sheet in spreadsheet.sheets]
+        })
+
+def record_tracker(spreadsheet_id: str, filepath: str, range_or_cell: str = 'A1:ES300'):
+    """
+    Saves a real tracker through the normal Sheets client, so it can be served back later with --recordings.
+    """
+
+    from src.utils.google_sheets import get_spreadsheet_metadata, get_from_spreadsheet_api
+    from src.utils.sheets_requests import ValueRenderOption
+
+    metadata = get_spreadsheet_metadata(spreadsheet_id)
+
+    values = get_from_spreadsheet_api(
+        spreadsheet_id,
+        {sheet_name: range_or_cell for sheet_name in metadata.values()},
+        value_render_option=ValueRenderOption.UNFORMATTED_VALUE
+    )
+
+    spreadsheet_json = {
+        'spreadsheet_id': spreadsheet_id,
+        'sheets': [
+            {
+                'sheetId': gid,
+                'title': sheet_name,
+                'values': [['' if value is None else value for value in row] for row in (values[sheet_name][range_or_cell] or [])]
+            } for gid, sheet_name in metadata.items()
+        ]
+    }
+
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(spreadsheet_json, f, indent=4)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0, help='Seconds added to every response.')
+    parser.add_argument('--jitter', type=float, default=0, help='Up to this many more seconds added at random.')
+    parser.add_argument('--slow', type=float, default=0, help='Chance of a response taking --slow-latency longer.')
+    parser.add_argument('--slow-latency', type=float, default=0, help='Seconds added to slow responses.')
+    parser.add_argument('--rate-limit', type=float, default=0, help='Chance of responding with a 429.')
+    parser.add_argument('--retry-after', type=float, default=None, help='Retry-After to send with 429s.')
+    parser.add_argument('--forbidden', type=float, default=0, help='Chance of responding with a 403.')
+    parser.add_argument('--forbid', nargs='*', default=[], help='Spreadsheet IDs to always respond to with a 403.')
+    parser.add_argument('--recordings', default=None, help='Directory of recorded trackers to serve.')
+    parser.add_argument('--record', nargs=2, metavar=('SPREADSHEET_ID', 'FILEPATH'), help='Record a real tracker, then exit.')
+    parser.add_argument('--seed', type=int, default=0)
+
+    args = parser.parse_args()
+
+    if args.record is not None:
+        record_tracker(*args.record)
+
+        return
+
+    api = FakeSheetsApi(
+        FaultConfig(
+            latency=args.latency,
+            jitter=args.jitter,
+            slow=args.slow,
+            slow_latency=args.slow_latency,
+            rate_limit=args.rate_limit,
+            forbidden=args.forbidden,
+            retry_after=args.retry_after,
+            forbidden_spreadsheet_ids=tuple(args.forbid),
+        ),
+        seed=args.seed
+    )
+
+    if args.recordings is not None:
+        api.load_recordings(args.recordings)
+
+    web.run_app(api.make_app(), host=args.host, port=args.port)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Runs concurrent character reads against benchmarks/fake_sheets_api.py in-process, and reports latencies and how many
+calls actually reached the API. Run from the repository root with "python -m benchmarks.sheets_load --help".
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from unittest import mock
+
+from aiohttp import web
+
+from benchmarks.fake_sheets_api import FakeSheetsApi, FaultConfig, API_PREFIX
+from src.utils.deadline import command_deadline
+from src.utils.google_sheets import get_from_spreadsheet_api_async
+from src.utils.sheets_hedging import HedgingPolicy, configure_hedging, get_hedging_policy
+from src.utils.sheets_requests import SHEETS_API_URL_VARIABLE
+from src.utils.sheets_scheduler import SheetsScheduler, QUOTAS, get_scheduler
+from src.utils.sheets_session import close_sessions
+from src.vermissian.ResistanceCharacterSheet import SpireCharacter
+
+async def run(args: argparse.Namespace):
+    api = FakeSheetsApi(FaultConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        slow=args.slow,
+        slow_latency=args.slow_latency,
+        rate_limit=args.rate_limit,
+        retry_after=0
+    ))
+
+    get_scheduler.scheduler = SheetsScheduler.from_quotas({quota: args.quota for quota in QUOTAS})
+
+    configure_hedging(HedgingPolicy() if args.hedge else None)
+
+    runner = web.AppRunner(api.make_app())
+    await runner.setup()
+
+    site = web.TCPSite(runner, 'localhost', 0)
+    await site.start()
+
+    os.environ[SHEETS_API_URL_VARIABLE] = f'http://localhost:{runner.addresses[0][1]}{API_PREFIX}'
+
+    spreadsheet_id = f'spire-{args.characters}'
+
+    references = [
+        SpireCharacter.CELL_REFERENCES['skills']['Compel'],
+        SpireCharacter.CELL_REFERENCES['domains']['Academia'],
+        SpireCharacter.CELL_REFERENCES['stress']['Total']['fallout'],
+    ]
+
+    latencies = []
+
+    async def read(character_number: int):
+        start_time = time.perf_counter()
+
+        with command_deadline(): # As if it were a roll
+            await get_from_spreadsheet_api_async(spreadsheet_id, {f'Character {character_number}': references}, cache_ttl=args.cache_ttl)
+
+        latencies.append(time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+
+    for _ in range(args.rounds):
+        await asyncio.gather(*[read(character_number % args.characters + 1) for character_number in range(args.concurrency)])
+
+    elapsed = time.perf_counter() - start_time
+
+    await close_sessions()
+    await runner.cleanup()
+
+    latencies.sort()
+
+    print(f'Reads: {len(latencies)} in {elapsed:.2f}s')
+    print(f'p50: {statistics.median(latencies) * 1000:.1f}ms, p95: {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms, p99: {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}ms, max: {latencies[-1] * 1000:.1f}ms')
+    print(f'API: {api.stats}')
+
+    if get_hedging_policy() is not None:
+        print(f'Hedging: {get_hedging_policy().get_stats()}')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+
+    parser.add_argument('--characters', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.08)
+    parser.add_argument('--jitter', type=float, default=0.04)
+    parser.add_argument('--slow', type=float, default=0, help='Chance of a response taking --slow-latency longer.')
+    parser.add_argument('--slow-latency', type=float, default=0.5)
+    parser.add_argument('--rate-limit', type=float, default=0)
+    parser.add_argument('--quota', type=float, default=6000, help='Reads per minute the fake API is treated as allowing.')
+    parser.add_argument('--hedge', action='store_true', help='Hedge reads slower than their spreadsheet\'s p95.')
+    parser.add_argument('--cache-ttl', type=float, default=None)
+
+    args = parser.parse_args()
+
+    with mock.patch('src.utils.google_sheets.get_key', return_value='fake-key'):
+        asyncio.run(run(args))
+
+if __name__ == '__main__':
+    main()
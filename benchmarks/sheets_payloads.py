@@ -0,0 +1,84 @@
+"""
+Compares the Sheets payloads the bot used to get against the trimmed ones it asks for now, for a character sheet sized grid.
+Run from the repository root with "python -m benchmarks.sheets_payloads".
+"""
+
+import json
+import random
+import timeit
+
+from src.utils.sheets_requests import build_values_requests, ValueRenderOption
+
+NUM_ROWS = 200
+NUM_COLUMNS = 72 # BY5:ES204, about what the Astir move tables cover
+NUM_REPEATS = 200
+
+def make_grid(typed: bool):
+    random.seed(0)
+
+    rows = []
+    for _ in range(NUM_ROWS):
+        row = []
+
+        for _ in range(NUM_COLUMNS):
+            kind = random.random()
+
+            if kind < 0.4:
+                row.append(random.random() < 0.5 if typed else random.choice(['TRUE', 'FALSE']))
+            elif kind < 0.7:
+                number = random.randint(-3, 6)
+                row.append(number if typed else str(number))
+            elif kind < 0.85:
+                row.append('Some move or other')
+            else:
+                row.append('')
+
+        rows.append(row)
+
+    return rows
+
+def main():
+    formatted_payload = json.dumps({
+        'range': "'Example Character Sheet'!BY5:ES204",
+        'majorDimension': 'ROWS',
+        'values': make_grid(typed=False)
+    })
+
+    trimmed_payload = json.dumps({
+        'values': make_grid(typed=True)
+    })
+
+    formatted_request = build_values_requests('spreadsheet id', 'key', [('Example Character Sheet', 'BY5:ES204')])[0]
+    trimmed_request = build_values_requests(
+        'spreadsheet id', 'key', [('Example Character Sheet', 'BY5:ES204')], value_render_option=ValueRenderOption.UNFORMATTED_VALUE
+    )[0]
+
+    def munge(cell: str):
+        # What callers had to do to formatted cells to get the same values out
+        if cell in ('TRUE', 'FALSE'):
+            return cell == 'TRUE'
+        elif cell.replace('–', '-').lstrip('-').isdigit():
+            return int(cell.replace('–', '-'))
+        elif cell == '':
+            return None
+
+        return cell
+
+    def parse_formatted():
+        grid = formatted_request.parse_response(json.loads(formatted_payload))['Example Character Sheet']['BY5:ES204']
+
+        return [[munge(cell) for cell in row] for row in grid]
+
+    def parse_trimmed():
+        return trimmed_request.parse_response(json.loads(trimmed_payload))['Example Character Sheet']['BY5:ES204']
+
+    formatted_time = timeit.timeit(parse_formatted, number=NUM_REPEATS) / NUM_REPEATS
+    trimmed_time = timeit.timeit(parse_trimmed, number=NUM_REPEATS) / NUM_REPEATS
+
+    print(f'{"":<12}{"Bytes":>12}{"Parse (ms)":>14}')
+    print(f'{"Formatted":<12}{len(formatted_payload):>12}{formatted_time * 1000:>14.3f}')
+    print(f'{"Trimmed":<12}{len(trimmed_payload):>12}{trimmed_time * 1000:>14.3f}')
+    print(f'Payload is {100 * (1 - len(trimmed_payload) / len(formatted_payload)):.1f}% smaller.')
+
+if __name__ == '__main__':
+    main()
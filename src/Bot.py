@@ -5,6 +5,14 @@ from typing import Dict
 
 from src.Game import Game
 from src.utils.logger import get_logger
+from src.utils.google_sheets import get_coalescing_stats
+from src.utils.sheets_session import close_sessions, get_pool_stats
+from src.utils.sheets_scheduler import get_scheduler
+from src.utils.sheets_metadata import get_metadata_store
+from src.utils.sheets_budget import get_usage_metrics
+from src.utils.sheets_breaker import get_spreadsheet_breaker
+from src.utils.sheets_keys import get_key_pool
+from src.utils.sheets_hedging import get_hedging_policy
 
 class Bot(discord.Bot, abc.ABC):
 
@@ -25,3 +33,21 @@ class Bot(discord.Bot, abc.ABC):
             del self.games[guild_id]
         else:
             self.logger.warning(f'Asked to remove game with guild ID {guild_id}, but no game by that ID exists.')
+
+    async def close(self):
+        self.logger.info(f'Sheets connection pool stats: {get_pool_stats()}')
+        self.logger.info(f'Sheets request coalescing stats: {get_coalescing_stats()}')
+        self.logger.info(f'Sheets quota scheduler stats: {get_scheduler().get_stats()}')
+        self.logger.info(f'Spreadsheet metadata store stats: {get_metadata_store().get_stats()}')
+        self.logger.info(f'Sheets usage per command: {get_usage_metrics()}')
+        self.logger.info(f'Spreadsheet circuit breaker stats: {get_spreadsheet_breaker().get_stats()}')
+
+        if get_key_pool() is not None:
+            self.logger.info(f'Sheets API key stats: {get_key_pool().get_stats()}')
+
+        if get_hedging_policy() is not None:
+            self.logger.info(f'Sheets hedging stats: {get_hedging_policy().get_stats()}')
+
+        await close_sessions()
+
+        await super().close()
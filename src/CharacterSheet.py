@@ -1,18 +1,45 @@
 import abc
-from typing import List, Dict, Tuple, Optional
+import asyncio
+import collections
+from typing import List, Dict, Tuple, Optional, Union, Any
 
-from src.utils.google_sheets import get_from_spreadsheet_api
+from src.utils.exceptions import BotError
+from src.utils.logger import get_logger
+from src.utils.google_sheets import get_from_spreadsheet_api, get_from_spreadsheet_api_async
+from src.utils.sheet_references import CellRef, RangeRef, get_bounding_box, parse_cell_references, flatten_cell_references
+from src.utils.sheets_cache import get_sheets_cache
+from src.utils.sheets_breaker import get_spreadsheet_breaker
+from src.utils.sheets_requests import ValueRenderOption
+from src.utils.sheet_snapshot import SheetSnapshot
+from src.utils.shared_tabs import SharedTabCache
 
 class CharacterSheet(abc.ABC):
     EXPECTED_NAME_LABEL = 'Player Name (Pronouns)'
 
     CELL_REFERENCES = {}
 
+    CACHE_TTL = 30 # Seconds to reuse cell values read during commands for before querying the sheet again
+
+    SNAPSHOT_MODE = False # If set, reads the whole area covered by CELL_REFERENCES in one go and serves getters from that
+
+    INITIAL_FIELDS: List[str] = [] # Further CELL_REFERENCES keys read alongside the names on creation, and passed to the constructor
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        # Parsed once here, so that nothing reading cells has to parse references again
+        if 'CELL_REFERENCES' in cls.__dict__:
+            cls.CELL_REFERENCES = parse_cell_references(cls.CELL_REFERENCES)
+
     def __init__(self, spreadsheet_id: str, sheet_name: str, sheet_gid: Optional[int] = None, character_name: Optional[str] = None, discord_username: Optional[str] = None, query: bool = True):
         self.spreadsheet_id = spreadsheet_id
         self.sheet_name = sheet_name
         self.sheet_gid = sheet_gid
 
+        self.snapshots: Dict[ValueRenderOption, SheetSnapshot] = {}
+
+        self.shared_tabs: Optional[SharedTabCache] = None # Set by games with tabs all their characters read from
+
         if query and (character_name is None or discord_username is None):
             live_character_name, live_discord_username = self.initialise()
 
@@ -26,14 +53,15 @@ class CharacterSheet(abc.ABC):
         self.discord_username = discord_username_to_use
 
     def initialise(self) -> Tuple[Optional[str], Optional[str]]:
+        breaker = get_spreadsheet_breaker()
+
+        if breaker.is_known_non_character_tab(self.spreadsheet_id, self.sheet_name):
+            raise ValueError(f'"{self.sheet_name}" is not a character sheet - it does not have a "{self.EXPECTED_NAME_LABEL}" field at {self.CELL_REFERENCES["name_label"]}.')
+
         raw_sheet_data = get_from_spreadsheet_api(
             spreadsheet_id=self.spreadsheet_id,
             raw_sheet_name_data={
-                self.sheet_name: [
-                    self.CELL_REFERENCES['name_label'],
-                    self.CELL_REFERENCES['biography']['discord_username'],
-                    self.CELL_REFERENCES['biography']['character_name']
-                ]
+                self.sheet_name: self.get_initial_references()
             }
         )[self.sheet_name]
 
@@ -41,14 +69,150 @@ class CharacterSheet(abc.ABC):
 
         name_label_data = raw_sheet_data[self.CELL_REFERENCES["name_label"]]
         if not name_label_data == self.EXPECTED_NAME_LABEL:
+            breaker.mark_non_character_tab(self.spreadsheet_id, self.sheet_name)
+
             raise ValueError(f'"{self.sheet_name}" is not a character sheet - it does not have a "{self.EXPECTED_NAME_LABEL}" field at {self.CELL_REFERENCES["name_label"]}, it has "{name_label_data}" instead.')
 
         character_discord_username = raw_sheet_data[self.CELL_REFERENCES['biography']['discord_username']].lower() # Discord usernames are forced to be lowercase
 
         character_name = raw_sheet_data[self.CELL_REFERENCES['biography']['character_name']]
 
+        for field in self.INITIAL_FIELDS:
+            setattr(self, field, raw_sheet_data.get(self.CELL_REFERENCES[field]))
+
         return character_name, character_discord_username
 
+    @classmethod
+    def get_initial_references(cls) -> List[Union[CellRef, RangeRef]]:
+        return [
+            cls.CELL_REFERENCES['name_label'],
+            cls.CELL_REFERENCES['biography']['discord_username'],
+            cls.CELL_REFERENCES['biography']['character_name'],
+            * [cls.CELL_REFERENCES[field] for field in cls.INITIAL_FIELDS]
+        ]
+
+    def get_snapshot_range(self) -> RangeRef:
+        return get_bounding_box(
+            reference for reference in flatten_cell_references(self.CELL_REFERENCES) if reference.sheet_name is None # Skip other sheets entirely
+        )
+
+    async def get_snapshot(self, value_render_option: ValueRenderOption = ValueRenderOption.FORMATTED_VALUE) -> SheetSnapshot:
+        snapshot_range = self.get_snapshot_range()
+
+        raw_snapshot_data = (await get_from_spreadsheet_api_async(
+            spreadsheet_id=self.spreadsheet_id,
+            raw_sheet_name_data={
+                self.sheet_name: snapshot_range
+            },
+            cache_ttl=self.CACHE_TTL,
+            value_render_option=value_render_option
+        ))[self.sheet_name][snapshot_range]
+
+        snapshot = self.snapshots.get(value_render_option)
+
+        # The cache hands back the same rows until they expire, so only rebuild the snapshot when they change
+        if snapshot is None or snapshot.snapshot_range != snapshot_range or snapshot.values is not raw_snapshot_data:
+            blank_value = None if value_render_option == ValueRenderOption.UNFORMATTED_VALUE else ''
+
+            snapshot = self.snapshots[value_render_option] = SheetSnapshot(snapshot_range, raw_snapshot_data, blank_value=blank_value)
+
+        return snapshot
+
+    async def read_cells(
+        self,
+        raw_sheet_name_data: Dict[str, Union[str, List[str]]],
+        value_render_option: ValueRenderOption = ValueRenderOption.FORMATTED_VALUE
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Reads cells for a command, the same as get_from_spreadsheet_api_async. In snapshot mode, anything on this sheet
+        that falls inside the snapshot is looked up there instead, and only the rest is queried. Anything on a tab shared
+        with the rest of the game comes from the game's shared tabs.
+        """
+
+        if self.shared_tabs is None or not any(sheet_name in self.shared_tabs for sheet_name in raw_sheet_name_data):
+            return await self._read_own_cells(raw_sheet_name_data, value_render_option)
+
+        own_sheet_name_data = {}
+        shared_sheet_names = []
+
+        for sheet_name, ranges_or_cells in raw_sheet_name_data.items():
+            if sheet_name in self.shared_tabs:
+                shared_sheet_names.append(sheet_name)
+            elif len(ranges_or_cells):
+                own_sheet_name_data[sheet_name] = ranges_or_cells
+
+        reads = [self.shared_tabs.read(sheet_name, raw_sheet_name_data[sheet_name], value_render_option) for sheet_name in shared_sheet_names]
+
+        if len(own_sheet_name_data):
+            reads.append(self._read_own_cells(own_sheet_name_data, value_render_option))
+
+        # All at once, so that reading from the shared tabs doesn't add a round trip on top of the character's own
+        read_results = await asyncio.gather(*reads)
+
+        results = collections.defaultdict(dict)
+
+        for sheet_name, sheet_data in zip(shared_sheet_names, read_results):
+            results[sheet_name].update(sheet_data)
+
+        for own_results in read_results[len(shared_sheet_names):]:
+            for sheet_name, sheet_data in own_results.items():
+                results[sheet_name].update(sheet_data)
+
+        return results
+
+    async def _read_own_cells(
+        self,
+        raw_sheet_name_data: Dict[str, Union[str, List[str]]],
+        value_render_option: ValueRenderOption
+    ) -> Dict[str, Dict[str, Any]]:
+        if not self.SNAPSHOT_MODE or self.sheet_name not in raw_sheet_name_data:
+            return await get_from_spreadsheet_api_async(
+                self.spreadsheet_id,
+                raw_sheet_name_data,
+                cache_ttl=self.CACHE_TTL,
+                value_render_option=value_render_option
+            )
+
+        snapshot = await self.get_snapshot(value_render_option)
+
+        references = raw_sheet_name_data[self.sheet_name]
+        if isinstance(references, str):
+            references = [references]
+
+        results = collections.defaultdict(dict)
+
+        remaining_sheet_name_data = {
+            sheet_name: ranges_or_cells for sheet_name, ranges_or_cells in raw_sheet_name_data.items() if sheet_name != self.sheet_name
+        }
+
+        for reference in references:
+            if snapshot.contains(reference):
+                results[self.sheet_name][reference] = snapshot.get(reference)
+            else:
+                remaining_sheet_name_data.setdefault(self.sheet_name, []).append(reference)
+
+        remaining_sheet_name_data = {
+            sheet_name: ranges_or_cells for sheet_name, ranges_or_cells in remaining_sheet_name_data.items() if len(ranges_or_cells)
+        }
+
+        if len(remaining_sheet_name_data):
+            queried_data = await get_from_spreadsheet_api_async(
+                self.spreadsheet_id,
+                remaining_sheet_name_data,
+                cache_ttl=self.CACHE_TTL,
+                value_render_option=value_render_option
+            )
+
+            for sheet_name, sheet_data in queried_data.items():
+                results[sheet_name].update(sheet_data)
+
+        return results
+
+    def invalidate_cache(self) -> int:
+        self.snapshots = {}
+
+        return get_sheets_cache().invalidate(self.spreadsheet_id, self.sheet_name)
+
     def info(self):
         return {
             'discord_username': self.discord_username,
@@ -65,12 +229,18 @@ class CharacterSheet(abc.ABC):
 
     @classmethod
     def bulk_create(cls, spreadsheet_id: str, sheet_names: List[str], sheet_gids: List[int]) -> Dict[str, 'CharacterSheet']:
+        breaker = get_spreadsheet_breaker()
+
+        sheet_gids_by_name = {}
+        for sheet_name, sheet_gid in zip(sheet_names, sheet_gids):
+            if not breaker.is_known_non_character_tab(spreadsheet_id, sheet_name): # e.g. cover pages and rules, seen on a previous /link
+                sheet_gids_by_name[sheet_name] = sheet_gid
+
+        if len(sheet_gids_by_name) == 0:
+            return {}
+
         raw_sheet_name_data_to_query = {
-            sheet_name: [
-                cls.CELL_REFERENCES['name_label'],
-                cls.CELL_REFERENCES['biography']['discord_username'],
-                cls.CELL_REFERENCES['biography']['character_name']
-            ] for sheet_name in sheet_names
+            sheet_name: cls.get_initial_references() for sheet_name in sheet_gids_by_name
         }
 
         all_raw_sheet_data = get_from_spreadsheet_api(
@@ -80,22 +250,28 @@ class CharacterSheet(abc.ABC):
 
         valid_characters = {}
 
-        for sheet_index, (sheet_name, sheet_data) in enumerate(all_raw_sheet_data.items()):
-            if cls.is_character_sheet(sheet_data):
+        for sheet_name, sheet_data in all_raw_sheet_data.items():
+            if not cls.is_character_sheet(sheet_data):
+                breaker.mark_non_character_tab(spreadsheet_id, sheet_name)
+            else:
                 character_discord_username = sheet_data[cls.CELL_REFERENCES['biography']['discord_username']]
                 if character_discord_username is not None:
                     character_discord_username = character_discord_username.lower()
 
                 character_name = sheet_data[cls.CELL_REFERENCES['biography']['character_name']]
 
-                valid_characters[sheet_name] = cls(
-                    spreadsheet_id=spreadsheet_id,
-                    sheet_name=sheet_name,
-                    sheet_gid=sheet_gids[sheet_index],
-                    discord_username=character_discord_username,
-                    character_name=character_name,
-                    query=False # If they don't have the names, they won't have them now either.
-                )
+                try:
+                    valid_characters[sheet_name] = cls(
+                        spreadsheet_id=spreadsheet_id,
+                        sheet_name=sheet_name,
+                        sheet_gid=sheet_gids_by_name[sheet_name],
+                        discord_username=character_discord_username,
+                        character_name=character_name,
+                        query=False, # If they don't have the names, they won't have them now either.
+                        ** {field: sheet_data.get(cls.CELL_REFERENCES[field]) for field in cls.INITIAL_FIELDS}
+                    )
+                except BotError as e: # e.g. a character that's still being made, so not skipped on the next /link
+                    get_logger().warning(f'Skipping "{sheet_name}" in "{spreadsheet_id}": {e}')
 
         return valid_characters
 
@@ -10,7 +10,8 @@ from src.overcharge.DieCharacter import DieCharacter
 from src.astir.AstirCharacterSheet import AstirCharacter
 from src.bloodheist.BloodheistCharacterSheet import BloodheistCharacterSheet
 from src.CharacterSheet import CharacterSheet
-from src.utils.google_sheets import get_spreadsheet_metadata, get_spreadsheet_sheet_gid, get_sheet_name_from_gid, get_spreadsheet_id
+from src.utils.google_sheets import get_known_spreadsheet_metadata, get_spreadsheet_sheet_gid, get_sheet_name_from_gid, get_spreadsheet_id
+from src.utils.sheets_breaker import get_spreadsheet_breaker
 from src.utils.logger import get_logger
 from src.utils.exceptions import NoSpreadsheetGidError
 
@@ -105,8 +106,6 @@ class CharacterKeeperGame(Game):
 
         self.spreadsheet_id = spreadsheet_id
 
-        self.spreadsheet_metadata = get_spreadsheet_metadata(self.spreadsheet_id)
-
         self.character_sheets: Dict[str, CharacterSheet] = {}
 
         self.character_file_data = {}
@@ -117,9 +116,16 @@ class CharacterKeeperGame(Game):
         characters = [character for character in characters if character.discord_username is not None]
 
         if len(characters) == 0:
+            # Only a fresh /link needs the tabs - restored games already know their characters' sheets. Forced, as the
+            # spreadsheet may well have gained tabs since it was last seen - and linking again is a deliberate retry, so
+            # give it a chance even if it's been failing, and look at tabs that weren't characters last time again.
+            get_spreadsheet_breaker().reset(self.spreadsheet_id)
+
+            spreadsheet_metadata = get_known_spreadsheet_metadata(self.spreadsheet_id, force=True)
+
             sheet_names_to_query = []
             sheet_gids_to_query = []
-            for sheet_gid, sheet_name in self.spreadsheet_metadata.items():
+            for sheet_gid, sheet_name in spreadsheet_metadata.items():
                 if sheet_name in self.RESERVED_SHEET_NAMES:
                     continue
 
@@ -166,6 +172,8 @@ class CharacterKeeperGame(Game):
 
         character.discord_username = username
 
+        character.invalidate_cache()
+
         self.character_sheets[character.discord_username.lower()] = character
 
         return character
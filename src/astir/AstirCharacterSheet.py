@@ -1,14 +1,16 @@
 import collections
+import copy
 import enum
-import functools
-import re
-from typing import Dict, Tuple, Union, List
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple, Union, List, Mapping, Optional
 
 from src.CharacterSheet import CharacterSheet
-from src.utils.google_sheets import get_from_spreadsheet_api, offset_reference
+from src.utils.google_sheets import get_from_spreadsheet_api
+from src.utils.sheet_grid import SheetGrid, to_sheet_grid
+from src.utils.sheet_references import CellRef, RangeRef, to_reference, freeze_cell_references
 from src.utils.exceptions import BotError
 from src.utils.logger import get_logger
-from src.astir.utils import load_moves
+from src.astir.utils import load_moves, get_move_index
 from src.astir.AstirMove import AstirMove
 
 class AstirTrait(enum.Enum):
@@ -33,6 +35,63 @@ class AstirTrait(enum.Enum):
     def __hash__(self):
         return hash(self.value)
 
+class StartingMoves(enum.Enum):
+    ONE         = 'One'
+    ONE_OF_TWO  = 'One of Two'
+    TWO         = 'Two'
+
+@dataclass(frozen=True)
+class AstirLayout:
+    """
+    Where everything is on one playbook's sheet. Shared by every character with that playbook, so never changed.
+    """
+
+    playbook_name: str
+    cell_references: Mapping[str, Any]
+    starting_moves: StartingMoves
+
+def _is_unchanged(values: Any, previous_values: Any) -> bool:
+    # The cache hands back the same values until they expire, and after that they've usually not changed either
+    return values is previous_values or (previous_values is not None and values == previous_values)
+
+class AstirCharacterState:
+    """
+    What's worked out from a character's cells rather than read straight off them - their danger count and moves. Kept
+    per character, and only worked out again once the cells it came from have changed.
+    """
+
+    def __init__(self):
+        self.dangers = None
+        self.num_dangers = 0
+
+        self.moves_data: Optional[Dict[str, Any]] = None
+        self.moves: Dict[str, AstirMove] = {}
+
+    def get_num_dangers(self, dangers: Any) -> int:
+        if not _is_unchanged(dangers, self.dangers):
+            # Each danger is one row, so count rows with anything in them
+            self.num_dangers = len([row for row in to_sheet_grid(dangers) if any(cell not in ('', None) for cell in row)])
+            self.dangers = dangers
+
+        return self.num_dangers
+
+    def get_moves(self, moves_data: Dict[str, Any]) -> Dict[str, AstirMove]:
+        if self.moves_data is None or moves_data.keys() != self.moves_data.keys() or not all(
+            _is_unchanged(all_cell_data, self.moves_data[cell_reference]) for cell_reference, all_cell_data in moves_data.items()
+        ):
+            move_index = get_move_index()
+
+            moves = {}
+            for cell_reference, all_cell_data in moves_data.items():
+                moves.update(move_index.find_moves(to_sheet_grid(all_cell_data)))
+
+            self.moves = moves
+            self.moves_data = dict(moves_data)
+
+        return dict(self.moves)
+
+_PLAYBOOK_NOT_READ: Any = object() # Told apart from None, which is a blank playbook cell
+
 class AstirCharacter(CharacterSheet):
     character_name: str
 
@@ -70,6 +129,8 @@ class AstirCharacter(CharacterSheet):
 
     EXPECTED_NAME_LABEL = "NAME & PRONOUNS"
 
+    CACHE_TTL = 60 # Traits and moves only change between sessions
+
     ASTIR_PLAYBOOKS = [
         'Arcanist', 'Impostor', 'Paradigm', 'Witch',
         'Wither', 'Adrift', 'Advocate', 'Revenant', 'Summoner', # AA:Encore classes
@@ -88,71 +149,105 @@ class AstirCharacter(CharacterSheet):
         'Commander', 'Revenant'
     ]
 
-    def __init__(self, * args, ** kwargs):
-        super().__init__(* args, ** kwargs)
+    PLAYBOOK_LAYOUTS: Dict[str, AstirLayout] = {} # Built once the class is, as that's when CELL_REFERENCES are parsed
 
-        playbook_name = get_from_spreadsheet_api(
-            spreadsheet_id=self.spreadsheet_id,
-            raw_sheet_name_data={
-                self.sheet_name: [
-                    self.CELL_REFERENCES['playbook_name'],
-                ]
-            }
-        )[self.sheet_name][self.CELL_REFERENCES['playbook_name']].title()
+    INITIAL_FIELDS = ['playbook_name']
 
-        if playbook_name == 'Adrift':
-            self.CELL_REFERENCES['traits'][AstirTrait.HOME] = 'AL16'
-            self.CELL_REFERENCES['approach'] = 'AJ11'
-        else:
-            if playbook_name in self.ASTIR_PLAYBOOKS:
-                self.CELL_REFERENCES['approach'] = 'AJ11'
-                self.CELL_REFERENCES['astir_move'] = 'AX33'
-            elif playbook_name in self.NON_ASTIR_PLAYBOOKS:
-                self.CELL_REFERENCES['approach'] = 'AL16'
+    def __init__(self, * args, playbook_name: Optional[str] = _PLAYBOOK_NOT_READ, ** kwargs):
+        self.playbook_name = playbook_name
+
+        super().__init__(* args, ** kwargs) # Fills in the playbook too, if it has to query the sheet for the names
+
+        if self.playbook_name is _PLAYBOOK_NOT_READ: # Saved before the playbook was
+            self.playbook_name = get_from_spreadsheet_api(
+                spreadsheet_id=self.spreadsheet_id,
+                raw_sheet_name_data={
+                    self.sheet_name: [
+                        self.CELL_REFERENCES['playbook_name'],
+                    ]
+                }
+            )[self.sheet_name][self.CELL_REFERENCES['playbook_name']]
+
+        if not self.playbook_name: # Read, but blank
+            raise BotError(f'"{self.sheet_name}" does not have a playbook yet - it should be at {self.CELL_REFERENCES["playbook_name"]}.')
+
+        self.playbook_name = self.playbook_name.title()
+
+        if self.playbook_name not in self.PLAYBOOK_LAYOUTS:
+            raise BotError(f'Unknown playbook: "{self.playbook_name}"')
+
+        self.layout = self.PLAYBOOK_LAYOUTS[self.playbook_name]
+
+        self.CELL_REFERENCES = self.layout.cell_references # Shadows the class' shared references for everything from here on
+
+        self.state = AstirCharacterState()
+
+    @classmethod
+    def build_playbook_layouts(cls) -> Dict[str, AstirLayout]:
+        layouts = {}
+
+        for playbook_name in [* cls.ASTIR_PLAYBOOKS, * cls.NON_ASTIR_PLAYBOOKS]:
+            cell_references = copy.deepcopy(cls.CELL_REFERENCES)
+
+            if playbook_name == 'Adrift':
+                cell_references['traits'][AstirTrait.HOME] = 'AL16'
+                cell_references['approach'] = 'AJ11'
+            elif playbook_name in cls.ASTIR_PLAYBOOKS:
+                cell_references['approach'] = 'AJ11'
+                cell_references['astir_move'] = 'AX33'
             else:
-                raise BotError(f'Unknown playbook: "{playbook_name}"')
+                cell_references['approach'] = 'AL16'
 
-        if playbook_name == 'Impostor':
-            self.CELL_REFERENCES['arcane_augments_move_name'] = 'BY5'
+            if playbook_name == 'Impostor':
+                cell_references['arcane_augments_move_name'] = 'BY5'
 
-        if playbook_name in self.TWO_STARTING_MOVE_OPTIONS_PLAYBOOKS:
-            self.CELL_REFERENCES['starting_move_option_one'] = 'CA5'
-            self.CELL_REFERENCES['starting_move_option_one_checkbox'] = 'BY5'
+            if playbook_name in cls.TWO_STARTING_MOVE_OPTIONS_PLAYBOOKS:
+                cell_references['starting_move_option_one'] = 'CA5'
+                cell_references['starting_move_option_one_checkbox'] = 'BY5'
 
-            self.CELL_REFERENCES['starting_move_option_two'] = 'DL5'
-            self.CELL_REFERENCES['starting_move_option_two_checkbox'] = 'DJ5'
+                cell_references['starting_move_option_two'] = 'DL5'
+                cell_references['starting_move_option_two_checkbox'] = 'DJ5'
 
-            self.get_starting_move = self._get_single_starting_move_from_options
+                starting_moves = StartingMoves.ONE_OF_TWO
+            elif playbook_name in cls.TWO_STARTING_MOVES_PLAYBOOKS:
+                cell_references['starting_move_one'] = 'BY5'
+                cell_references['starting_move_two'] = 'BY23' if playbook_name == 'Revenant' else 'DJ5'
 
-        elif playbook_name in self.TWO_STARTING_MOVES_PLAYBOOKS:
-            if playbook_name == 'Revenant':
-                self.CELL_REFERENCES['starting_move_one'] = 'BY5'
-                self.CELL_REFERENCES['starting_move_two'] = 'BY23'
+                starting_moves = StartingMoves.TWO
             else:
-                self.CELL_REFERENCES['starting_move_one'] = 'BY5'
-                self.CELL_REFERENCES['starting_move_two'] = 'DJ5'
+                cell_references['starting_move'] = 'BY5'
 
-            self.get_starting_move = self._get_two_starting_moves
-        else:
-            self.CELL_REFERENCES['starting_move'] = 'BY5'
+                starting_moves = StartingMoves.ONE
 
-            self.get_starting_move = self._get_single_starting_move
+            layouts[playbook_name] = AstirLayout(
+                playbook_name=playbook_name,
+                cell_references=freeze_cell_references(cell_references),
+                starting_moves=starting_moves
+            )
+
+        return layouts
+
+    async def get_starting_move(self) -> Union[str, Tuple[str, str]]:
+        if self.layout.starting_moves == StartingMoves.ONE_OF_TWO:
+            return await self._get_single_starting_move_from_options()
+        elif self.layout.starting_moves == StartingMoves.TWO:
+            return await self._get_two_starting_moves()
+        else:
+            return await self._get_single_starting_move()
 
-    def _get_single_starting_move(self) -> str:
-        results: Dict[str, str] = get_from_spreadsheet_api(
-            spreadsheet_id=self.spreadsheet_id,
+    async def _get_single_starting_move(self) -> str:
+        results: Dict[str, str] = (await self.read_cells(
             raw_sheet_name_data={
                 self.sheet_name: [
                     self.CELL_REFERENCES['starting_move']
                 ]
             }
-        )[self.sheet_name]
+        ))[self.sheet_name]
 
         return results[self.CELL_REFERENCES['starting_move']]
 
-    def _get_single_starting_move_from_options(self) -> str:
-        results: Dict[str, str] = get_from_spreadsheet_api(
-            spreadsheet_id=self.spreadsheet_id,
+    async def _get_single_starting_move_from_options(self) -> str:
+        results: Dict[str, str] = (await self.read_cells(
             raw_sheet_name_data={
                 self.sheet_name: [
                     self.CELL_REFERENCES['starting_move_option_one'],
@@ -161,7 +256,7 @@ class AstirCharacter(CharacterSheet):
                     self.CELL_REFERENCES['starting_move_option_two_checkbox']
                 ]
             }
-        )[self.sheet_name]
+        ))[self.sheet_name]
 
         get_logger().info(results)
 
@@ -172,72 +267,36 @@ class AstirCharacter(CharacterSheet):
         else:
             raise ValueError(f'No starting move found from "{self.spreadsheet_id} {self.sheet_name}": {results}')
 
-    def _get_two_starting_moves(self) -> Tuple[str, str]:
-        results: Dict[str, str] = get_from_spreadsheet_api(
-            spreadsheet_id=self.spreadsheet_id,
+    async def _get_two_starting_moves(self) -> Tuple[str, str]:
+        results: Dict[str, str] = (await self.read_cells(
             raw_sheet_name_data={
                 self.sheet_name: [
                     self.CELL_REFERENCES['starting_move_one'],
                     self.CELL_REFERENCES['starting_move_two']
                 ]
             }
-        )[self.sheet_name]
+        ))[self.sheet_name]
 
         return results[self.CELL_REFERENCES['starting_move_one']], results[self.CELL_REFERENCES['starting_move_two']]
 
     @staticmethod
-    def _check_spreadsheet_range_or_cell(range_or_cell_data: Union[str, List[str], List[List[str]]], query: str) -> bool:
-        if isinstance(range_or_cell_data, str):
-            return AstirCharacter._check_spreadsheet_range_or_cell([
-                [
-                    range_or_cell_data
-                ]
-            ], query)
-        elif isinstance(range_or_cell_data, list) and isinstance(range_or_cell_data[0], str):
-            return AstirCharacter._check_spreadsheet_range_or_cell([
-                range_or_cell_data
-            ], query)
-
-        processed_query = query.lower().strip()
-
-        if range_or_cell_data is None: # TODO This was None when Rutger tried to read the room?
-            return False
-
-        for range_or_cell_wrapper in range_or_cell_data:
-            for cell in range_or_cell_wrapper:
-                if cell.lower().strip() == processed_query:
-                    return True
+    def _check_spreadsheet_range_or_cell(range_or_cell_data: Union[None, str, List[str], List[List[str]], SheetGrid], query: str) -> bool:
+        # TODO This was None when Rutger tried to read the room?
+        return to_sheet_grid(range_or_cell_data).contains_value(query)
 
-        return False
-
-    def get_all_moves(self) -> Dict[str, AstirMove]: # TODO This needs to filter for ones they've actually got checked
+    async def get_all_moves(self) -> Dict[str, AstirMove]: # TODO This needs to filter for ones they've actually got checked
         references = [
             self.CELL_REFERENCES['all_non_astir_moves_range'],
             self.CELL_REFERENCES['astir_move_label']
         ]
 
-        raw_moves_data = get_from_spreadsheet_api(
-            spreadsheet_id=self.spreadsheet_id,
+        raw_moves_data = (await self.read_cells(
             raw_sheet_name_data={
                 self.sheet_name: references
             }
-        )[self.sheet_name]
-
-        all_moves = load_moves()
-
-        all_move_names = set()
+        ))[self.sheet_name]
 
-        for playbook, playbook_moves in all_moves.items():
-            all_move_names = all_move_names.union(playbook_moves.keys())
-
-        found = {}
-        for cell_reference, all_cell_data in raw_moves_data.items():
-            for playbook, playbook_moves in all_moves.items():
-                for move_name, move in playbook_moves.items():
-                    if AstirCharacter._check_spreadsheet_range_or_cell(all_cell_data, move_name):
-                        found[move_name] = move
-
-        return found
+        return self.state.get_moves(raw_moves_data)
 
     @staticmethod
     def _find_moves_in_spreadsheet_data(spreadsheet_data: Dict[str, str]) -> Dict[str, AstirMove]:
@@ -259,48 +318,57 @@ class AstirCharacter(CharacterSheet):
         return found
 
     @staticmethod
-    @functools.lru_cache()
-    def get_trait_label_reference(trait_reference: str):
-        match = re.fullmatch('([A-Z]+)([0-9]+)', trait_reference)
+    def get_trait_label_reference(trait_reference: Union[str, CellRef]) -> CellRef:
+        trait_reference = to_reference(trait_reference)
 
-        if match is None:
+        if not isinstance(trait_reference, CellRef):
             raise ValueError(f'Cannot identify column and row from reference "{trait_reference}".')
 
-        return offset_reference(trait_reference, column_offset=-1, row_offset=-2)
+        return trait_reference.offset(column_offset=-1, row_offset=-2)
+
+    @classmethod
+    def get_shared_references(cls) -> List[CellRef]:
+        """
+        Cells on tabs the whole crew shares, rather than on each character's own sheet, along with their labels.
+        """
+
+        shared_references = []
+
+        for layout in cls.PLAYBOOK_LAYOUTS.values():
+            for trait_reference in layout.cell_references['traits'].values():
+                if trait_reference.sheet_name is not None:
+                    shared_references.extend([trait_reference, cls.get_trait_label_reference(trait_reference)])
+
+        return list(dict.fromkeys(shared_references))
 
-    def get_playbook(self) -> str:
+    async def get_playbook(self) -> str:
         playbook_name_reference = self.CELL_REFERENCES['playbook_name']
 
-        results = get_from_spreadsheet_api(
-            spreadsheet_id=self.spreadsheet_id,
+        results = (await self.read_cells(
             raw_sheet_name_data={
                 self.sheet_name: [
                     playbook_name_reference
                 ]
             }
-        )[self.sheet_name]
+        ))[self.sheet_name]
 
         playbook = results[playbook_name_reference]
 
         return playbook
 
-    def split_sheet_name_reference(self, sheet_name_reference: str):
-        match = re.fullmatch('(.+)!([A-Z]+[0-9]+)', sheet_name_reference)
+    def split_sheet_name_reference(self, sheet_name_reference: Union[str, CellRef, RangeRef]):
+        sheet_name_reference = to_reference(sheet_name_reference)
 
-        if match is None:
-            sheet_name = self.sheet_name
-            column_row = sheet_name_reference
-        else:
-            sheet_name = match.group(1)
-            column_row = match.group(2)
+        if sheet_name_reference.sheet_name is None:
+            return self.sheet_name, sheet_name_reference
 
-        return sheet_name, column_row
+        return sheet_name_reference.sheet_name, sheet_name_reference.local
 
-    def get_trait(self, trait: AstirTrait) -> Tuple[int, str]:
+    async def get_trait(self, trait: AstirTrait) -> Tuple[int, str]:
         warning = ''
 
         if trait not in self.CELL_REFERENCES['traits']:
-            get_logger().warning(f'We do not have a cell reference for {trait} - playbook is {self.get_playbook()}')
+            get_logger().warning(f'We do not have a cell reference for {trait} - playbook is {await self.get_playbook()}')
             modifier = 0
             warning = f'Cannot find trait "{trait.value}" in your playbook. Assuming a value of 0.'
         else:
@@ -308,38 +376,31 @@ class AstirCharacter(CharacterSheet):
 
             trait_sheet_name, trait_column_row_reference = self.split_sheet_name_reference(trait_reference)
 
-            class_name_reference = self.CELL_REFERENCES['playbook_name']
             dangers_reference = self.CELL_REFERENCES['dangers']
             trait_label_reference = self.get_trait_label_reference(trait_column_row_reference)
 
             # Handle Arcane Augments boosting this by # dangers upto +3
             # TODO The sheet actually handles this automatically, so only check the multiclass of it.
-            checking_for_arcane_augments = ( trait == AstirTrait.CHANNEL )
+            # Impostor already does this on the sheet itself, so don't do again
+            checking_for_arcane_augments = ( trait == AstirTrait.CHANNEL and self.playbook_name != 'Impostor' )
 
             references = []
             if checking_for_arcane_augments:
-                references.append(class_name_reference)
                 references.append(dangers_reference)
-                references.extend([
-                    self.CELL_REFERENCES['all_non_astir_moves_range'],
-                    self.CELL_REFERENCES['astir_move_label']
-                ])
 
             sheet_name_data = collections.defaultdict(list)
             sheet_name_data[self.sheet_name].extend(references)
             sheet_name_data[trait_sheet_name].append(trait_column_row_reference)
             sheet_name_data[trait_sheet_name].append(trait_label_reference)
 
-            results = get_from_spreadsheet_api(
-                spreadsheet_id=self.spreadsheet_id,
+            results = await self.read_cells(
                 raw_sheet_name_data=sheet_name_data
             )
 
             modifier = results[trait_sheet_name][trait_column_row_reference].replace('–', '-')
 
-            # Impostor already does this on the sheet itself, so don't do again
-            if checking_for_arcane_augments and results[self.sheet_name][class_name_reference].title() != 'Impostor':
-                num_dangers = len([cell for cell in results[self.sheet_name][dangers_reference] if len(cell)])
+            if checking_for_arcane_augments:
+                num_dangers = self.state.get_num_dangers(results[self.sheet_name][dangers_reference])
 
                 modifier = int(modifier)
 
@@ -357,6 +418,14 @@ class AstirCharacter(CharacterSheet):
 
         return int(modifier), warning
 
+    def info(self):
+        return {
+            ** super().info(),
+            'playbook_name': self.playbook_name
+        }
+
     @classmethod
     def load(cls, character_data: Dict[str, str]) -> 'AstirCharacter':
-        return AstirCharacter(**character_data)
\ No newline at end of file
+        return AstirCharacter(**character_data)
+
+AstirCharacter.PLAYBOOK_LAYOUTS = AstirCharacter.build_playbook_layouts()
@@ -8,6 +8,7 @@ from src.Roll import Roll, Cut
 from src.utils.format import strikethrough
 from src.utils.logger import get_logger
 from src.utils.exceptions import UnknownSystemError, BotError
+from src.utils.shared_tabs import SharedTabCache
 
 from src.Game import CharacterKeeperGame
 
@@ -86,6 +87,12 @@ class AstirGame(CharacterKeeperGame):
     def __init__(self, guild_id:  int, spreadsheet_id: str, characters: Optional[List[AstirCharacter]] = None):
         super().__init__(guild_id, spreadsheet_id, System.ASTIR, characters)
 
+        # e.g. Cause / Factions, which every character's Crew rolls read from
+        self.shared_tabs = SharedTabCache(spreadsheet_id, AstirCharacter.get_shared_references(), cache_ttl=AstirCharacter.CACHE_TTL)
+
+        for character in self.character_sheets.values():
+            character.shared_tabs = self.shared_tabs
+
     @classmethod
     def load(cls, guild_id: int) -> 'AstirGame':
         game_data = cls.load_game_data(guild_id)
@@ -117,7 +124,7 @@ class AstirGame(CharacterKeeperGame):
     def get_character(self, username: str) -> AstirCharacter:
         return super().get_character(username)
 
-    def roll_check(
+    async def roll_check(
         self,
         username: str,
         initial_roll: Roll,
@@ -134,7 +141,7 @@ class AstirGame(CharacterKeeperGame):
             trait_modifier = 0
             warning = ''
         else:
-            trait_modifier, warning = self.get_character(username).get_trait(trait)
+            trait_modifier, warning = await self.get_character(username).get_trait(trait)
 
         overall_modifier = trait_modifier + modifier
 
@@ -240,8 +247,12 @@ class AstirGame(CharacterKeeperGame):
 
         return total, formatted_results, formatted_confidence_desperation_results, has_advantage, has_disadvantage
 
-    def create_character(self, spreadsheet_id: str, sheet_name: str) -> AstirCharacter:
-        return AstirCharacter(spreadsheet_id, sheet_name)
+    def create_character(self, spreadsheet_id: str, sheet_name: str, sheet_gid: int) -> AstirCharacter:
+        character = AstirCharacter(spreadsheet_id, sheet_name, sheet_gid=sheet_gid)
+
+        character.shared_tabs = self.shared_tabs
+
+        return character
 
     @staticmethod
     def from_data(game_data: Dict[str, Any]) -> 'AstirGame':
@@ -303,7 +303,7 @@ which was modified{confidence_desperation_expression} to produce
 # Optional trait? Ugh.
 # Just make it its own move? Honestly easier... Maybe one command per move.
 # Most of which are just thin wrappers around a unified one, but still. Handles edge cases well.
-def roll_action(
+async def roll_action(
     game: AstirGame,
     username: str,
     trait: Optional[str] = None,
@@ -328,7 +328,7 @@ def roll_action(
     else:
         trait_to_use = None
 
-    total, formatted_results, formatted_confidence_desperation_results, trait_modifier, had_advantage, had_disadvantage, warning = game.roll_check(
+    total, formatted_results, formatted_confidence_desperation_results, trait_modifier, had_advantage, had_disadvantage, warning = await game.roll_check(
         username=username,
         initial_roll=roll,
         trait=trait_to_use,
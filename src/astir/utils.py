@@ -1,8 +1,12 @@
 import os
 import json
-from typing import Dict
+import re
+from typing import Dict, Tuple
 
 from src.astir.AstirMove import AstirMove
+from src.utils.sheet_grid import SheetGrid, normalise
+
+MAX_EMBEDDING_CELL_LENGTH = 64 # Longer cells are move descriptions, which mention other moves rather than naming their own
 
 def load_moves() -> Dict[str, Dict[str, AstirMove]]:
     if not hasattr(load_moves, 'all_moves'):
@@ -22,3 +26,48 @@ def load_moves() -> Dict[str, Dict[str, AstirMove]]:
         load_moves.all_moves = all_moves
 
     return load_moves.all_moves
+
+class MoveIndex:
+    """
+    Every move by its normalised name, plus one pattern matching any of them inside a cell, so a sheet's moves can be
+    found in a single pass over its distinct cell values rather than a search per move.
+    """
+
+    def __init__(self, all_moves: Dict[str, Dict[str, AstirMove]]):
+        self.moves: Dict[str, Tuple[str, AstirMove]] = {}
+
+        for playbook, playbook_moves in all_moves.items():
+            for move_name, move in playbook_moves.items():
+                self.moves[normalise(move_name)] = move_name, move
+
+        # Longest first, so that a move whose name contains another's is matched as itself
+        move_names = sorted(self.moves, key=len, reverse=True)
+
+        self.pattern = re.compile(
+            r'(?<!\w)(?:' + '|'.join(re.escape(move_name) for move_name in move_names) + r')(?!\w)'
+        ) if len(move_names) else None
+
+    def find_moves(self, grid: SheetGrid) -> Dict[str, AstirMove]:
+        found = {}
+
+        for value in grid.normalised_values:
+            if not isinstance(value, str) or not len(value):
+                continue
+
+            if value in self.moves:
+                move_name, move = self.moves[value]
+
+                found[move_name] = move
+            elif self.pattern is not None and len(value) <= MAX_EMBEDDING_CELL_LENGTH:
+                for match in self.pattern.finditer(value):
+                    move_name, move = self.moves[match.group(0)]
+
+                    found[move_name] = move
+
+        return found
+
+def get_move_index() -> MoveIndex:
+    if not hasattr(get_move_index, 'index'):
+        get_move_index.index = MoveIndex(load_moves())
+
+    return get_move_index.index
@@ -2,7 +2,7 @@ import abc
 from typing import Dict
 
 from src.CharacterSheet import CharacterSheet
-from src.utils.google_sheets import get_from_spreadsheet_api
+from src.utils.sheets_requests import ValueRenderOption
 
 class BloodheistCharacterSheet(CharacterSheet, abc.ABC):
     character_name: str
@@ -27,16 +27,18 @@ class BloodheistCharacterSheet(CharacterSheet, abc.ABC):
         }
     }
 
-    def get_doom_count(self) -> int:
-        doom_tracker = get_from_spreadsheet_api(
-            spreadsheet_id=self.spreadsheet_id,
+    CACHE_TTL = 15
+
+    async def get_doom_count(self) -> int:
+        doom_tracker = await self.read_cells(
             raw_sheet_name_data={
                 self.sheet_name: list(self.CELL_REFERENCES['doom'].values())
-            }
+            },
+            value_render_option=ValueRenderOption.UNFORMATTED_VALUE # Checkboxes come back as bools, rather than "FALSE" which is truthy
         )
 
         for doom_number, cell_reference in self.CELL_REFERENCES['doom'].items():
-            if doom_tracker[cell_reference]:
+            if doom_tracker[self.sheet_name][cell_reference] is True:
                 return doom_number
 
     @classmethod
@@ -80,6 +80,15 @@ def get_character_list(game: CharacterKeeperGame):
 
     return message
 
+def refresh(game: CharacterKeeperGame, username: str):
+    character = game.get_character(username)
+
+    character.invalidate_cache()
+
+    character_name = '[Unnamed]' if character.character_name is None else character.character_name
+
+    return f'Refreshed {character_name} - your next command will read their sheet again rather than using cached values.'
+
 def help_roll():
     four_d_ten_results = [4, 6, 7, 2]
     four_d_ten_results_cut = [4, 6, strikethrough(7), 2]
@@ -4,6 +4,7 @@ from discord.ext.pages import Page, Paginator
 import requests
 import dotenv
 
+import asyncio
 import json
 import random
 import os
@@ -13,14 +14,22 @@ import atexit
 from typing import Callable, Union
 
 from src.Roll import Roll
+from src.CharacterSheet import CharacterSheet
 from src.utils.format import bold, underline, code
 from src.utils.logger import get_logger
+from src.utils.sheets_scheduler import sheets_priority_lane, Priority
+from src.utils.sheets_retry import track_command_retries
+from src.utils.sheets_budget import track_command_usage, get_stale_notice
+from src.utils.sheets_keys import sheets_guild
+from src.utils.deadline import command_deadline, get_command_deadline, auto_deferring
 from src.utils.exceptions import BotError, NoCharacterError, NoGameError, UnknownSystemError
+from src.utils.google_sheets import configure_batching
+from src.utils.sheets_hedging import configure_hedging, HedgingPolicy
 from src.astir.Astir import Astir
 from src.astir.AstirGame import AstirGame
 from src.astir.AstirCharacterSheet import AstirTrait
 from src.astir.AstirMove import AstirMove
-from src.commands import get_privacy_policy, get_donate, get_commands_page_content, get_character_list, help_roll, should_respond
+from src.commands import get_privacy_policy, get_donate, get_commands_page_content, get_character_list, help_roll, should_respond, refresh
 from src.astir.commands import (
     get_credits, get_legal, get_about, get_getting_started_page_content, get_move, get_tag, get_debugging_page_content,
     roll_action, link, unlink, add_character, log_suggestion, simple_roll, get_changelog
@@ -76,7 +85,27 @@ def command_logging_decorator(command: Callable):
         log_message = f'Command {command.__name__} called in Guild {guild_id} ("{guild_name}") by {user_name} with args {args} and kwargs {kwargs}'[:3000]
         logger.info(log_message)
 
-        return await command(*args, ctx=ctx, **kwargs)
+        with (
+            command_deadline(get_command_deadline(command.__name__)) as deadline,
+            track_command_retries(command.__name__) as command_retries,
+            track_command_usage(command.__name__) as command_usage,
+            sheets_guild(guild_id if isinstance(guild_id, int) else None)
+        ):
+            async with auto_deferring(ctx, deadline): # Rather than let the interaction expire on a slow sheet
+                result = await command(*args, ctx=ctx, **kwargs)
+
+        if command_retries.retries:
+            logger.info(f'Command {command.__name__} retried Sheets calls {command_retries.retries} times, adding {command_retries.added_latency:.2f}s')
+
+        if command_usage.calls or command_usage.served_stale:
+            logger.info(f'Command {command.__name__} used {command_usage.summary()}')
+
+        stale_notice = get_stale_notice(command_usage)
+
+        if stale_notice is not None and isinstance(ctx, discord.ApplicationContext):
+            await ctx.respond(stale_notice, ephemeral=True)
+
+        return result
 
     return wrapper
 
@@ -210,6 +239,17 @@ async def list_characters_command(
 
     await ctx.respond(message)
 
+@astir.slash_command(name='refresh', description='Re-reads your character sheet on your next command, instead of using recently read values.')
+@command_logging_decorator
+@error_responder_decorator
+@character_required_decorator
+async def refresh_command(
+    ctx: discord.ApplicationContext,
+):
+    response = refresh(astir.games[ctx.guild_id], ctx.user.name)
+
+    await ctx.respond(response, ephemeral=True)
+
 @astir.slash_command(name='tag', description='Describes a given resource or equipment tag')
 @command_logging_decorator
 @error_responder_decorator
@@ -246,7 +286,9 @@ async def add_character_command(
 ):
     interaction = await ctx.respond('Adding character...')
 
-    response = add_character(
+    # Adding a character reads the sheet whilst constructing it, so keep that off the event loop
+    response = await asyncio.to_thread(
+        add_character,
         game=astir.games[ctx.guild_id],
         discord_username=ctx.user.name,
         discord_display_name=ctx.user.display_name,
@@ -275,7 +317,7 @@ async def roll_action_command(
         elif confidence_desperation.title() == 'Desperation':
             desperation = True
 
-    response = roll_action(
+    response = await roll_action(
         game=astir.games[ctx.guild_id],
         username=ctx.user.name,
         trait=skill,
@@ -333,7 +375,7 @@ async def weather_the_storm_command(
         elif confidence_desperation.title() == 'Desperation':
             desperation = True
 
-    response, total = roll_action(
+    response, total = await roll_action(
         game=astir.games[ctx.guild_id],
         username=ctx.user.name,
         trait=trait,
@@ -368,7 +410,7 @@ async def read_the_room_command(
     # TODO Eventually just check all their moves
     # TODO I think this is slowing things enough that interactions fail?
     #  Make it properly async maybe, to allow longer delays? Or ideally just more efficient.
-    if 'field scout' in [move.lower() for move in character.get_all_moves() if isinstance(move, str)]:
+    if 'field scout' in [move.lower() for move in await character.get_all_moves() if isinstance(move, str)]:
         confidence_desperation = 'Confidence'
 
     if confidence_desperation:
@@ -377,7 +419,7 @@ async def read_the_room_command(
         elif confidence_desperation.title() == 'Desperation':
             desperation = True
 
-    response, total = roll_action(
+    response, total = await roll_action(
         game=astir.games[ctx.guild_id],
         username=ctx.user.name,
         trait=AstirTrait.SENSE.value,
@@ -412,7 +454,7 @@ async def dispel_uncertainties_command(
         elif confidence_desperation.title() == 'Desperation':
             desperation = True
 
-    response, total = roll_action(
+    response, total = await roll_action(
         game=astir.games[ctx.guild_id],
         username=ctx.user.name,
         trait=AstirTrait.KNOW.value,
@@ -448,7 +490,7 @@ async def help_or_hinder_command(
         elif confidence_desperation.title() == 'Desperation':
             desperation = True
 
-    response, total = roll_action(
+    response, total = await roll_action(
         game=astir.games[ctx.guild_id],
         username=ctx.user.name,
         trait=None,
@@ -484,7 +526,7 @@ async def weave_magic_command(
         elif confidence_desperation.title() == 'Desperation':
             desperation = True
 
-    response, total = roll_action(
+    response, total = await roll_action(
         game=astir.games[ctx.guild_id],
         username=ctx.user.name,
         trait=AstirTrait.CHANNEL.value, # This was +3 for Simon for some reason? Should be +2
@@ -520,7 +562,7 @@ async def cool_off_command(
         elif confidence_desperation.title() == 'Desperation':
             desperation = True
 
-    response, total = roll_action(
+    response, total = await roll_action(
         game=astir.games[ctx.guild_id],
         username=ctx.user.name,
         trait=trait,
@@ -556,7 +598,7 @@ async def exchange_blows_command(
         elif confidence_desperation.title() == 'Desperation':
             desperation = True
 
-    response, total = roll_action(
+    response, total = await roll_action(
         game=astir.games[ctx.guild_id],
         username=ctx.user.name,
         trait=trait,
@@ -592,7 +634,7 @@ async def strike_decisively_command(
         elif confidence_desperation.title() == 'Desperation':
             desperation = True
 
-    response, total = roll_action(
+    response, total = await roll_action(
         game=astir.games[ctx.guild_id],
         username=ctx.user.name,
         trait=trait,
@@ -629,7 +671,7 @@ async def bite_the_dust_command(
         elif confidence_desperation.title() == 'Desperation':
             desperation = True
 
-    response, total = roll_action(
+    response, total = await roll_action(
         game=astir.games[ctx.guild_id],
         username=ctx.user.name,
         trait=AstirTrait.DEFY.value,
@@ -683,7 +725,7 @@ async def bite_the_dust_command(
         elif confidence_desperation.title() == 'Desperation':
             desperation = True
 
-    response, total = roll_action(
+    response, total = await roll_action(
         game=astir.games[ctx.guild_id],
         username=ctx.user.name,
         trait=AstirTrait.CHANNEL.value,
@@ -728,7 +770,7 @@ async def scout_mobility_command(
         elif confidence_desperation.title() == 'Desperation':
             desperation = True
 
-    response, total = roll_action(
+    response, total = await roll_action(
         game=astir.games[ctx.guild_id],
         username=ctx.user.name,
         trait=AstirTrait.DEFY.value, # TODO These should come from the move itself. A lot of these can honestly just be thin wrappers passing in a move.
@@ -772,7 +814,7 @@ async def revenant_never_quite_free_command(
         elif confidence_desperation.title() == 'Desperation':
             desperation = True
 
-    response, total = roll_action(
+    response, total = await roll_action(
         game=astir.games[ctx.guild_id],
         username=ctx.user.name,
         trait=AstirTrait.CHANNEL.value,
@@ -844,7 +886,7 @@ async def lead_a_sortie_command(
         elif confidence_desperation.title() == 'Desperation':
             desperation = True
 
-    response, total = roll_action(
+    response, total = await roll_action(
         game=astir.games[ctx.guild_id],
         username=ctx.user.name,
         trait=skill,
@@ -886,7 +928,7 @@ async def cause_conflict_roll_command(
     opponent_faction_strength: discord.Option(str, choices=['Major', 'Minor'], description='How strong is the Authority faction?'),
 ):
 
-    response, total = roll_action(
+    response, total = await roll_action(
         game=astir.games[ctx.guild_id],
         username=ctx.user.name,
         trait=None,
@@ -919,7 +961,7 @@ async def authority_conflict_roll_command(
     faction_strength: discord.Option(str, choices=['Major', 'Minor'], description='How strong is the Authority faction?'),
 ):
 
-    response, total = roll_action(
+    response, total = await roll_action(
         game=astir.games[ctx.guild_id],
         username=ctx.user.name,
         trait=None,
@@ -998,7 +1040,9 @@ async def link_command(
 
     interaction = await ctx.respond('Linking...')
 
-    response = link(astir, ctx.guild_id, spreadsheet_url)
+    # Linking constructs the game and its characters from the sheet, so keep that off the event loop
+    with sheets_priority_lane(Priority.LOW):
+        response = await asyncio.to_thread(link, astir, ctx.guild_id, spreadsheet_url)
 
     await interaction.edit(content=response)
 
@@ -1066,13 +1110,23 @@ def main():
 
     dotenv.load_dotenv()
 
+    if 'SHEETS_BATCH_WINDOW_MS' in os.environ:
+        configure_batching(window_ms=float(os.environ['SHEETS_BATCH_WINDOW_MS']))
+
+    if os.environ.get('SHEETS_SNAPSHOT_MODE', '').lower() in ['1', 'true']:
+        CharacterSheet.SNAPSHOT_MODE = True
+
+    if os.environ.get('SHEETS_HEDGING', '').lower() in ['1', 'true']:
+        configure_hedging(HedgingPolicy())
+
     atexit.register(send_email, message='Astir has stopped running.')
 
     for server_data_dir in glob.glob(os.path.join('servers', '*')):
         guild_id = int(server_data_dir.split(os.sep)[1])
 
         try:
-            game = AstirGame.load(guild_id)
+            with sheets_priority_lane(Priority.LOW), sheets_guild(guild_id): # Restoring games mustn't starve anyone already rolling
+                game = AstirGame.load(guild_id)
 
             astir.add_game(game=game)
 
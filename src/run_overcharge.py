@@ -4,6 +4,7 @@ from discord.ext.pages import Page, Paginator
 import requests
 import dotenv
 
+import asyncio
 import json
 import random
 import os
@@ -15,6 +16,11 @@ from typing import Callable, Union, Literal
 from src.Roll import Roll
 from src.utils.format import bold, underline, code
 from src.utils.logger import get_logger
+from src.utils.sheets_scheduler import sheets_priority_lane, Priority
+from src.utils.sheets_retry import track_command_retries
+from src.utils.sheets_budget import track_command_usage, get_stale_notice
+from src.utils.sheets_keys import sheets_guild
+from src.utils.deadline import command_deadline, get_command_deadline, auto_deferring
 from src.utils.exceptions import BotError, NoCharacterError, NoGameError, UnknownSystemError
 from src.overcharge.Overcharge import Overcharge
 from src.overcharge.DieGame import DieGame
@@ -70,7 +76,27 @@ def command_logging_decorator(command: Callable):
         log_message = f'Command {command.__name__} called in Guild {guild_id} ("{guild_name}") by {user_name} with args {args} and kwargs {kwargs}'[:3000]
         logger.info(log_message)
 
-        return await command(*args, ctx=ctx, **kwargs)
+        with (
+            command_deadline(get_command_deadline(command.__name__)) as deadline,
+            track_command_retries(command.__name__) as command_retries,
+            track_command_usage(command.__name__) as command_usage,
+            sheets_guild(guild_id if isinstance(guild_id, int) else None)
+        ):
+            async with auto_deferring(ctx, deadline): # Rather than let the interaction expire on a slow sheet
+                result = await command(*args, ctx=ctx, **kwargs)
+
+        if command_retries.retries:
+            logger.info(f'Command {command.__name__} retried Sheets calls {command_retries.retries} times, adding {command_retries.added_latency:.2f}s')
+
+        if command_usage.calls or command_usage.served_stale:
+            logger.info(f'Command {command.__name__} used {command_usage.summary()}')
+
+        stale_notice = get_stale_notice(command_usage)
+
+        if stale_notice is not None and isinstance(ctx, discord.ApplicationContext):
+            await ctx.respond(stale_notice, ephemeral=True)
+
+        return result
 
     return wrapper
 
@@ -226,7 +252,9 @@ async def add_character_command(
 ):
     interaction = await ctx.respond('Adding character...')
 
-    response = add_character(
+    # Adding a character reads the sheet whilst constructing it, so keep that off the event loop
+    response = await asyncio.to_thread(
+        add_character,
         game=overcharge.games[ctx.guild_id],
         discord_username=ctx.user.name,
         discord_display_name=ctx.user.display_name,
@@ -336,7 +364,9 @@ async def link_command(
 
     interaction = await ctx.respond('Linking...')
 
-    response = link(overcharge, ctx.guild_id, spreadsheet_url)
+    # Linking constructs the game and its characters from the sheet, so keep that off the event loop
+    with sheets_priority_lane(Priority.LOW):
+        response = await asyncio.to_thread(link, overcharge, ctx.guild_id, spreadsheet_url)
 
     await interaction.edit(content=response)
 
@@ -407,7 +437,8 @@ def main():
             guild_id = int(server_data_dir.split(os.sep)[1])
 
             try:
-                game = DieGame.load(guild_id)
+                with sheets_priority_lane(Priority.LOW), sheets_guild(guild_id): # Restoring games mustn't starve anyone already rolling
+                    game = DieGame.load(guild_id)
 
                 overcharge.add_game(game=game)
 
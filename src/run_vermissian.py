@@ -6,6 +6,7 @@ from discord.ext.pages import Page, Paginator
 import requests
 import dotenv
 
+import asyncio
 import json
 import random
 import os
@@ -18,14 +19,22 @@ from typing import Callable, Union, Set, Dict
 
 
 from src.System import System
+from src.CharacterSheet import CharacterSheet
 from src.Roll import Roll, Cut
 from src.utils.format import bold, underline, code, bullet, strikethrough
 from src.utils.logger import get_logger
+from src.utils.sheets_scheduler import sheets_priority_lane, Priority
+from src.utils.sheets_retry import track_command_retries
+from src.utils.sheets_budget import track_command_usage, get_stale_notice
+from src.utils.sheets_keys import sheets_guild
+from src.utils.deadline import command_deadline, get_command_deadline, auto_deferring
 from src.utils.exceptions import BotError, NoCharacterError, NoGameError, UnknownSystemError
+from src.utils.google_sheets import configure_batching
+from src.utils.sheets_hedging import configure_hedging, HedgingPolicy
 from src.vermissian.Vermissian import Vermissian
 from src.vermissian.ResistanceGame import ResistanceGame, HeartGame
 from src.vermissian.ResistanceCharacterSheet import SpireCharacter, SpireSkill, SpireDomain, HeartSkill, HeartDomain
-from src.commands import get_privacy_policy, get_donate, get_commands_page_content, get_character_list, help_roll, should_respond
+from src.commands import get_privacy_policy, get_donate, get_commands_page_content, get_character_list, help_roll, should_respond, refresh
 from src.vermissian.commands import get_credits, get_legal, get_about, get_getting_started_page_content, \
     get_debugging_page_content, get_tag, get_ability, get_delve_draw, link, unlink, spire_fallout, roll_spire_action, \
     heart_fallout, roll_heart_action, add_character, log_suggestion, simple_roll, get_changelog, roll_circulation, NEWSPAPERS
@@ -88,7 +97,27 @@ def command_logging_decorator(command: Callable):
         log_message = f'Command {command.__name__} called in Guild {guild_id} ("{guild_name}") by {user_name} with args {args} and kwargs {kwargs}'[:3000]
         logger.info(log_message)
 
-        return await command(*args, ctx=ctx, **kwargs)
+        with (
+            command_deadline(get_command_deadline(command.__name__)) as deadline,
+            track_command_retries(command.__name__) as command_retries,
+            track_command_usage(command.__name__) as command_usage,
+            sheets_guild(guild_id if isinstance(guild_id, int) else None)
+        ):
+            async with auto_deferring(ctx, deadline): # Rather than let the interaction expire on a slow sheet
+                result = await command(*args, ctx=ctx, **kwargs)
+
+        if command_retries.retries:
+            logger.info(f'Command {command.__name__} retried Sheets calls {command_retries.retries} times, adding {command_retries.added_latency:.2f}s')
+
+        if command_usage.calls or command_usage.served_stale:
+            logger.info(f'Command {command.__name__} used {command_usage.summary()}')
+
+        stale_notice = get_stale_notice(command_usage)
+
+        if stale_notice is not None and isinstance(ctx, discord.ApplicationContext):
+            await ctx.respond(stale_notice, ephemeral=True)
+
+        return result
 
     return wrapper
 
@@ -222,6 +251,17 @@ async def list_characters_command(
 
     await ctx.respond(message)
 
+@vermissian.slash_command(name='refresh', description='Re-reads your character sheet on your next command, instead of using recently read values.')
+@command_logging_decorator
+@error_responder_decorator
+@character_required_decorator
+async def refresh_command(
+    ctx: discord.ApplicationContext,
+):
+    response = refresh(vermissian.games[ctx.guild_id], ctx.user.name)
+
+    await ctx.respond(response, ephemeral=True)
+
 # TODO Allow optionally specifying system (or both), otherwise fallback to reading from server, otherwise both.
 @vermissian.slash_command(name='tag', description='Describes a given resource or equipment tag')
 @command_logging_decorator
@@ -275,7 +315,9 @@ async def add_character_command(
 ):
     interaction = await ctx.respond('Adding character...')
 
-    response = add_character(
+    # Adding a character reads the sheet whilst constructing it, so keep that off the event loop
+    response = await asyncio.to_thread(
+        add_character,
         game=vermissian.games[ctx.guild_id],
         discord_username=ctx.user.name,
         discord_display_name=ctx.user.display_name,
@@ -296,7 +338,7 @@ async def roll_spire_action_command(
     num_helpers: discord.Option(int, 'How many other players are helping? (Requires relevant skill or domain, shares stress)', default=0, min=0),
     difficulty: discord.Option(int, "Difficulty of the action", default=0, min_value=0, max_value=2)
 ):
-    response, view = roll_spire_action(
+    response, view = await roll_spire_action(
         game=vermissian.games[ctx.guild_id],
         username=ctx.user.name,
         skill=skill,
@@ -320,7 +362,7 @@ async def roll_heart_action_command(
     num_helpers: discord.Option(int, 'How many other players are helping? (Requires relevant skill or domain, shares stress)', default=0, min=0),
     difficulty: discord.Option(int, "Difficulty of the action", default=0, min_value=0, max_value=2)
 ):
-    response, view = roll_heart_action(
+    response, view = await roll_heart_action(
         game=vermissian.games[ctx.guild_id],
         username=ctx.user.name,
         skill=skill,
@@ -340,7 +382,7 @@ async def spire_fallout_command( # TODO Nice to not always have to specify resis
     ctx: discord.ApplicationContext,
     resistance: discord.Option(str, 'Resistance track that triggered this', choices=SpireCharacter.RESISTANCES, default=None)
 ):
-    response = spire_fallout(
+    response = await spire_fallout(
         vermissian.games[ctx.guild_id],
         ctx.user.name,
         resistance
@@ -355,7 +397,7 @@ async def spire_fallout_command( # TODO Nice to not always have to specify resis
 async def heart_fallout_command(
     ctx: discord.ApplicationContext
 ):
-    response = heart_fallout(
+    response = await heart_fallout(
         vermissian.games[ctx.guild_id],
         ctx.user.name
     )
@@ -503,7 +545,9 @@ async def link_command(
 
     interaction = await ctx.respond('Linking...')
 
-    response = link(vermissian, ctx.guild_id, system, spreadsheet_url, less_lethal)
+    # Linking constructs the game and its characters from the sheet, so keep that off the event loop
+    with sheets_priority_lane(Priority.LOW):
+        response = await asyncio.to_thread(link, vermissian, ctx.guild_id, system, spreadsheet_url, less_lethal)
 
     await interaction.edit(content=response)
 
@@ -570,13 +614,23 @@ def main():
 
     dotenv.load_dotenv()
 
+    if 'SHEETS_BATCH_WINDOW_MS' in os.environ:
+        configure_batching(window_ms=float(os.environ['SHEETS_BATCH_WINDOW_MS']))
+
+    if os.environ.get('SHEETS_SNAPSHOT_MODE', '').lower() in ['1', 'true']:
+        CharacterSheet.SNAPSHOT_MODE = True
+
+    if os.environ.get('SHEETS_HEDGING', '').lower() in ['1', 'true']:
+        configure_hedging(HedgingPolicy())
+
     atexit.register(send_email, message='Vermissian has stopped running.')
 
     for server_data_dir in glob.glob(os.path.join('servers', '*')):
         guild_id = int(server_data_dir.split(os.sep)[1])
 
         try:
-            game = ResistanceGame.load(guild_id)
+            with sheets_priority_lane(Priority.LOW), sheets_guild(guild_id): # Restoring games mustn't starve anyone already rolling
+                game = ResistanceGame.load(guild_id)
 
             vermissian.add_game(game=game)
 
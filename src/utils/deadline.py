@@ -0,0 +1,113 @@
+import asyncio
+import contextlib
+import contextvars
+import time
+from typing import Dict, Optional
+
+from src.utils.logger import get_logger
+
+INTERACTION_DEADLINE = 3 # Seconds Discord gives us to respond to an interaction
+DEFERRED_DEADLINE = 12 # Seconds a command gets once it's deferred - Discord would wait longer, but the user won't
+DEADLINE_MARGIN = 0.5 # Left over for actually responding
+AUTO_DEFER_AT = 1.0 # Seconds left before the interaction's deferred, if nothing's responded yet
+
+# Commands that respond straight away and edit that response once done, so aren't held to Discord's window
+COMMAND_DEADLINES: Dict[str, float] = {
+    'link_command': 60,
+    'add_character_command': 30,
+}
+
+class Deadline:
+    """
+    When the current command has to have responded by. Created by the command decorators and read by everything under
+    them, down to each Sheets call's timeouts and retry decisions.
+    """
+
+    def __init__(self, seconds: float = INTERACTION_DEADLINE):
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + seconds
+
+        self.deferred = False
+
+    def get_remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    def defer(self, seconds: float = DEFERRED_DEADLINE):
+        """
+        The interaction's been deferred, so there's now as long as a follow up is allowed to take instead.
+        """
+
+        self.deferred = True
+        self.extend_to(time.monotonic() + seconds)
+
+    def extend_to(self, expires_at: float):
+        self.expires_at = max(self.expires_at, expires_at)
+
+current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar('current_deadline', default=None)
+
+def get_command_deadline(command_name: str) -> float:
+    return COMMAND_DEADLINES.get(command_name, INTERACTION_DEADLINE)
+
+@contextlib.contextmanager
+def command_deadline(seconds: float = INTERACTION_DEADLINE):
+    deadline = Deadline(seconds)
+
+    token = current_deadline.set(deadline)
+
+    try:
+        yield deadline
+    finally:
+        current_deadline.reset(token)
+
+def get_remaining_time() -> Optional[float]:
+    """
+    Seconds the current command has left to use, keeping back enough to respond in, or None if it's not running under a
+    deadline at all.
+    """
+
+    deadline = current_deadline.get()
+
+    if deadline is None:
+        return None
+
+    return deadline.get_remaining() - DEADLINE_MARGIN
+
+async def auto_defer(ctx, deadline: Deadline, defer_at: float = AUTO_DEFER_AT):
+    """
+    Defers the interaction once the deadline's nearly up, unless the command's already responded, and gives the command
+    the longer deferred deadline to finish in.
+    """
+
+    await asyncio.sleep(max(deadline.get_remaining() - defer_at, 0))
+
+    if ctx.response.is_done():
+        return
+
+    try:
+        await ctx.defer()
+    except Exception as e: # Most likely the command responded in the meantime
+        get_logger().warning(f'Could not defer interaction: {type(e).__name__}: {e}')
+
+        return
+
+    deadline.defer()
+
+    get_logger().info(f'Deferred interaction with {deadline.get_remaining():.2f}s now left.')
+
+@contextlib.asynccontextmanager
+async def auto_deferring(ctx, deadline: Deadline):
+    """
+    Runs auto_defer alongside the block. Autocompletes can't be deferred, so those are left alone.
+    """
+
+    if not hasattr(ctx, 'defer'):
+        yield
+
+        return
+
+    auto_defer_task = asyncio.create_task(auto_defer(ctx, deadline))
+
+    try:
+        yield
+    finally:
+        auto_defer_task.cancel()
@@ -1,4 +1,5 @@
 import abc
+from typing import Optional
 
 from src.System import System
 
@@ -64,5 +65,19 @@ class ForbiddenSpreadsheetError(BotError):
         super().__init__(msg.format(spreadsheet_id), * args)
 
 class TooManyRequestsError(BotError):
-    def __init__(self, msg: str = 'The spreadsheets are currently overloaded - please wait a minute and try again.', * args):
+    def __init__(self, msg: str = 'The spreadsheets are currently overloaded - please wait a minute and try again.', * args, retry_after: Optional[float] = None):
         super().__init__(msg, *args)
+
+        self.retry_after = retry_after
+
+class SheetsBudgetExceededError(BotError):
+    def __init__(self, msg: str = 'That needed more spreadsheet reads than /{} is allowed ({}) - please try again in a moment.', * args, command_name: str, budget: int):
+        super().__init__(msg.format(command_name.removesuffix('_command'), budget), * args)
+
+        self.budget = budget
+
+class SpreadsheetUnavailableError(BotError):
+    def __init__(self, msg: str = 'The spreadsheet with ID {} keeps failing to load, so it\'s being left alone for a little while - please check it still exists and try again in a minute.', * args, spreadsheet_id: str, failure_class: Optional[str] = None):
+        super().__init__(msg.format(spreadsheet_id), * args)
+
+        self.failure_class = failure_class
@@ -1,26 +1,50 @@
 import string
 
+import aiohttp
 import requests
+import yarl
 from urllib.parse import urlparse
 
-import json
+import asyncio
+import concurrent.futures
+import contextvars
 import re
 import collections
 import time
-from string import ascii_uppercase
-from typing import List, Dict, Union, Optional
+from typing import List, Dict, Tuple, Union, Optional, Iterable
 
-from src.utils.exceptions import ForbiddenSpreadsheetError, TooManyRequestsError
+from src.utils.exceptions import BotError, ForbiddenSpreadsheetError, TooManyRequestsError, SpreadsheetUnavailableError
 from src.utils.logger import get_logger
+from src.utils.sheets_session import get_session, get_async_session, get_request_timeout, get_async_request_timeout
+from src.utils.sheets_cache import get_sheets_cache
+from src.utils.single_flight import SingleFlight
+from src.utils.shared_fetch import SharedFetch
+from src.utils.sheets_batcher import SheetsBatcher
+from src.utils.sheets_scheduler import SheetsScheduler, get_scheduler, sheets_priority_lane, sheets_priority, Priority
+from src.utils.sheets_hedging import get_hedging_policy, get_latency_tracker
+from src.utils.sheets_retry import (
+    get_retry_delay, record_retry, parse_retry_after, classify_error, get_remaining_budget, current_command_retries,
+    RETRY_POLICIES
+)
+from src.utils.deadline import current_deadline, get_remaining_time
+from src.utils.sheets_keys import get_key_pool, configure_key_pool, load_key_pool, current_guild_id
+from src.utils.sheets_metadata import get_metadata_store
+from src.utils.sheets_breaker import get_spreadsheet_breaker, classify_failure
+from src.utils.sheets_budget import charge_call, check_budget, record_usage, is_over_budget, current_command_usage
+from src.utils.sheets_requests import RangeKey, ValuesRequest, ValueRenderOption, build_values_requests, get_sheets_api_url, count_cells, merge_values_responses
+from src.utils.sheet_references import (
+    CellRef, to_reference, column_offset_to_column_name, column_name_to_column_offset, get_bounding_box
+)
 
 def get_key():
-    if not hasattr(get_key, 'key'):
-        with open('credentials_vermissian.json', 'r') as f:
-            credentials = json.load(f)
+    """
+    The API key for the next Sheets call - the guild's own if it's brought one, else the least loaded of ours.
+    """
 
-            get_key.key = credentials['google_sheets_api_key']
+    if get_key_pool() is None:
+        configure_key_pool(load_key_pool())
 
-    return get_key.key
+    return get_key_pool().select_key(current_guild_id.get())
 
 def get_spreadsheet_id(spreadsheet_url: str) -> Optional[str]:
     tokens = urlparse(spreadsheet_url).path.split('/')  # TODO Check for if we need to sanitise this
@@ -42,17 +66,61 @@ def get_spreadsheet_sheet_gid(spreadsheet_url: str) -> Optional[int]:
     else:
         return int(gid_match.group(1))
 
+def get_known_spreadsheet_metadata(spreadsheet_id: str, force: bool = False) -> Dict[int, str]:
+    """
+    The spreadsheet's GID -> tab title map, from the metadata store where possible. Only goes to the API if the
+    spreadsheet isn't known yet, its entry is due revalidating, or force is set - and even then only that spreadsheet's
+    entry is replaced.
+    """
+
+    store = get_metadata_store()
+
+    metadata = None if force else store.get(spreadsheet_id)
+
+    if metadata is None:
+        metadata = store.set(spreadsheet_id, get_spreadsheet_metadata(spreadsheet_id))
+
+    return metadata
+
+async def get_known_spreadsheet_metadata_async(spreadsheet_id: str, force: bool = False) -> Dict[int, str]:
+    """
+    Async equivalent of get_known_spreadsheet_metadata, sharing the same metadata store.
+    """
+
+    store = get_metadata_store()
+
+    metadata = None if force else store.get(spreadsheet_id)
+
+    if metadata is None:
+        metadata = await store.set_async(spreadsheet_id, await get_spreadsheet_metadata_async(spreadsheet_id))
+
+    return metadata
+
 def get_sheet_name_from_gid(spreadsheet_id: str, gid: int, force: bool = False):
-    if force or not hasattr(get_sheet_name_from_gid, 'metadata'):
-        get_sheet_name_from_gid.metadata = {}
+    metadata = get_known_spreadsheet_metadata(spreadsheet_id, force=force)
 
-    if spreadsheet_id not in get_sheet_name_from_gid.metadata:
-        get_sheet_name_from_gid.metadata[spreadsheet_id] = get_spreadsheet_metadata(spreadsheet_id)
+    if gid not in metadata and not force: # Could be a tab added since we last looked
+        metadata = get_known_spreadsheet_metadata(spreadsheet_id, force=True)
 
-    if gid in get_sheet_name_from_gid.metadata[spreadsheet_id]:
-        return get_sheet_name_from_gid.metadata[spreadsheet_id][gid]
+    if gid in metadata:
+        return metadata[gid]
     else:
-        raise IndexError(f'Cannot find GID "{gid}" in the known spreadsheets: {get_sheet_name_from_gid.metadata}.')
+        raise IndexError(f'Cannot find GID "{gid}" in spreadsheet "{spreadsheet_id}": {metadata}.')
+
+async def get_sheet_name_from_gid_async(spreadsheet_id: str, gid: int, force: bool = False):
+    """
+    Async equivalent of get_sheet_name_from_gid, sharing the same metadata store.
+    """
+
+    metadata = await get_known_spreadsheet_metadata_async(spreadsheet_id, force=force)
+
+    if gid not in metadata and not force:
+        metadata = await get_known_spreadsheet_metadata_async(spreadsheet_id, force=True)
+
+    if gid in metadata:
+        return metadata[gid]
+    else:
+        raise IndexError(f'Cannot find GID "{gid}" in spreadsheet "{spreadsheet_id}": {metadata}.')
 
 def get_spreadsheet_metadata(spreadsheet_id: str) -> Dict[int, str]:
     logger = get_logger()
@@ -60,34 +128,322 @@ def get_spreadsheet_metadata(spreadsheet_id: str) -> Dict[int, str]:
     key = get_key()
 
     try:
-        response = requests.get(f'https://sheets.googleapis.com/v4/spreadsheets/{spreadsheet_id}?key={key}&fields=sheets.properties')
+        response_json = _request_json(f'{get_sheets_api_url()}/{spreadsheet_id}?key={key}&fields=sheets.properties(sheetId,title)', spreadsheet_id)
 
-        check_response(response, spreadsheet_id)
-
-        return {
-            sheet['properties']['sheetId']: sheet['properties']['title'] for sheet in response.json()['sheets']
-        }
+        return _parse_metadata_response(response_json)
 
     except requests.HTTPError as h:
         logger.error(h, exc_info=True)
 
         raise h
 
+async def get_spreadsheet_metadata_async(spreadsheet_id: str) -> Dict[int, str]:
+    logger = get_logger()
+
+    key = get_key()
+
+    try:
+        response_json = await _request_json_async(f'{get_sheets_api_url()}/{spreadsheet_id}?key={key}&fields=sheets.properties(sheetId,title)', spreadsheet_id)
+
+        return _parse_metadata_response(response_json)
+
+    except aiohttp.ClientResponseError as c:
+        logger.error(c, exc_info=True)
+
+        raise c
+
+def _request_json(url: str, spreadsheet_id: str) -> Dict:
+    """
+    Makes a Sheets GET once the scheduler has quota for it, retrying transient failures (429s, 5xxs, dropped connections)
+    with backoff for as long as the command's deadline allows. A 429 also drains the scheduler's buckets, so that
+    everything else queues rather than hitting it too. Spreadsheets whose circuit is open fail fast without any of that.
+    """
+
+    breaker = get_spreadsheet_breaker()
+
+    breaker.before_call(spreadsheet_id)
+
+    try:
+        response_json = _request_json_with_retries(url, spreadsheet_id)
+    except BaseException as e: # Including cancellation, which is inconclusive, so a cancelled probe still frees up the next
+        breaker.record_failure(spreadsheet_id, e)
+
+        raise e
+
+    breaker.record_success(spreadsheet_id)
+
+    return response_json
+
+def _request_json_with_retries(url: str, spreadsheet_id: str) -> Dict:
+    scheduler = get_scheduler()
+
+    retry_number = 0
+
+    while True:
+        charge_call()
+
+        url, uses_shared_quota = _assign_key(url)
+
+        if uses_shared_quota: # Guilds' own keys have their own quota
+            scheduler.acquire()
+
+        attempt_start_time = time.monotonic()
+
+        try:
+            response = get_session().get(url, timeout=get_request_timeout())
+
+            check_response(response, spreadsheet_id)
+
+            get_latency_tracker().record(spreadsheet_id, time.monotonic() - attempt_start_time)
+
+            record_usage(num_bytes=_get_content_length(response.headers))
+
+            return response.json()
+        except Exception as e:
+            delay = get_retry_delay(e, retry_number)
+
+            if isinstance(e, TooManyRequestsError):
+                delay = _on_rate_limited(url, e, delay, retry_number, scheduler)
+
+            if delay is None:
+                raise e
+
+            get_logger().warning(f'Retrying Sheets call in {delay:.2f}s after {type(e).__name__}: {e}')
+
+            record_retry(delay + time.monotonic() - attempt_start_time)
+
+            time.sleep(delay)
+
+            retry_number += 1
+
+async def _request_json_async(url: str, spreadsheet_id: str) -> Dict:
+    breaker = get_spreadsheet_breaker()
+
+    breaker.before_call(spreadsheet_id)
+
+    try:
+        response_json = await _request_json_hedged_async(url, spreadsheet_id)
+    except BaseException as e: # Including cancellation, which is inconclusive, so a cancelled probe still frees up the next
+        breaker.record_failure(spreadsheet_id, e)
+
+        raise e
+
+    breaker.record_success(spreadsheet_id)
+
+    return response_json
+
+def _get_hedge_delay(spreadsheet_id: str) -> Optional[float]:
+    """
+    How long to give an interactive read before hedging it, or None if it shouldn't be hedged at all.
+    """
+
+    policy = get_hedging_policy()
+
+    remaining_time = get_remaining_time()
+
+    if policy is None or remaining_time is None or sheets_priority.get() != Priority.HIGH:
+        return None
+
+    usual_latency = get_latency_tracker().get_percentile(spreadsheet_id, policy.percentile)
+
+    if usual_latency is None:
+        return None
+
+    hedge_delay = max(usual_latency, policy.min_delay)
+
+    if hedge_delay >= remaining_time: # A hedge sent then couldn't come back in time anyway
+        return None
+
+    return hedge_delay
+
+async def _request_json_hedged_async(url: str, spreadsheet_id: str) -> Dict:
+    """
+    If hedging's on and an interactive read hasn't come back by its spreadsheet's usual p95, sends one duplicate and takes
+    whichever answers first. Reads are idempotent, so the other is just cancelled. Never hedges while quota's under any
+    pressure or the command's out of calls, as then the duplicate would only slow everyone else down.
+    """
+
+    hedge_delay = _get_hedge_delay(spreadsheet_id)
+
+    if hedge_delay is None:
+        return await _request_json_with_retries_async(url, spreadsheet_id)
+
+    policy = get_hedging_policy()
+
+    primary = asyncio.ensure_future(_request_json_with_retries_async(url, spreadsheet_id))
+    pending = {primary}
+
+    try:
+        done, pending = await asyncio.wait(pending, timeout=hedge_delay)
+
+        if primary in done:
+            return primary.result()
+
+        if is_over_budget() or not get_scheduler().has_headroom(policy.min_headroom):
+            policy.stats['skipped_no_headroom'] += 1
+
+            return await primary
+
+        policy.stats['hedged'] += 1
+
+        hedge = asyncio.ensure_future(_request_json_with_retries_async(url, spreadsheet_id))
+        pending = {primary, hedge}
+
+        while len(pending):
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        policy.stats['hedge_won'] += 1
+
+                    return task.result()
+
+        return primary.result() # Both failed, so raise the original's error
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def _request_json_with_retries_async(url: str, spreadsheet_id: str) -> Dict:
+    scheduler = get_scheduler()
+
+    retry_number = 0
+
+    while True:
+        charge_call()
+
+        url, uses_shared_quota = _assign_key(url)
+
+        if uses_shared_quota:
+            await scheduler.acquire_async()
+
+        attempt_start_time = time.monotonic()
+
+        try:
+            async with get_async_session().get(yarl.URL(url, encoded=True), timeout=get_async_request_timeout()) as response: # Already percent-encoded
+                await check_async_response(response, spreadsheet_id)
+
+                record_usage(num_bytes=_get_content_length(response.headers))
+
+                response_json = await response.json()
+
+            get_latency_tracker().record(spreadsheet_id, time.monotonic() - attempt_start_time)
+
+            return response_json
+        except Exception as e:
+            delay = get_retry_delay(e, retry_number)
+
+            if isinstance(e, TooManyRequestsError):
+                delay = _on_rate_limited(url, e, delay, retry_number, scheduler)
+
+            if delay is None:
+                raise e
+
+            get_logger().warning(f'Retrying Sheets call in {delay:.2f}s after {type(e).__name__}: {e}')
+
+            record_retry(delay + time.monotonic() - attempt_start_time)
+
+            await asyncio.sleep(delay)
+
+            retry_number += 1
+
+def _could_be_renamed_tab(error: Exception) -> bool:
+    """
+    Whether looking the tab up again by GID might help. It won't if the whole spreadsheet is forbidden, broken or out of
+    quota - that'd just spend another call on metadata.
+    """
+
+    return not isinstance(error, BotError) and classify_error(error) is None and classify_failure(error) is None
+
+def _get_url_key(url: str) -> Optional[str]:
+    key_match = re.search('[?&]key=([^&]*)', url)
+
+    return None if key_match is None else key_match.group(1)
+
+def _replace_url_key(url: str, key: str) -> str:
+    return re.sub('([?&]key=)[^&]*', lambda key_match: key_match.group(1) + key, url, count=1)
+
+def _assign_key(url: str) -> Tuple[str, bool]:
+    """
+    Puts the key this attempt should go out on into the URL - chosen now rather than when the URL was built, so a burst of
+    reads spreads over the keys. Also returns whether the call counts against the operator keys' shared quota.
+    """
+
+    key_pool = get_key_pool()
+
+    if key_pool is None:
+        return url, True
+
+    key = key_pool.take_key(current_guild_id.get())
+
+    return _replace_url_key(url, key), not key_pool.is_guild_key(key)
+
+def _on_rate_limited(url: str, error: TooManyRequestsError, delay: Optional[float], retry_number: int, scheduler: SheetsScheduler) -> Optional[float]:
+    """
+    Rests the key that got the 429 and, if another key has quota left, retries on that straight away instead. Only once
+    they're all out is the scheduler drained, so that everything queues.
+    """
+
+    key_pool = get_key_pool()
+
+    if key_pool is None:
+        scheduler.record_rate_limited()
+
+        return delay
+
+    key = _get_url_key(url)
+
+    key_pool.record_rate_limited(key, error.retry_after)
+
+    if key_pool.is_available(key_pool.select_key(current_guild_id.get())):
+        return 0 if retry_number < RETRY_POLICIES['rate_limited'].max_retries else None
+
+    if not key_pool.is_guild_key(key):
+        scheduler.record_rate_limited()
+
+    return delay
+
+def _get_content_length(headers) -> int:
+    """
+    Bytes as sent over the wire, so compressed if they were. Zero if the server didn't say.
+    """
+
+    try:
+        return int(headers.get('Content-Length', 0))
+    except (TypeError, ValueError):
+        return 0
+
+def _parse_metadata_response(response_json: Dict) -> Dict[int, str]:
+    return {
+        sheet['properties']['sheetId']: sheet['properties']['title'] for sheet in response_json['sheets']
+    }
+
 def check_response(response: requests.Response, spreadsheet_id: str):
     if response.status_code == 403 and response.json()['error']['status'] == 'PERMISSION_DENIED':
         raise ForbiddenSpreadsheetError(spreadsheet_id=spreadsheet_id)
     elif response.status_code == 429 and response.json()['error']['status'] == 'RESOURCE_EXHAUSTED':
-        raise TooManyRequestsError()
+        raise TooManyRequestsError(retry_after=parse_retry_after(response.headers.get('Retry-After')))
 
     response.raise_for_status()
 
-def check_is_valid_range_or_cell(range_or_cell):
-    single_cell_regex = '[A-Z]+\d+'
-    cell_range_regex = f'{single_cell_regex}:{single_cell_regex}'
+async def check_async_response(response: aiohttp.ClientResponse, spreadsheet_id: str):
+    if response.status == 403 and (await response.json())['error']['status'] == 'PERMISSION_DENIED':
+        raise ForbiddenSpreadsheetError(spreadsheet_id=spreadsheet_id)
+    elif response.status == 429 and (await response.json())['error']['status'] == 'RESOURCE_EXHAUSTED':
+        raise TooManyRequestsError(retry_after=parse_retry_after(response.headers.get('Retry-After')))
+
+    response.raise_for_status()
 
+def check_is_valid_range_or_cell(range_or_cell):
     if not isinstance(range_or_cell, str):
         raise ValueError(f'range_or_cell must be str, not {range_or_cell}')
-    elif not re.fullmatch(single_cell_regex, range_or_cell) and not re.fullmatch(cell_range_regex, range_or_cell):
+
+    try:
+        reference = to_reference(range_or_cell)
+    except ValueError:
+        raise ValueError(f'Malformed range_or_cell: "{range_or_cell}"')
+
+    if reference.sheet_name is not None:
         raise ValueError(f'Malformed range_or_cell: "{range_or_cell}"')
 
 def _compute_num_new_columns(current_column: int, current_column_offset: int) -> int:
@@ -104,23 +460,8 @@ def _compute_num_new_columns(current_column: int, current_column_offset: int) ->
 
     return num_new_columns
 
-def column_offset_to_column_name(column: int):
-    """
-    From https://stackoverflow.com/a/71155186, adapted to use string.ascii_uppercase rather than chr
-    """
-
-    if column < 0:
-        return ""
-
-    quotient, remainder = divmod(column, 26)
-
-    return column_offset_to_column_name(quotient - 1) + string.ascii_uppercase[remainder]
-
 def _compute_new_column_alpha(current_column_alpha: str, current_column_offset: int) -> str:
-
-    sum_column_index = sum([ascii_uppercase.index(subcolumn) for subcolumn in current_column_alpha]) + (26 * (len(current_column_alpha) - 1))
-
-    new_column_index = sum_column_index + current_column_offset
+    new_column_index = column_name_to_column_offset(current_column_alpha) + current_column_offset
 
     if new_column_index < 0:
         raise ValueError(
@@ -139,115 +480,115 @@ def _compute_new_row(current_row: int, current_row_offset: int) -> int:
     return new_row
 
 def offset_reference(reference: str, column_offset: int, row_offset: int) -> str:
-    match = re.fullmatch('([A-Z]+)([0-9]+)', reference)
+    cell_ref = to_reference(reference)
 
-    if match is None:
+    if not isinstance(cell_ref, CellRef):
         raise ValueError(f'Invalid sheet reference "{reference}": It should be capital letters followed by numbers.')
 
-    if column_offset == 0 and row_offset == 0:
-        return reference
+    return cell_ref.offset(column_offset, row_offset)
+
+MAX_CONCURRENT_CHUNKS = 4 # Per synchronous read, e.g. a /link scanning a large tracker
 
-    column_alpha = match.group(1)
-    row = int(match.group(2))
+def _get_range_keys(raw_sheet_name_data: Dict[str, Union[str, List[str]]]) -> List[RangeKey]:
+    keys = []
 
-    if row + row_offset <= 0:
-        raise ValueError(f'Invalid combination of sheet reference "{reference}" and row offset "{row_offset}" given row "{row}" - cannot go above row 1.')
+    for sheet_name, raw_ranges_or_cells in raw_sheet_name_data.items():
+        if isinstance(raw_ranges_or_cells, list):
+            for raw_range_or_cell in raw_ranges_or_cells:
+                check_is_valid_range_or_cell(raw_range_or_cell)
 
-    new_column_alpha = _compute_new_column_alpha(column_alpha, column_offset)
-    new_row = _compute_new_row(row, row_offset)
+                keys.append((sheet_name, raw_range_or_cell))
+        elif isinstance(raw_ranges_or_cells, str):
+            check_is_valid_range_or_cell(raw_ranges_or_cells)
 
-    new_reference = new_column_alpha + str(new_row)
+            keys.append((sheet_name, raw_ranges_or_cells))
+        else:
+            raise ValueError(f'Non-str non-list ranges_or_cells "{raw_ranges_or_cells}" inside "{sheet_name}" cannot be passed in.')
 
-    return new_reference
+    return keys
 
-def get_from_spreadsheet_api(
+def _build_values_requests(
     spreadsheet_id: str,
     raw_sheet_name_data: Dict[str, Union[str, List[str]]],
-    raw_sheet_gid_data: Optional[Dict[int, Union[str, List[str]]]] = None,
-) -> Dict[str, Dict[str, Optional[Union[str, int, float]]]]:
+    value_render_option: ValueRenderOption = ValueRenderOption.FORMATTED_VALUE
+) -> List[ValuesRequest]:
+    return build_values_requests(spreadsheet_id, get_key(), _get_range_keys(raw_sheet_name_data), value_render_option)
+
+def _request_values(values_request: ValuesRequest, spreadsheet_id: str) -> Dict[str, Dict[str, Optional[Union[str, int, float]]]]:
     logger = get_logger()
 
-    try:
-        all_ranges_or_cells = []
+    start_time = time.time()
 
-        for sheet_name, raw_ranges_or_cells in raw_sheet_name_data.items():
-            sheet_name = sheet_name.replace('/', '%2F') # Doesn't get encoded properly otherwise. # TODO Test?
+    logger.info(values_request.url)
 
-            if isinstance(raw_ranges_or_cells, list):
-                for raw_range_or_cell in raw_ranges_or_cells:
-                    check_is_valid_range_or_cell(raw_range_or_cell)
+    response_json = _request_json(values_request.url, spreadsheet_id)
 
-                    all_ranges_or_cells.append(f'{sheet_name}!{raw_range_or_cell}')
-            elif isinstance(raw_ranges_or_cells, str):
-                check_is_valid_range_or_cell(raw_ranges_or_cells)
+    logger.debug(f'Duration: {time.time() - start_time}')
 
-                all_ranges_or_cells.append(f'{sheet_name}!{raw_ranges_or_cells}')
-            else:
-                raise ValueError(f'Non-str non-list ranges_or_cells "{raw_ranges_or_cells}" inside "{sheet_name}" cannot be passed in.')
+    response_data = values_request.parse_response(response_json)
 
-        if len(all_ranges_or_cells) == 0:
-            raise ValueError(f'Must pass at least one range or cell to query.')
+    record_usage(ranges=len(values_request.keys), cells=count_cells(response_data))
 
-        start_time = time.time()
+    logger.info(f'URL: {values_request.url}, Response: {response_json}, Data: {response_data}')
 
-        key = get_key()
+    return response_data
 
-        try:
-            if len(all_ranges_or_cells) == 1:
-                url = f'https://sheets.googleapis.com/v4/spreadsheets/{spreadsheet_id}/values/{all_ranges_or_cells[0]}?key={key}'
-            else:
-                range_expression_tokens = []
+async def _request_values_async(values_request: ValuesRequest, spreadsheet_id: str) -> Dict[str, Dict[str, Optional[Union[str, int, float]]]]:
+    logger = get_logger()
 
-                for range_or_cell in all_ranges_or_cells:
-                    range_expression_tokens.append(f'ranges={range_or_cell}')
+    start_time = time.time()
 
-                range_expression = '&'.join(range_expression_tokens)
+    logger.info(values_request.url)
 
-                url = f'https://sheets.googleapis.com/v4/spreadsheets/{spreadsheet_id}/values:batchGet?key={key}&{range_expression}'
+    response_json = await _request_json_async(values_request.url, spreadsheet_id)
 
-            logger.info(url)
+    logger.debug(f'Duration: {time.time() - start_time}')
 
-            response = requests.get(url)
+    response_data = values_request.parse_response(response_json)
 
-            check_response(response, spreadsheet_id)
+    record_usage(ranges=len(values_request.keys), cells=count_cells(response_data))
 
-            logger.debug(f'Duration: {time.time() - start_time}')
+    logger.info(f'URL: {values_request.url}, Response: {response_json}, Data: {response_data}')
 
-            response_json = response.json()
+    return response_data
 
-            if len(all_ranges_or_cells) == 1:
-                raw_response_data = [ response_json ]
-            else:
-                raw_response_data = response_json['valueRanges']
+def get_from_spreadsheet_api(
+    spreadsheet_id: str,
+    raw_sheet_name_data: Dict[str, Union[str, List[str]]],
+    raw_sheet_gid_data: Optional[Dict[int, Union[str, List[str]]]] = None,
+    value_render_option: ValueRenderOption = ValueRenderOption.FORMATTED_VALUE
+) -> Dict[str, Dict[str, Optional[Union[str, bool, int, float]]]]:
+    """
+    Synchronous Sheets read, kept for tests and scripts. Anything running inside the bot's event loop should use
+    get_from_spreadsheet_api_async instead so that a slow spreadsheet doesn't block every other guild.
 
-            response_data = collections.defaultdict(dict)
-            for sheet_range_or_cell, response_datum in zip(all_ranges_or_cells, raw_response_data):
-                sheet_name, range_or_cell = sheet_range_or_cell.split('!')
+    Values come back as the sheet shows them, as strings. Pass ValueRenderOption.UNFORMATTED_VALUE for typed values
+    instead: checkboxes as bools, whole numbers as ints, and empty cells as None.
+    """
 
-                sheet_name = sheet_name.replace('%2F', '/')
+    logger = get_logger()
 
-                if 'values' in response_datum:
-                    is_range = ( ':' in range_or_cell )
+    try:
+        values_requests = _build_values_requests(spreadsheet_id, raw_sheet_name_data, value_render_option)
 
-                    if is_range:
-                        response_data[sheet_name][range_or_cell] = response_datum['values']
-                    else:
-                        response_data[sheet_name][range_or_cell] = response_datum['values'][0][0]
-                else:
-                    response_data[sheet_name][range_or_cell] = None
+        try:
+            if len(values_requests) == 1:
+                return _request_values(values_requests[0], spreadsheet_id)
 
-            logger.info(f'URL: {url}, Response: {response_json}, Data: {response_data}')
+            # Each chunk gets its own copy of the context, so it's still queued and retried as part of this command
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(values_requests), MAX_CONCURRENT_CHUNKS)) as executor:
+                chunk_futures = [
+                    executor.submit(contextvars.copy_context().run, _request_values, values_request, spreadsheet_id) for values_request in values_requests
+                ]
 
-            return response_data
+                return merge_values_responses(chunk_future.result() for chunk_future in chunk_futures)
 
         except requests.HTTPError as h:
             logger.error(h, exc_info=True)
-            if 'response' in locals():
-                logger.error(response.json())
 
             raise h
     except Exception as e:
-        if raw_sheet_gid_data is None:
+        if raw_sheet_gid_data is None or not _could_be_renamed_tab(e):
             raise e
         else:
             logger.debug(f'Experienced error {e}, retrying with GID', exc_info=True)
@@ -256,7 +597,345 @@ def get_from_spreadsheet_api(
                 get_sheet_name_from_gid(spreadsheet_id=spreadsheet_id, gid=gid, force=True): ranges_or_cells for gid, ranges_or_cells in raw_sheet_gid_data.items()
             }
 
-            return get_from_spreadsheet_api(spreadsheet_id=spreadsheet_id, raw_sheet_name_data=from_gid_raw_sheet_name_data)
+            return get_from_spreadsheet_api(spreadsheet_id=spreadsheet_id, raw_sheet_name_data=from_gid_raw_sheet_name_data, value_render_option=value_render_option)
+
+async def get_from_spreadsheet_api_async(
+    spreadsheet_id: str,
+    raw_sheet_name_data: Dict[str, Union[str, List[str]]],
+    raw_sheet_gid_data: Optional[Dict[int, Union[str, List[str]]]] = None,
+    cache_ttl: Optional[float] = None,
+    value_render_option: ValueRenderOption = ValueRenderOption.FORMATTED_VALUE
+) -> Dict[str, Dict[str, Optional[Union[str, bool, int, float]]]]:
+    """
+    Non-blocking equivalent of get_from_spreadsheet_api, with the same arguments and return shape.
+
+    If cache_ttl is given, any ranges or cells read within the last cache_ttl seconds are served from the cache, and only
+    the rest are queried.
+    """
+
+    if cache_ttl is None:
+        return await _coalesced_fetch_from_spreadsheet_api_async(spreadsheet_id, raw_sheet_name_data, raw_sheet_gid_data, value_render_option)
+
+    cache = get_sheets_cache()
+
+    response_data = collections.defaultdict(dict)
+    uncached_sheet_name_data = collections.defaultdict(list)
+
+    for sheet_name, raw_ranges_or_cells in raw_sheet_name_data.items():
+        if isinstance(raw_ranges_or_cells, str):
+            raw_ranges_or_cells = [raw_ranges_or_cells]
+        elif not isinstance(raw_ranges_or_cells, list):
+            raise ValueError(f'Non-str non-list ranges_or_cells "{raw_ranges_or_cells}" inside "{sheet_name}" cannot be passed in.')
+
+        for raw_range_or_cell in raw_ranges_or_cells:
+            is_cached, value = cache.get((spreadsheet_id, sheet_name, raw_range_or_cell, value_render_option))
+
+            if is_cached:
+                response_data[sheet_name][raw_range_or_cell] = value
+            else:
+                uncached_sheet_name_data[sheet_name].append(raw_range_or_cell)
+
+    if len(uncached_sheet_name_data) and (is_over_budget() or _is_sheets_saturated()):
+        # Rather than failing the command or queueing past its deadline, make do with the last values read if they're all still around
+        stale_data = _serve_stale(spreadsheet_id, uncached_sheet_name_data, value_render_option, cache_ttl)
+
+        if stale_data is not None:
+            for sheet_name, sheet_data in stale_data.items():
+                response_data[sheet_name].update(sheet_data)
+
+            return response_data
+
+    if len(uncached_sheet_name_data) or not len(response_data):
+        try:
+            queried_data = await _coalesced_fetch_from_spreadsheet_api_async(spreadsheet_id, uncached_sheet_name_data, raw_sheet_gid_data, value_render_option)
+        except Exception as e:
+            # Sheets is down or out of quota, even after retrying - fall back to the last values read, if there are any
+            is_transient = classify_error(e) is not None or (isinstance(e, SpreadsheetUnavailableError) and e.failure_class == 'server_error')
+
+            stale_data = _serve_stale(spreadsheet_id, uncached_sheet_name_data, value_render_option, cache_ttl) if is_transient else None
+
+            if stale_data is None:
+                raise e
+
+            get_logger().warning(f'Serving stale values for "{spreadsheet_id}" after {type(e).__name__}: {e}')
+
+            queried_data = stale_data
+        else:
+            for sheet_name, sheet_data in queried_data.items():
+                for range_or_cell, value in sheet_data.items():
+                    cache.set((spreadsheet_id, sheet_name, range_or_cell, value_render_option), value, ttl=cache_ttl)
+
+        for sheet_name, sheet_data in queried_data.items():
+            response_data[sheet_name].update(sheet_data)
+
+    return response_data
+
+def _is_sheets_saturated() -> bool:
+    """
+    Whether a call made now would queue for quota for longer than the current command has left.
+    """
+
+    return get_scheduler().estimate_wait() > get_remaining_budget()
+
+def _serve_stale(
+    spreadsheet_id: str,
+    sheet_name_data: Dict[str, List[str]],
+    value_render_option: ValueRenderOption,
+    cache_ttl: float
+) -> Optional[Dict[str, Dict[str, Optional[Union[str, bool, int, float]]]]]:
+    """
+    Every range or cell asked for, as last read, if they're all still in the cache; otherwise None. If served, they're
+    read again in the background so the cache catches up once Sheets does.
+    """
+
+    cache = get_sheets_cache()
+
+    stale_data = collections.defaultdict(dict)
+    stale_age = 0.0
+
+    for sheet_name, ranges_or_cells in sheet_name_data.items():
+        for range_or_cell in ranges_or_cells:
+            is_cached, value, age = cache.get_stale_with_age((spreadsheet_id, sheet_name, range_or_cell, value_render_option))
+
+            if not is_cached:
+                return None
+
+            stale_data[sheet_name][range_or_cell] = value
+            stale_age = max(stale_age, age)
+
+    record_usage(served_stale=sum(len(ranges_or_cells) for ranges_or_cells in sheet_name_data.values()), stale_age=stale_age)
+
+    _schedule_revalidation(spreadsheet_id, sheet_name_data, value_render_option, cache_ttl)
 
+    return stale_data
 
+REVALIDATION_DELAY = 5 # Seconds, to give Sheets a moment before asking again
+
+def get_revalidations() -> Dict[Tuple, asyncio.Task]:
+    """
+    Background rereads of stale values that are still running, by what they're rereading.
+    """
+
+    if not hasattr(get_revalidations, 'revalidations'):
+        get_revalidations.revalidations = {}
+
+    return get_revalidations.revalidations
+
+def _schedule_revalidation(
+    spreadsheet_id: str,
+    sheet_name_data: Dict[str, List[str]],
+    value_render_option: ValueRenderOption,
+    cache_ttl: float
+):
+    revalidation_key = (
+        spreadsheet_id,
+        value_render_option,
+        tuple(sorted((sheet_name, tuple(sorted(ranges_or_cells))) for sheet_name, ranges_or_cells in sheet_name_data.items()))
+    )
+
+    revalidations = get_revalidations()
+
+    if revalidation_key in revalidations:
+        return
+
+    revalidations[revalidation_key] = asyncio.get_running_loop().create_task(
+        _revalidate(revalidation_key, spreadsheet_id, sheet_name_data, value_render_option, cache_ttl)
+    )
+
+async def _revalidate(
+    revalidation_key: Tuple,
+    spreadsheet_id: str,
+    sheet_name_data: Dict[str, List[str]],
+    value_render_option: ValueRenderOption,
+    cache_ttl: float
+):
+    # Not part of whichever command kicked this off, so not on its budget or deadline
+    current_command_usage.set(None)
+    current_command_retries.set(None)
+    current_deadline.set(None)
+
+    try:
+        await asyncio.sleep(REVALIDATION_DELAY)
+
+        with sheets_priority_lane(Priority.LOW):
+            queried_data = await _coalesced_fetch_from_spreadsheet_api_async(spreadsheet_id, sheet_name_data, None, value_render_option)
+
+        cache = get_sheets_cache()
+
+        for sheet_name, sheet_data in queried_data.items():
+            for range_or_cell, value in sheet_data.items():
+                cache.set((spreadsheet_id, sheet_name, range_or_cell, value_render_option), value, ttl=cache_ttl)
+    except Exception as e:
+        get_logger().warning(f'Could not revalidate stale values for "{spreadsheet_id}": {type(e).__name__}: {e}')
+    finally:
+        get_revalidations().pop(revalidation_key, None)
+
+def configure_batching(window_ms: Optional[float]):
+    """
+    Opts in to holding reads for window_ms (5-20ms is plenty) and merging every read against the same spreadsheet in that
+    window into one batchGet. Pass None to turn it back off.
+    """
+
+    if window_ms is None:
+        get_batcher.batcher = None
+    elif window_ms <= 0:
+        raise ValueError(f'Batching window must be positive, not {window_ms}ms.')
+    else:
+        get_batcher.batcher = SheetsBatcher(
+            window=window_ms / 1000,
+            fetch=_fetch_from_spreadsheet_api_async,
+            chunk=_chunk_range_keys
+        )
+
+def get_batcher() -> Optional[SheetsBatcher]:
+    if not hasattr(get_batcher, 'batcher'):
+        get_batcher.batcher = None
+
+    return get_batcher.batcher
+
+def _chunk_range_keys(
+    spreadsheet_id: str,
+    keys: List[RangeKey],
+    max_ranges: int,
+    max_url_length: int,
+    value_render_option: ValueRenderOption = ValueRenderOption.FORMATTED_VALUE
+) -> List[List[RangeKey]]:
+    values_requests = build_values_requests(spreadsheet_id, get_key(), keys, value_render_option, max_ranges=max_ranges, max_url_length=max_url_length)
+
+    return [list(values_request.keys) for values_request in values_requests]
+
+# Keys currently being fetched -> the fetch they're part of, so that whoever joins it can lend it their deadline and budget
+_SHARED_FETCHES: Dict[Tuple[str, str, str, ValueRenderOption], SharedFetch] = {}
+
+def get_single_flight() -> SingleFlight:
+    if not hasattr(get_single_flight, 'single_flight'):
+        get_single_flight.single_flight = SingleFlight()
+
+    return get_single_flight.single_flight
+
+def get_coalescing_stats() -> Dict[str, int]:
+    return get_single_flight().get_stats()
+
+async def _coalesced_fetch_from_spreadsheet_api_async(
+    spreadsheet_id: str,
+    raw_sheet_name_data: Dict[str, Union[str, List[str]]],
+    raw_sheet_gid_data: Optional[Dict[int, Union[str, List[str]]]] = None,
+    value_render_option: ValueRenderOption = ValueRenderOption.FORMATTED_VALUE
+) -> Dict[str, Dict[str, Optional[Union[str, bool, int, float]]]]:
+    """
+    Shares one HTTP call between concurrent reads of the same cells, e.g. a party rolling at once or a /link overlapping
+    with rolls. Reads falling back to GIDs can come back under a different sheet name, so those aren't coalesced.
+
+    The call runs as a SharedFetch, outside of any one caller's context, and each caller is charged for it afterwards.
+    """
+
+    if raw_sheet_gid_data is not None:
+        return await _fetch_from_spreadsheet_api_async(spreadsheet_id, raw_sheet_name_data, raw_sheet_gid_data, value_render_option)
+
+    keys = []
+    for sheet_name, raw_ranges_or_cells in raw_sheet_name_data.items():
+        if isinstance(raw_ranges_or_cells, str):
+            raw_ranges_or_cells = [raw_ranges_or_cells]
+        elif not isinstance(raw_ranges_or_cells, list):
+            raise ValueError(f'Non-str non-list ranges_or_cells "{raw_ranges_or_cells}" inside "{sheet_name}" cannot be passed in.')
+
+        for raw_range_or_cell in raw_ranges_or_cells:
+            check_is_valid_range_or_cell(raw_range_or_cell) # Checked up front so one bad range can't fail a shared batch
+
+            keys.append((spreadsheet_id, sheet_name, raw_range_or_cell, value_render_option))
+
+    if len(keys) == 0:
+        raise ValueError(f'Must pass at least one range or cell to query.')
+
+    check_budget()
+
+    # The fetches each key ends up being read by, and how many of this caller's keys each one reads
+    shared_fetches: Dict[SharedFetch, int] = collections.Counter()
+
+    for key in keys:
+        if key in _SHARED_FETCHES:
+            shared_fetches[_SHARED_FETCHES[key]] += 1
+
+    for shared_fetch in shared_fetches:
+        shared_fetch.join(contextvars.copy_context())
+
+    async def fetch(keys_to_fetch: List[Tuple[str, str, str, ValueRenderOption]]) -> Dict[Tuple[str, str, str, ValueRenderOption], Optional[Union[str, bool, int, float]]]:
+        sheet_name_data_to_fetch = collections.defaultdict(list)
+        for _, sheet_name, range_or_cell, _ in keys_to_fetch:
+            sheet_name_data_to_fetch[sheet_name].append(range_or_cell)
+
+        shared_fetch = SharedFetch([contextvars.copy_context()], num_keys=len(keys_to_fetch))
+        shared_fetches[shared_fetch] += len(keys_to_fetch)
+
+        for key in keys_to_fetch:
+            _SHARED_FETCHES[key] = shared_fetch
+
+        batcher = get_batcher()
+
+        if batcher is None:
+            queried_data_coroutine = _fetch_from_spreadsheet_api_async(spreadsheet_id, sheet_name_data_to_fetch, value_render_option=value_render_option)
+        else:
+            queried_data_coroutine = batcher.read(spreadsheet_id, sheet_name_data_to_fetch, value_render_option=value_render_option)
+
+        try:
+            # Cancelling this caller cancels the task too, and single flight then hands the keys on to whoever's still waiting
+            queried_data = await asyncio.get_running_loop().create_task(queried_data_coroutine, context=shared_fetch.context)
+        finally:
+            for key in keys_to_fetch:
+                if _SHARED_FETCHES.get(key) is shared_fetch:
+                    del _SHARED_FETCHES[key]
+
+        return {
+            (spreadsheet_id, sheet_name, range_or_cell, value_render_option): value
+                for sheet_name, sheet_data in queried_data.items()
+                    for range_or_cell, value in sheet_data.items()
+        }
+
+    try:
+        results = await get_single_flight().get_many(keys, fetch)
+    finally:
+        for shared_fetch, num_keys in shared_fetches.items():
+            shared_fetch.charge(num_keys)
+
+    response_data = collections.defaultdict(dict)
+    for (_, sheet_name, range_or_cell, _), value in results.items():
+        response_data[sheet_name][range_or_cell] = value
+
+    record_usage(ranges=len(results), cells=count_cells(response_data))
+
+    return response_data
+
+async def _fetch_from_spreadsheet_api_async(
+    spreadsheet_id: str,
+    raw_sheet_name_data: Dict[str, Union[str, List[str]]],
+    raw_sheet_gid_data: Optional[Dict[int, Union[str, List[str]]]] = None,
+    value_render_option: ValueRenderOption = ValueRenderOption.FORMATTED_VALUE
+) -> Dict[str, Dict[str, Optional[Union[str, bool, int, float]]]]:
+    logger = get_logger()
+
+    try:
+        values_requests = _build_values_requests(spreadsheet_id, raw_sheet_name_data, value_render_option)
+
+        try:
+            if len(values_requests) == 1:
+                return await _request_values_async(values_requests[0], spreadsheet_id)
+
+            return merge_values_responses(await asyncio.gather(
+                *[_request_values_async(values_request, spreadsheet_id) for values_request in values_requests]
+            ))
+
+        except aiohttp.ClientResponseError as c:
+            logger.error(c, exc_info=True)
+
+            raise c
+    except Exception as e:
+        if raw_sheet_gid_data is None or not _could_be_renamed_tab(e):
+            raise e
+        else:
+            logger.debug(f'Experienced error {e}, retrying with GID', exc_info=True)
+
+            from_gid_raw_sheet_name_data = {
+                await get_sheet_name_from_gid_async(spreadsheet_id=spreadsheet_id, gid=gid, force=True): ranges_or_cells for gid, ranges_or_cells in raw_sheet_gid_data.items()
+            }
 
+            return await _fetch_from_spreadsheet_api_async(spreadsheet_id=spreadsheet_id, raw_sheet_name_data=from_gid_raw_sheet_name_data, value_render_option=value_render_option)
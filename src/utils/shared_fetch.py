@@ -0,0 +1,72 @@
+import contextvars
+import time
+from typing import Iterable, Optional
+
+from src.utils.deadline import Deadline, current_deadline, DEADLINE_MARGIN
+from src.utils.sheets_budget import CommandUsage, current_command_usage, record_usage
+from src.utils.sheets_keys import current_guild_id
+from src.utils.sheets_retry import BACKGROUND_RETRY_BUDGET
+from src.utils.sheets_scheduler import sheets_priority
+
+class SharedFetch:
+    """
+    A Sheets fetch made for several callers at once, like a coalesced read or a batch of them. It runs in a context of its
+    own rather than in whichever caller's happened to start it, so one command's spent budget or expiring deadline doesn't
+    fail everyone else's read, and no guild's own API key is spent on other guilds' ranges.
+
+    It gets the most any of its callers would have allowed it - the latest deadline, the most urgent priority and the most
+    calls left - and each of them is charged afterwards for what they'd have fetched themselves.
+    """
+
+    def __init__(self, contexts: Iterable[contextvars.Context], num_keys: int):
+        contexts = list(contexts)
+
+        self.num_keys = num_keys
+
+        self.deadline = Deadline(0)
+        self.usage = CommandUsage(command_name='shared_fetch', budget=0)
+
+        guild_ids = {context.run(current_guild_id.get) for context in contexts}
+
+        self.guild_id: Optional[int] = guild_ids.pop() if len(guild_ids) == 1 else None
+        self.priority = min(context.run(sheets_priority.get) for context in contexts)
+
+        for context in contexts:
+            self.join(context)
+
+        self.context = contextvars.Context()
+        self.context.run(self._set_context)
+
+    def _set_context(self):
+        current_deadline.set(self.deadline)
+        current_command_usage.set(self.usage)
+        current_guild_id.set(self.guild_id)
+        sheets_priority.set(self.priority)
+
+    def join(self, context: contextvars.Context):
+        """
+        Gives the fetch at least as long, and as many calls, as this caller would have had for it.
+        """
+
+        deadline = context.run(current_deadline.get)
+
+        if deadline is None: # Not running under a command, e.g. restoring games on startup
+            self.deadline.extend_to(time.monotonic() + BACKGROUND_RETRY_BUDGET + DEADLINE_MARGIN)
+        else:
+            self.deadline.extend_to(deadline.expires_at)
+
+        command_usage = context.run(current_command_usage.get)
+        remaining_calls = None if command_usage is None else command_usage.get_remaining_calls()
+
+        if self.usage.budget is not None:
+            self.usage.budget = None if remaining_calls is None else max(self.usage.budget, self.usage.calls + remaining_calls)
+
+    def charge(self, num_keys: int):
+        """
+        Charges the current caller for its share of the fetch: every call made, as it would have had to make them too, but
+        only its own keys' share of the bytes.
+        """
+
+        share = num_keys / self.num_keys if self.num_keys else 0
+
+        record_usage(calls=self.usage.calls, num_bytes=int(self.usage.bytes * share))
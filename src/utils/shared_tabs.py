@@ -0,0 +1,101 @@
+import collections
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+from src.utils.google_sheets import get_from_spreadsheet_api_async
+from src.utils.sheet_references import CellRef, RangeRef, get_bounding_box, to_reference
+from src.utils.sheet_snapshot import SheetSnapshot
+from src.utils.sheets_cache import get_sheets_cache
+from src.utils.sheets_requests import ValueRenderOption
+
+class SharedTabCache:
+    """
+    Tabs that every character on a spreadsheet reads from rather than having their own, like Astir's Cause / Factions.
+    Owned by the game, and each tab is read as one range covering everything its characters need from it - so every
+    character asks for the same range, and however many of them roll at once it's only fetched once per TTL.
+    """
+
+    def __init__(self, spreadsheet_id: str, shared_references: Iterable[Union[str, CellRef, RangeRef]], cache_ttl: float):
+        self.spreadsheet_id = spreadsheet_id
+        self.cache_ttl = cache_ttl
+
+        references_by_tab = collections.defaultdict(list)
+
+        for reference in shared_references:
+            reference = to_reference(reference)
+
+            if reference.sheet_name is None:
+                raise ValueError(f'Shared reference "{reference}" needs to say which tab it is on.')
+
+            references_by_tab[reference.sheet_name].append(reference.local)
+
+        self.tab_ranges: Dict[str, RangeRef] = {
+            sheet_name: get_bounding_box(references) for sheet_name, references in references_by_tab.items()
+        }
+
+        self.snapshots: Dict[Tuple[str, ValueRenderOption], SheetSnapshot] = {}
+
+    def __contains__(self, sheet_name: str) -> bool:
+        return sheet_name in self.tab_ranges
+
+    async def get_snapshot(self, sheet_name: str, value_render_option: ValueRenderOption = ValueRenderOption.FORMATTED_VALUE) -> SheetSnapshot:
+        tab_range = self.tab_ranges[sheet_name]
+
+        raw_tab_data = (await get_from_spreadsheet_api_async(
+            spreadsheet_id=self.spreadsheet_id,
+            raw_sheet_name_data={
+                sheet_name: tab_range
+            },
+            cache_ttl=self.cache_ttl,
+            value_render_option=value_render_option
+        ))[sheet_name][tab_range]
+
+        snapshot = self.snapshots.get((sheet_name, value_render_option))
+
+        if snapshot is None or snapshot.values is not raw_tab_data:
+            blank_value = None if value_render_option == ValueRenderOption.UNFORMATTED_VALUE else ''
+
+            snapshot = self.snapshots[(sheet_name, value_render_option)] = SheetSnapshot(tab_range, raw_tab_data, blank_value=blank_value)
+
+        return snapshot
+
+    async def read(
+        self,
+        sheet_name: str,
+        references: Union[str, List[str]],
+        value_render_option: ValueRenderOption = ValueRenderOption.FORMATTED_VALUE
+    ) -> Dict[str, Any]:
+        """
+        The cells and ranges asked for from a shared tab, keyed as given. Anything outside the tab's shared range is queried
+        on its own.
+        """
+
+        if isinstance(references, str):
+            references = [references]
+
+        snapshot = await self.get_snapshot(sheet_name, value_render_option)
+
+        results = {}
+        outside_references = []
+
+        for reference in references:
+            if snapshot.contains(reference):
+                results[reference] = snapshot.get(reference)
+            else:
+                outside_references.append(reference)
+
+        if len(outside_references):
+            results.update((await get_from_spreadsheet_api_async(
+                spreadsheet_id=self.spreadsheet_id,
+                raw_sheet_name_data={
+                    sheet_name: outside_references
+                },
+                cache_ttl=self.cache_ttl,
+                value_render_option=value_render_option
+            ))[sheet_name])
+
+        return results
+
+    def invalidate(self) -> int:
+        self.snapshots = {}
+
+        return sum(get_sheets_cache().invalidate(self.spreadsheet_id, sheet_name) for sheet_name in self.tab_ranges)
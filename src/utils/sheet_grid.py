@@ -0,0 +1,187 @@
+import sys
+from typing import Any, FrozenSet, Iterator, List, Optional, Sequence, Tuple, Union
+
+from src.utils.sheet_references import CellRef, RangeRef, to_reference
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if value.__class__ is str else value
+
+def normalise(value: Any) -> Any:
+    """
+    How cells get compared against move names and the like: lowercased, with stray whitespace stripped.
+    """
+
+    return sys.intern(value.lower().strip()) if isinstance(value, str) else value
+
+class SheetGrid(Sequence):
+    """
+    A range's values, kept as one flat tuple plus its shape rather than a list of lists. Repeated strings (checkbox
+    states, blanks, the same move name on several sheets) are interned so they're only held once, and any cell is a
+    single index away.
+
+    Still reads like the ragged rows the API returns - iterating, indexing and comparing against lists all work on those -
+    so code that only wants rows doesn't need to know the difference.
+    """
+
+    __slots__ = ('num_rows', 'num_columns', 'row_lengths', 'cells', 'blank_value', 'origin', '_normalised_cells', '_normalised_values')
+
+    def __init__(
+        self,
+        rows: Optional[Sequence[Sequence[Any]]],
+        blank_value: Any = '',
+        origin: Optional[Union[str, CellRef, RangeRef]] = None
+    ):
+        rows = rows if rows is not None else []
+
+        num_columns = max((len(row) for row in rows), default=0)
+
+        cells = []
+        for row in rows:
+            cells.extend(_intern(value) for value in row)
+            cells.extend([blank_value] * (num_columns - len(row)))
+
+        self.num_rows = len(rows)
+        self.num_columns = num_columns
+        self.row_lengths: Tuple[int, ...] = tuple(len(row) for row in rows)
+        self.cells: Tuple[Any, ...] = tuple(cells)
+        self.blank_value = blank_value
+
+        # Top left cell of the range this was read from, for looking cells up by reference
+        if origin is not None:
+            origin = to_reference(origin)
+
+            if isinstance(origin, RangeRef):
+                origin = CellRef.from_offsets(origin.min_column, origin.min_row)
+
+        self.origin: Optional[CellRef] = origin
+
+        self._normalised_cells: Optional[Tuple[Any, ...]] = None
+        self._normalised_values: Optional[FrozenSet[Any]] = None
+
+    def __setattr__(self, name: str, value: Any):
+        if hasattr(self, name) and not name.startswith('_normalised'):
+            raise AttributeError(f'{type(self).__name__} is immutable.')
+
+        object.__setattr__(self, name, value)
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def __getitem__(self, row_index: Union[int, slice]) -> Union[List[Any], List[List[Any]]]:
+        if isinstance(row_index, slice):
+            return [self[index] for index in range(*row_index.indices(self.num_rows))]
+
+        if row_index < 0:
+            row_index += self.num_rows
+
+        if not 0 <= row_index < self.num_rows:
+            raise IndexError(f'Row {row_index} is outside of a grid with {self.num_rows} rows.')
+
+        start = row_index * self.num_columns
+
+        return list(self.cells[start:start + self.row_lengths[row_index]])
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        for row_index in range(self.num_rows):
+            yield self[row_index]
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, SheetGrid):
+            if self.row_lengths != other.row_lengths:
+                return False
+
+            if self.blank_value == other.blank_value: # Padded the same way, so the flat cells can be compared as they are
+                return self.cells == other.cells
+
+            return self.to_rows() == other.to_rows()
+        elif isinstance(other, list):
+            return self.to_rows() == other
+
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.row_lengths, self.cells))
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.to_rows()!r})'
+
+    def __sizeof__(self) -> int:
+        # Interned strings are shared, so each distinct one is only counted the once
+        distinct_values = {id(value): value for value in self.cells}
+
+        return (
+            object.__sizeof__(self) +
+            sys.getsizeof(self.cells) +
+            sys.getsizeof(self.row_lengths) +
+            sys.getsizeof(self.origin) +
+            sum(sys.getsizeof(value) for value in distinct_values.values())
+        )
+
+    def __reduce__(self):
+        return type(self), (self.to_rows(), self.blank_value, self.origin)
+
+    def to_rows(self) -> List[List[Any]]:
+        return list(self)
+
+    def get(self, column_offset: int, row_offset: int) -> Any:
+        """
+        The value at these zero-based offsets from the top left, which is blank for anything past the end of its row.
+        """
+
+        if not (0 <= column_offset < self.num_columns and 0 <= row_offset < self.num_rows):
+            return self.blank_value
+
+        return self.cells[row_offset * self.num_columns + column_offset]
+
+    def get_cell(self, cell: Union[str, CellRef]) -> Any:
+        if self.origin is None:
+            raise ValueError('Cannot look cells up by reference in a grid without an origin.')
+
+        cell = to_reference(cell)
+
+        return self.get(cell.column - self.origin.column, cell.row - self.origin.row)
+
+    @property
+    def normalised_cells(self) -> Tuple[Any, ...]:
+        """
+        Every cell normalised, in the same order as cells. Worked out on first use, as most grids are never searched.
+        """
+
+        if self._normalised_cells is None:
+            self._normalised_cells = tuple(normalise(value) for value in self.cells)
+
+        return self._normalised_cells
+
+    @property
+    def normalised_values(self) -> FrozenSet[Any]:
+        if self._normalised_values is None:
+            if self._normalised_cells is not None:
+                self._normalised_values = frozenset(self._normalised_cells)
+            else: # Cells repeat a lot, so only normalise each distinct one
+                self._normalised_values = frozenset(normalise(value) for value in set(self.cells))
+
+        return self._normalised_values
+
+    def contains_value(self, query: Any) -> bool:
+        """
+        Whether any cell matches the query once both are normalised.
+        """
+
+        return normalise(query) in self.normalised_values
+
+def to_sheet_grid(range_or_cell_data: Union[None, Any, Sequence[Sequence[Any]], SheetGrid], blank_value: Any = '') -> SheetGrid:
+    """
+    Wraps whatever a query gave back for a cell or range as a grid, so both can be searched the same way.
+    """
+
+    if isinstance(range_or_cell_data, SheetGrid):
+        return range_or_cell_data
+    elif range_or_cell_data is None:
+        return SheetGrid([], blank_value=blank_value)
+    elif isinstance(range_or_cell_data, list):
+        if len(range_or_cell_data) and not isinstance(range_or_cell_data[0], list):
+            return SheetGrid([range_or_cell_data], blank_value=blank_value)
+
+        return SheetGrid(range_or_cell_data, blank_value=blank_value)
+
+    return SheetGrid([[range_or_cell_data]], blank_value=blank_value)
@@ -0,0 +1,281 @@
+import abc
+import re
+import string
+import types
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+CELL_PATTERN = re.compile('([A-Z]+)([0-9]+)')
+RANGE_PATTERN = re.compile('([A-Z]+[0-9]+):([A-Z]+[0-9]+)')
+SHEET_NAME_PATTERN = re.compile('(.+)!([A-Z]+[0-9]+(?::[A-Z]+[0-9]+)?)')
+
+# Filled in as columns get used, which is only ever the few hundred the character sheets cover
+_COLUMN_NAMES: Dict[int, str] = {}
+_COLUMN_OFFSETS: Dict[str, int] = {}
+
+def column_offset_to_column_name(column: int) -> str:
+    """
+    Zero-based column offset to its letters, so 0 -> A, 25 -> Z, 26 -> AA.
+    """
+
+    if column < 0:
+        return ''
+
+    if column not in _COLUMN_NAMES:
+        column_name = ''
+
+        remaining = column + 1
+        while remaining > 0:
+            remaining, remainder = divmod(remaining - 1, 26)
+
+            column_name = string.ascii_uppercase[remainder] + column_name
+
+        _COLUMN_NAMES[column] = column_name
+        _COLUMN_OFFSETS[column_name] = column
+
+    return _COLUMN_NAMES[column]
+
+def column_name_to_column_offset(column_alpha: str) -> int:
+    """
+    Inverse of column_offset_to_column_name, so A -> 0, Z -> 25, AA -> 26.
+    """
+
+    if column_alpha not in _COLUMN_OFFSETS:
+        offset = 0
+
+        for letter in column_alpha:
+            offset = offset * 26 + string.ascii_uppercase.index(letter) + 1
+
+        _COLUMN_OFFSETS[column_alpha] = offset - 1
+        _COLUMN_NAMES[offset - 1] = column_alpha
+
+    return _COLUMN_OFFSETS[column_alpha]
+
+class _Reference(str, abc.ABC):
+    """
+    A1 references are still plain strings everywhere they're used - as keys into query results, in URLs, in saved game
+    data - so these are str subclasses that carry their parsed form along, and compare and hash the same as the string.
+    """
+
+    sheet_name: Optional[str]
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f'{type(self).__name__} is immutable.')
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f'{type(self).__name__} is immutable.')
+
+    def __reduce__(self):
+        return type(self), (str(self),)
+
+    @property
+    @abc.abstractmethod
+    def local(self) -> '_Reference':
+        """
+        The reference without any sheet name in front of it.
+        """
+
+        raise NotImplementedError('Implement me!')
+
+class CellRef(_Reference):
+    column: int # Zero-based
+    row: int # One-based
+
+    def __new__(cls, reference: str):
+        sheet_name, local_reference = _split_sheet_name(reference)
+
+        match = CELL_PATTERN.fullmatch(local_reference)
+
+        if match is None:
+            raise ValueError(f'Invalid sheet reference "{reference}": It should be capital letters followed by numbers.')
+
+        cell_ref = super().__new__(cls, reference)
+
+        object.__setattr__(cell_ref, 'sheet_name', sheet_name)
+        object.__setattr__(cell_ref, 'column', column_name_to_column_offset(match.group(1)))
+        object.__setattr__(cell_ref, 'row', int(match.group(2)))
+
+        return cell_ref
+
+    @classmethod
+    def from_offsets(cls, column: int, row: int, sheet_name: Optional[str] = None) -> 'CellRef':
+        local_reference = f'{column_offset_to_column_name(column)}{row}'
+
+        return to_reference(local_reference if sheet_name is None else f'{sheet_name}!{local_reference}')
+
+    @property
+    def column_name(self) -> str:
+        return column_offset_to_column_name(self.column)
+
+    @property
+    def local(self) -> 'CellRef':
+        return self if self.sheet_name is None else CellRef.from_offsets(self.column, self.row)
+
+    def offset(self, column_offset: int, row_offset: int) -> 'CellRef':
+        if column_offset == 0 and row_offset == 0:
+            return self
+
+        if self.row + row_offset <= 0:
+            raise ValueError(f'Invalid combination of sheet reference "{self}" and row offset "{row_offset}" given row "{self.row}" - cannot go above row 1.')
+
+        if self.column + column_offset < 0:
+            raise ValueError(
+                f'Invalid combination of column "{self.column_name}" and column offset "{column_offset}" '
+                f'given column "{self.column_name}" - cannot go back past column 1.'
+            )
+
+        return CellRef.from_offsets(self.column + column_offset, self.row + row_offset, sheet_name=self.sheet_name)
+
+class RangeRef(_Reference):
+    start: CellRef
+    end: CellRef
+
+    min_column: int
+    min_row: int
+    max_column: int
+    max_row: int
+
+    def __new__(cls, reference: str):
+        sheet_name, local_reference = _split_sheet_name(reference)
+
+        match = RANGE_PATTERN.fullmatch(local_reference)
+
+        if match is None:
+            raise ValueError(f'Invalid sheet range "{reference}": It should be two cell references separated by a colon.')
+
+        range_ref = super().__new__(cls, reference)
+
+        start = to_reference(match.group(1))
+        end = to_reference(match.group(2))
+
+        object.__setattr__(range_ref, 'sheet_name', sheet_name)
+        object.__setattr__(range_ref, 'start', start)
+        object.__setattr__(range_ref, 'end', end)
+        object.__setattr__(range_ref, 'min_column', min(start.column, end.column))
+        object.__setattr__(range_ref, 'min_row', min(start.row, end.row))
+        object.__setattr__(range_ref, 'max_column', max(start.column, end.column))
+        object.__setattr__(range_ref, 'max_row', max(start.row, end.row))
+
+        return range_ref
+
+    @classmethod
+    def from_offsets(cls, min_column: int, min_row: int, max_column: int, max_row: int, sheet_name: Optional[str] = None) -> 'RangeRef':
+        local_reference = f'{column_offset_to_column_name(min_column)}{min_row}:{column_offset_to_column_name(max_column)}{max_row}'
+
+        return to_reference(local_reference if sheet_name is None else f'{sheet_name}!{local_reference}')
+
+    @property
+    def local(self) -> 'RangeRef':
+        return self if self.sheet_name is None else to_reference(f'{self.start}:{self.end}')
+
+    @property
+    def num_columns(self) -> int:
+        return self.max_column - self.min_column + 1
+
+    @property
+    def num_rows(self) -> int:
+        return self.max_row - self.min_row + 1
+
+    def cells(self) -> Iterator[CellRef]:
+        """
+        Every cell in the range, row by row.
+        """
+
+        for row in range(self.min_row, self.max_row + 1):
+            for column in range(self.min_column, self.max_column + 1):
+                yield CellRef.from_offsets(column, row)
+
+    def contains(self, reference: Union[str, CellRef, 'RangeRef']) -> bool:
+        min_column, min_row, max_column, max_row = get_bounds(reference)
+
+        return (
+            self.min_column <= min_column and max_column <= self.max_column and
+            self.min_row <= min_row and max_row <= self.max_row
+        )
+
+    def union(self, other: Union[str, CellRef, 'RangeRef']) -> 'RangeRef':
+        return get_bounding_box([self, other])
+
+def _split_sheet_name(reference: str) -> Tuple[Optional[str], str]:
+    if '!' not in reference:
+        return None, reference
+
+    match = SHEET_NAME_PATTERN.fullmatch(reference)
+
+    if match is None:
+        raise ValueError(f'Invalid sheet reference "{reference}".')
+
+    return match.group(1), match.group(2)
+
+_PARSED_REFERENCES: Dict[str, Union[CellRef, RangeRef]] = {}
+
+def to_reference(reference: Union[str, CellRef, RangeRef]) -> Union[CellRef, RangeRef]:
+    """
+    Parses a cell ("B2") or range ("B2:C5"), optionally on a named sheet ("Cause / Factions!AQ15"). Parsed references
+    are kept, so each distinct reference only ever goes through the regexes once.
+    """
+
+    if isinstance(reference, _Reference):
+        return reference
+
+    if not isinstance(reference, str):
+        raise ValueError(f'References must be str, not {reference}')
+
+    if reference not in _PARSED_REFERENCES:
+        local_reference = reference.rsplit('!', 1)[-1]
+
+        _PARSED_REFERENCES[reference] = RangeRef(reference) if ':' in local_reference else CellRef(reference)
+
+    return _PARSED_REFERENCES[reference]
+
+def get_bounds(reference: Union[str, CellRef, RangeRef]) -> Tuple[int, int, int, int]:
+    """
+    Min column, min row, max column and max row covered by a cell or range.
+    """
+
+    reference = to_reference(reference)
+
+    if isinstance(reference, CellRef):
+        return reference.column, reference.row, reference.column, reference.row
+
+    return reference.min_column, reference.min_row, reference.max_column, reference.max_row
+
+def get_bounding_box(references: Iterable[Union[str, CellRef, RangeRef]]) -> RangeRef:
+    """
+    The smallest range covering every given cell and range on a sheet.
+    """
+
+    all_bounds = [get_bounds(reference) for reference in references]
+
+    if len(all_bounds) == 0:
+        raise ValueError('Cannot compute the bounding box of no ranges or cells.')
+
+    return RangeRef.from_offsets(
+        min(bounds[0] for bounds in all_bounds),
+        min(bounds[1] for bounds in all_bounds),
+        max(bounds[2] for bounds in all_bounds),
+        max(bounds[3] for bounds in all_bounds),
+    )
+
+def parse_cell_references(cell_references: Mapping) -> Dict:
+    """
+    A copy of a CELL_REFERENCES map with every reference in it parsed.
+    """
+
+    return {
+        key: parse_cell_references(value) if isinstance(value, Mapping) else to_reference(value) for key, value in cell_references.items()
+    }
+
+def freeze_cell_references(cell_references: Mapping) -> Mapping:
+    """
+    A read-only copy of a CELL_REFERENCES map with every reference in it parsed, so it can be shared between characters.
+    """
+
+    return types.MappingProxyType({
+        key: freeze_cell_references(value) if isinstance(value, Mapping) else to_reference(value) for key, value in cell_references.items()
+    })
+
+def flatten_cell_references(cell_references: Union[Mapping, CellRef, RangeRef]) -> List[Union[CellRef, RangeRef]]:
+    if isinstance(cell_references, Mapping):
+        return [reference for nested_references in cell_references.values() for reference in flatten_cell_references(nested_references)]
+
+    return [to_reference(cell_references)]
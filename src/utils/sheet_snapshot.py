@@ -0,0 +1,58 @@
+from typing import Any, List, Optional, Union
+
+from src.utils.sheet_grid import SheetGrid
+from src.utils.sheet_references import CellRef, RangeRef, to_reference
+
+class SheetSnapshot:
+    """
+    A single read of a rectangle of a sheet, which any cell or range inside that rectangle can then be looked up in without
+    another request.
+    """
+
+    def __init__(self, snapshot_range: Union[str, RangeRef], values: Optional[Union[List[List[Any]], SheetGrid]], blank_value: Optional[str] = ''):
+        self.snapshot_range = to_reference(snapshot_range)
+
+        if not isinstance(self.snapshot_range, RangeRef):
+            raise ValueError(f'Snapshots must be of a range, not "{snapshot_range}".')
+
+        self.values = values # As given, so callers can tell whether a fresh read actually changed anything
+
+        self.blank_value = blank_value # What empty cells come back as, which depends on how the values were rendered
+
+        self.grid = values if isinstance(values, SheetGrid) else SheetGrid(values, blank_value=blank_value)
+
+    def contains(self, range_or_cell: Union[str, CellRef, RangeRef]) -> bool:
+        return self.snapshot_range.contains(range_or_cell)
+
+    def _get_cell(self, column: int, row: int) -> Any:
+        return self.grid.get(column - self.snapshot_range.min_column, row - self.snapshot_range.min_row)
+
+    def get(self, range_or_cell: Union[str, CellRef, RangeRef]) -> Optional[Union[Any, List[List[Any]]]]:
+        """
+        Returns what the API would have returned for this cell or range on its own: None if it's empty, and for ranges, rows
+        with trailing blanks and trailing empty rows trimmed.
+        """
+
+        reference = to_reference(range_or_cell)
+
+        if not self.contains(reference):
+            raise IndexError(f'"{range_or_cell}" is outside of the snapshot "{self.snapshot_range}".')
+
+        if isinstance(reference, CellRef):
+            value = self._get_cell(reference.column, reference.row)
+
+            return value if value != self.blank_value else None
+
+        rows = []
+        for row in range(reference.min_row, reference.max_row + 1):
+            row_values = [self._get_cell(column, row) for column in range(reference.min_column, reference.max_column + 1)]
+
+            while len(row_values) and row_values[-1] == self.blank_value:
+                row_values.pop()
+
+            rows.append(row_values)
+
+        while len(rows) and len(rows[-1]) == 0:
+            rows.pop()
+
+        return rows if len(rows) else None
@@ -0,0 +1,149 @@
+import asyncio
+import collections
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.utils.shared_fetch import SharedFetch
+from src.utils.sheets_requests import MAX_RANGES_PER_REQUEST, MAX_URL_LENGTH
+
+BatchKey = Tuple[str, str] # (sheet_name, range_or_cell)
+SheetNameData = Dict[str, List[str]]
+BatchId = Tuple[str, Tuple[Tuple[str, Any], ...]] # (spreadsheet_id, sorted fetch kwargs)
+
+class SheetsBatcher:
+    """
+    Holds reads against a spreadsheet for a short window, then merges everything that arrived in that window into as few
+    batchGet calls as the URL length and range limits allow, and hands each caller back just the cells it asked for.
+    Each batch runs as a SharedFetch of everyone in it, rather than in the context of whoever's read opened the window.
+    """
+
+    def __init__(
+        self,
+        window: float,
+        fetch: Callable[..., Awaitable[Dict[str, Dict[str, Any]]]], # (spreadsheet_id, sheet_name_data, **fetch_kwargs)
+        chunk: Callable[..., List[List[BatchKey]]], # (spreadsheet_id, keys, max_ranges, max_url_length, **fetch_kwargs)
+        max_ranges: int = MAX_RANGES_PER_REQUEST,
+        max_url_length: int = MAX_URL_LENGTH
+    ):
+        self.window = window
+        self.fetch = fetch
+        self.chunk = chunk
+        self.max_ranges = max_ranges
+        self.max_url_length = max_url_length
+
+        self.pending: Dict[BatchId, List[Tuple[List[BatchKey], asyncio.Future, contextvars.Context]]] = {}
+        self.flush_tasks = set()
+
+        self.stats = {
+            'reads': 0,
+            'batches': 0,
+            'api_calls': 0,
+        }
+
+    async def read(self, spreadsheet_id: str, sheet_name_data: SheetNameData, **fetch_kwargs) -> Dict[str, Dict[str, Any]]:
+        """
+        Any fetch_kwargs, like how values should be rendered, are passed on to fetch, and only reads with the same ones are
+        batched together.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        keys = [
+            (sheet_name, range_or_cell) for sheet_name, ranges_or_cells in sheet_name_data.items() for range_or_cell in ranges_or_cells
+        ]
+
+        future = loop.create_future()
+
+        batch_id = (spreadsheet_id, tuple(sorted(fetch_kwargs.items())))
+
+        if batch_id not in self.pending:
+            self.pending[batch_id] = []
+
+            loop.call_later(self.window, self._schedule_flush, batch_id)
+
+        self.pending[batch_id].append((keys, future, contextvars.copy_context()))
+
+        self.stats['reads'] += 1
+
+        return await future
+
+    def _schedule_flush(self, batch_id: BatchId):
+        # Otherwise call_later would run it in the context of whichever read opened the window
+        task = asyncio.get_running_loop().create_task(self._flush(batch_id), context=contextvars.Context())
+
+        # The loop only keeps weak references to tasks, so hold on to it until it's done
+        self.flush_tasks.add(task)
+        task.add_done_callback(self.flush_tasks.discard)
+
+    async def _flush(self, batch_id: BatchId):
+        spreadsheet_id, fetch_kwargs = batch_id[0], dict(batch_id[1])
+
+        pending = self.pending.pop(batch_id, [])
+
+        pending = [(keys, future, context) for keys, future, context in pending if not future.done()]
+
+        if len(pending) == 0:
+            return
+
+        all_keys = list(dict.fromkeys(key for keys, _, _ in pending for key in keys))
+
+        shared_fetch = SharedFetch([context for _, _, context in pending], num_keys=len(all_keys))
+
+        chunks = shared_fetch.context.run(self.chunk, spreadsheet_id, all_keys, self.max_ranges, self.max_url_length, **fetch_kwargs)
+
+        self.stats['batches'] += 1
+        self.stats['api_calls'] += len(chunks)
+
+        loop = asyncio.get_running_loop()
+
+        outcomes = await asyncio.gather(
+            *[
+                loop.create_task(self.fetch(spreadsheet_id, self._to_sheet_name_data(chunk), **fetch_kwargs), context=shared_fetch.context)
+                    for chunk in chunks
+            ],
+            return_exceptions=True
+        )
+
+        values = {}
+        errors = {}
+        for chunk, outcome in zip(chunks, outcomes):
+            if isinstance(outcome, BaseException):
+                for key in chunk:
+                    errors[key] = outcome
+            else:
+                for sheet_name, sheet_data in outcome.items():
+                    for range_or_cell, value in sheet_data.items():
+                        values[(sheet_name, range_or_cell)] = value
+
+        for keys, future, context in pending:
+            context.run(shared_fetch.charge, len(keys))
+
+            if future.done():
+                continue
+
+            error = next((errors[key] for key in keys if key in errors), None)
+
+            if error is not None:
+                future.set_exception(error)
+            else:
+                result = collections.defaultdict(dict)
+
+                for sheet_name, range_or_cell in keys:
+                    result[sheet_name][range_or_cell] = values.get((sheet_name, range_or_cell))
+
+                future.set_result(result)
+
+    @staticmethod
+    def _to_sheet_name_data(keys: List[BatchKey]) -> SheetNameData:
+        sheet_name_data = collections.defaultdict(list)
+
+        for sheet_name, range_or_cell in keys:
+            sheet_name_data[sheet_name].append(range_or_cell)
+
+        return sheet_name_data
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            **self.stats,
+            'pending_spreadsheets': len(self.pending),
+        }
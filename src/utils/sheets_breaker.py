@@ -0,0 +1,203 @@
+import aiohttp
+import requests
+
+import enum
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from src.utils.exceptions import ForbiddenSpreadsheetError, SpreadsheetUnavailableError
+from src.utils.logger import get_logger
+
+class CircuitState(enum.Enum):
+    CLOSED = 'closed' # Calls go through as normal
+    OPEN = 'open' # Calls fail fast without reaching Sheets
+    HALF_OPEN = 'half_open' # One probe call is let through to see if the spreadsheet's been fixed
+
+FAILURE_THRESHOLDS = {
+    'forbidden': 1, # Won't fix itself until someone changes the sharing settings
+    'not_found': 1,
+    'server_error': 3, # Could be a blip, but a spreadsheet that keeps 500ing is probably too big or broken
+}
+
+OPEN_FOR = 60 # Seconds before the first probe
+MAX_OPEN_FOR = 60 * 60 # Each failed probe doubles the wait, up to this
+NON_CHARACTER_TAB_TTL = 60 * 60 # Seconds to remember a tab isn't a character sheet for
+
+@dataclass
+class SpreadsheetCircuit:
+    state: CircuitState = CircuitState.CLOSED
+    failure_class: Optional[str] = None
+    failures: int = 0
+    opened_at: float = 0.0
+    open_for: float = OPEN_FOR
+    probing: bool = False
+
+def classify_failure(error: BaseException) -> Optional[str]:
+    """
+    Which kind of spreadsheet-specific failure this is, or None if it says nothing about the spreadsheet itself - like a
+    429, which is our quota rather than their spreadsheet.
+    """
+
+    if isinstance(error, ForbiddenSpreadsheetError):
+        return 'forbidden'
+
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+    elif isinstance(error, aiohttp.ClientResponseError):
+        status = error.status
+    else:
+        return None
+
+    if status == 404:
+        return 'not_found'
+    elif status >= 500:
+        return 'server_error'
+
+    return None
+
+class SpreadsheetBreaker:
+    """
+    A circuit breaker per spreadsheet, so that a tracker that's been unshared, deleted or keeps erroring stops using up
+    quota the healthy guilds need. Also remembers which tabs aren't character sheets, so /link doesn't keep rereading
+    them. Shared by the event loop and any threads.
+    """
+
+    def __init__(self, non_character_tab_ttl: float = NON_CHARACTER_TAB_TTL):
+        self.non_character_tab_ttl = non_character_tab_ttl
+
+        self.lock = threading.Lock()
+
+        self.circuits: Dict[str, SpreadsheetCircuit] = {}
+        self.non_character_tabs: Dict[Tuple[str, str], float] = {}
+
+        self.stats = {
+            'opened': 0,
+            'rejected': 0,
+            'probes': 0,
+            'closed': 0,
+            'skipped_tabs': 0,
+        }
+
+    def before_call(self, spreadsheet_id: str):
+        """
+        Raises straight away if the spreadsheet's circuit is open. Once it's been open for long enough, lets a single
+        call through as a probe - everything else keeps failing fast until that probe's done.
+        """
+
+        with self.lock:
+            circuit = self.circuits.get(spreadsheet_id)
+
+            if circuit is None or circuit.state == CircuitState.CLOSED:
+                return
+
+            if circuit.state == CircuitState.OPEN and time.monotonic() - circuit.opened_at >= circuit.open_for:
+                circuit.state = CircuitState.HALF_OPEN
+
+            if circuit.state == CircuitState.HALF_OPEN and not circuit.probing:
+                circuit.probing = True
+
+                self.stats['probes'] += 1
+
+                return
+
+            self.stats['rejected'] += 1
+
+            failure_class = circuit.failure_class
+
+        if failure_class == 'forbidden':
+            raise ForbiddenSpreadsheetError(spreadsheet_id=spreadsheet_id)
+
+        raise SpreadsheetUnavailableError(spreadsheet_id=spreadsheet_id, failure_class=failure_class)
+
+    def record_success(self, spreadsheet_id: str):
+        with self.lock:
+            circuit = self.circuits.pop(spreadsheet_id, None)
+
+            if circuit is not None and circuit.state != CircuitState.CLOSED:
+                self.stats['closed'] += 1
+
+                get_logger().info(f'Closed circuit for spreadsheet "{spreadsheet_id}".')
+
+    def record_failure(self, spreadsheet_id: str, error: BaseException):
+        failure_class = classify_failure(error)
+
+        with self.lock:
+            circuit = self.circuits.get(spreadsheet_id)
+
+            if failure_class is None:
+                if circuit is not None:
+                    circuit.probing = False # Inconclusive, so let the next call probe instead
+
+                return
+
+            if circuit is None:
+                circuit = self.circuits[spreadsheet_id] = SpreadsheetCircuit()
+
+            circuit.failure_class = failure_class
+            circuit.failures += 1
+
+            if circuit.state == CircuitState.HALF_OPEN:
+                circuit.open_for = min(circuit.open_for * 2, MAX_OPEN_FOR)
+            elif circuit.state == CircuitState.CLOSED and circuit.failures < FAILURE_THRESHOLDS[failure_class]:
+                return
+
+            circuit.state = CircuitState.OPEN
+            circuit.opened_at = time.monotonic()
+            circuit.probing = False
+
+            self.stats['opened'] += 1
+
+            get_logger().warning(f'Opened circuit for spreadsheet "{spreadsheet_id}" for {circuit.open_for}s after {failure_class}: {error}')
+
+    def get_state(self, spreadsheet_id: str) -> CircuitState:
+        with self.lock:
+            circuit = self.circuits.get(spreadsheet_id)
+
+            return CircuitState.CLOSED if circuit is None else circuit.state
+
+    def reset(self, spreadsheet_id: str):
+        """
+        Closes the spreadsheet's circuit and forgets its non-character tabs, e.g. when it's deliberately linked again after
+        someone's fixed the sharing or filled in a new character.
+        """
+
+        with self.lock:
+            self.circuits.pop(spreadsheet_id, None)
+
+            for tab_key in [tab_key for tab_key in self.non_character_tabs if tab_key[0] == spreadsheet_id]:
+                del self.non_character_tabs[tab_key]
+
+    def mark_non_character_tab(self, spreadsheet_id: str, sheet_name: str):
+        with self.lock:
+            self.non_character_tabs[(spreadsheet_id, sheet_name)] = time.monotonic() + self.non_character_tab_ttl
+
+    def is_known_non_character_tab(self, spreadsheet_id: str, sheet_name: str) -> bool:
+        with self.lock:
+            expires_at = self.non_character_tabs.get((spreadsheet_id, sheet_name))
+
+            if expires_at is None:
+                return False
+
+            if expires_at <= time.monotonic():
+                del self.non_character_tabs[(spreadsheet_id, sheet_name)]
+
+                return False
+
+            self.stats['skipped_tabs'] += 1
+
+            return True
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                ** self.stats,
+                'open': sum(1 for circuit in self.circuits.values() if circuit.state != CircuitState.CLOSED),
+            }
+
+def get_spreadsheet_breaker() -> SpreadsheetBreaker:
+    if not hasattr(get_spreadsheet_breaker, 'breaker'):
+        get_spreadsheet_breaker.breaker = SpreadsheetBreaker()
+
+    return get_spreadsheet_breaker.breaker
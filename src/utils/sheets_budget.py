@@ -0,0 +1,169 @@
+import contextlib
+import contextvars
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Union
+
+from src.utils.exceptions import SheetsBudgetExceededError
+
+DEFAULT_CALL_BUDGET: Optional[int] = 8 # Sheets calls a single command may make, retries included
+
+# Commands that legitimately read a lot, like linking a 500 tab tracker. None means unlimited.
+COMMAND_CALL_BUDGETS: Dict[str, Optional[int]] = {
+    'link_command': None,
+    'add_character_command': None,
+    'refresh_command': None,
+}
+
+@dataclass
+class CommandUsage:
+    command_name: str
+    budget: Optional[int] = DEFAULT_CALL_BUDGET
+    calls: int = 0
+    ranges: int = 0
+    cells: int = 0
+    bytes: int = 0
+    served_stale: int = 0 # Ranges and cells served from expired cache entries, when they couldn't be read fresh
+    stale_age: float = 0.0 # Seconds since the oldest of those was read
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False) # Sync reads fan out over threads
+
+    def get_remaining_calls(self) -> Optional[int]:
+        if self.budget is None:
+            return None
+
+        return max(self.budget - self.calls, 0)
+
+    def summary(self) -> str:
+        budget = 'unlimited' if self.budget is None else self.budget
+
+        summary = f'{self.calls}/{budget} Sheets calls, {self.ranges} ranges, {self.cells} cells, {self.bytes} bytes'
+
+        if self.served_stale:
+            summary += f', {self.served_stale} served stale'
+
+        return summary
+
+current_command_usage: contextvars.ContextVar[Optional[CommandUsage]] = contextvars.ContextVar('current_command_usage', default=None)
+
+def get_command_budget(command_name: str) -> Optional[int]:
+    return COMMAND_CALL_BUDGETS.get(command_name, DEFAULT_CALL_BUDGET)
+
+def configure_command_budget(command_name: str, budget: Optional[int]):
+    if budget is not None and budget < 1:
+        raise ValueError(f'Budget for "{command_name}" must allow at least 1 call, not {budget}.')
+
+    COMMAND_CALL_BUDGETS[command_name] = budget
+
+def get_usage_metrics() -> Dict[str, Dict[str, Union[int, float]]]:
+    """
+    Sheets usage totalled per command.
+    """
+
+    if not hasattr(get_usage_metrics, 'metrics'):
+        get_usage_metrics.metrics = {}
+
+    return get_usage_metrics.metrics
+
+@contextlib.contextmanager
+def track_command_usage(command_name: str, budget: Optional[int] = None):
+    """
+    Counts the Sheets calls, ranges, cells and bytes used within the block, holding it to the command's budget - the one
+    given, else the configured one.
+    """
+
+    command_usage = CommandUsage(command_name=command_name, budget=budget if budget is not None else get_command_budget(command_name))
+
+    token = current_command_usage.set(command_usage)
+
+    try:
+        yield command_usage
+    finally:
+        current_command_usage.reset(token)
+
+        metrics = get_usage_metrics().setdefault(command_name, {
+            'commands': 0, 'calls': 0, 'ranges': 0, 'cells': 0, 'bytes': 0, 'served_stale': 0, 'max_calls': 0
+        })
+
+        metrics['commands'] += 1
+        metrics['calls'] += command_usage.calls
+        metrics['ranges'] += command_usage.ranges
+        metrics['cells'] += command_usage.cells
+        metrics['bytes'] += command_usage.bytes
+        metrics['served_stale'] += command_usage.served_stale
+        metrics['max_calls'] = max(metrics['max_calls'], command_usage.calls)
+
+def is_over_budget(num_calls: int = 1) -> bool:
+    """
+    Whether making this many more calls would take the current command over its budget.
+    """
+
+    command_usage = current_command_usage.get()
+
+    if command_usage is None or command_usage.budget is None:
+        return False
+
+    return command_usage.calls + num_calls > command_usage.budget
+
+def charge_call():
+    """
+    Counts a call against the current command, failing fast instead if it has none left - better that than queueing
+    behind quota the rest of the guilds need.
+    """
+
+    command_usage = current_command_usage.get()
+
+    if command_usage is None:
+        return
+
+    with command_usage.lock:
+        if command_usage.budget is not None and command_usage.calls >= command_usage.budget:
+            raise SheetsBudgetExceededError(command_name=command_usage.command_name, budget=command_usage.budget)
+
+        command_usage.calls += 1
+
+def check_budget():
+    """
+    Fails fast, as charge_call would, without counting a call - for calls made on the command's behalf elsewhere, like a
+    fetch shared with other commands, and charged to it afterwards.
+    """
+
+    command_usage = current_command_usage.get()
+
+    if command_usage is None:
+        return
+
+    if command_usage.budget is not None and command_usage.calls >= command_usage.budget:
+        raise SheetsBudgetExceededError(command_name=command_usage.command_name, budget=command_usage.budget)
+
+def record_usage(calls: int = 0, ranges: int = 0, cells: int = 0, num_bytes: int = 0, served_stale: int = 0, stale_age: float = 0.0):
+    command_usage = current_command_usage.get()
+
+    if command_usage is None:
+        return
+
+    with command_usage.lock:
+        command_usage.calls += calls
+        command_usage.ranges += ranges
+        command_usage.cells += cells
+        command_usage.bytes += num_bytes
+        command_usage.served_stale += served_stale
+        command_usage.stale_age = max(command_usage.stale_age, stale_age)
+
+def get_stale_notice(command_usage: CommandUsage) -> Optional[str]:
+    """
+    What to tell the user if their command had to make do with old sheet data, or None if it didn't.
+    """
+
+    if not command_usage.served_stale:
+        return None
+
+    minutes = int(command_usage.stale_age // 60)
+
+    if minutes < 1:
+        age = 'less than a minute ago'
+    elif minutes == 1:
+        age = '1 minute ago'
+    else:
+        age = f'{minutes} minutes ago'
+
+    return f'Using cached sheet data from {age}, as Google Sheets is unavailable right now - it\'ll update once Sheets is back.'
@@ -0,0 +1,165 @@
+import collections
+import sys
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from src.utils.sheet_grid import SheetGrid
+from src.utils.sheets_requests import ValueRenderOption
+
+CacheKey = Tuple[str, str, str, ValueRenderOption] # (spreadsheet_id, sheet_name, range_or_cell, value_render_option)
+
+MAX_CACHE_BYTES = 16 * 1024 * 1024
+MAX_STALE = 6 * 60 * 60 # Seconds past expiry that values are kept for, to fall back on when they can't be read fresh
+
+def estimate_size(value: Any) -> int:
+    """
+    Rough memory footprint of a cell value, a nested list of them, or a SheetGrid of them.
+    """
+
+    if isinstance(value, SheetGrid):
+        return sys.getsizeof(value) # Counts its cells, see SheetGrid.__sizeof__
+
+    size = sys.getsizeof(value)
+
+    if isinstance(value, (list, tuple)):
+        size += sum(estimate_size(item) for item in value)
+
+    return size
+
+class SheetsCache:
+    """
+    TTL cache of Sheets cell and range values, evicting the least recently used entries once it holds more than max_bytes.
+    Expired entries are kept for up to max_stale seconds more, for get_stale.
+    """
+
+    def __init__(self, max_bytes: int = MAX_CACHE_BYTES, max_stale: float = 0):
+        self.max_bytes = max_bytes
+        self.max_stale = max_stale
+
+        self.entries: collections.OrderedDict[CacheKey, Tuple[Any, float, int, float]] = collections.OrderedDict() # Value, expiry, size, when set
+        self.current_bytes = 0
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'evicted': 0,
+            'invalidated': 0,
+            'stale_served': 0,
+        }
+
+    def get(self, key: CacheKey) -> Tuple[bool, Any]:
+        """
+        Returns whether the key was found, and its value if so. Cells can legitimately be empty, hence not just None.
+        """
+
+        if key not in self.entries:
+            self.stats['misses'] += 1
+
+            return False, None
+
+        value, expires_at, size, _ = self.entries[key]
+
+        if time.monotonic() >= expires_at:
+            if time.monotonic() >= expires_at + self.max_stale:
+                self._remove(key)
+
+            self.stats['expired'] += 1
+            self.stats['misses'] += 1
+
+            return False, None
+
+        self.entries.move_to_end(key)
+
+        self.stats['hits'] += 1
+
+        return True, value
+
+    def get_stale(self, key: CacheKey) -> Tuple[bool, Any]:
+        """
+        Like get, but also returns values that have expired within the last max_stale seconds.
+        """
+
+        is_cached, value, _ = self.get_stale_with_age(key)
+
+        return is_cached, value
+
+    def get_stale_with_age(self, key: CacheKey) -> Tuple[bool, Any, float]:
+        """
+        As get_stale, along with how many seconds ago the value was read.
+        """
+
+        if key not in self.entries:
+            return False, None, 0.0
+
+        value, expires_at, size, set_at = self.entries[key]
+
+        if time.monotonic() >= expires_at + self.max_stale:
+            self._remove(key)
+
+            return False, None, 0.0
+
+        self.stats['stale_served'] += 1
+
+        return True, value, time.monotonic() - set_at
+
+    def set(self, key: CacheKey, value: Any, ttl: float):
+        if key in self.entries:
+            self._remove(key)
+
+        size = estimate_size(key) + estimate_size(value)
+
+        if size > self.max_bytes:
+            return
+
+        self.entries[key] = (value, time.monotonic() + ttl, size, time.monotonic())
+        self.current_bytes += size
+
+        while self.current_bytes > self.max_bytes:
+            oldest_key = next(iter(self.entries))
+
+            self._remove(oldest_key)
+
+            self.stats['evicted'] += 1
+
+    def invalidate(self, spreadsheet_id: str, sheet_name: Optional[str] = None) -> int:
+        """
+        Drops everything cached for a spreadsheet, or for just one of its tabs. Returns how many entries were dropped.
+        """
+
+        keys_to_remove = [
+            key for key in self.entries
+            if key[0] == spreadsheet_id and (sheet_name is None or key[1] == sheet_name)
+        ]
+
+        for key in keys_to_remove:
+            self._remove(key)
+
+        self.stats['invalidated'] += len(keys_to_remove)
+
+        return len(keys_to_remove)
+
+    def clear(self):
+        self.entries.clear()
+        self.current_bytes = 0
+
+    def _remove(self, key: CacheKey):
+        _, _, size, _ = self.entries.pop(key)
+
+        self.current_bytes -= size
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            **self.stats,
+            'entries': len(self.entries),
+            'bytes': self.current_bytes,
+        }
+
+    def __len__(self):
+        return len(self.entries)
+
+def get_sheets_cache() -> SheetsCache:
+    if not hasattr(get_sheets_cache, 'cache'):
+        get_sheets_cache.cache = SheetsCache(max_stale=MAX_STALE)
+
+    return get_sheets_cache.cache
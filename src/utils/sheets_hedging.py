@@ -0,0 +1,88 @@
+import collections
+import threading
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional, Union
+
+LATENCY_SAMPLES = 100 # Most recent successful calls kept per spreadsheet
+MIN_LATENCY_SAMPLES = 20 # Before which a spreadsheet's p95 isn't trusted, and the overall one is used instead
+HEDGE_PERCENTILE = 0.95
+
+class LatencyTracker:
+    """
+    Recent Sheets call latencies, per spreadsheet and overall. Shared by the event loop and any threads.
+    """
+
+    def __init__(self, max_samples: int = LATENCY_SAMPLES, min_samples: int = MIN_LATENCY_SAMPLES):
+        self.max_samples = max_samples
+        self.min_samples = min_samples
+
+        self.lock = threading.Lock()
+
+        self.latencies: Dict[str, Deque[float]] = {}
+        self.all_latencies: Deque[float] = collections.deque(maxlen=max_samples)
+
+    def record(self, spreadsheet_id: str, latency: float):
+        with self.lock:
+            if spreadsheet_id not in self.latencies:
+                self.latencies[spreadsheet_id] = collections.deque(maxlen=self.max_samples)
+
+            self.latencies[spreadsheet_id].append(latency)
+            self.all_latencies.append(latency)
+
+    def get_percentile(self, spreadsheet_id: str, percentile: float = HEDGE_PERCENTILE) -> Optional[float]:
+        """
+        The spreadsheet's observed latency at this percentile, or the overall one if it's not been seen enough yet. None if
+        there aren't enough samples either way.
+        """
+
+        with self.lock:
+            latencies = self.latencies.get(spreadsheet_id)
+
+            if latencies is None or len(latencies) < self.min_samples:
+                latencies = self.all_latencies
+
+            if len(latencies) < self.min_samples:
+                return None
+
+            sorted_latencies = sorted(latencies)
+
+            return sorted_latencies[min(int(len(sorted_latencies) * percentile), len(sorted_latencies) - 1)]
+
+def get_latency_tracker() -> LatencyTracker:
+    if not hasattr(get_latency_tracker, 'tracker'):
+        get_latency_tracker.tracker = LatencyTracker()
+
+    return get_latency_tracker.tracker
+
+@dataclass
+class HedgingPolicy:
+    percentile: float = HEDGE_PERCENTILE # Hedge calls that haven't come back by this percentile of their spreadsheet's latency
+    min_headroom: float = 0.5 # Fraction of every quota bucket that must be spare to hedge at all
+    min_delay: float = 0.05 # Seconds, so a very fast p95 doesn't double every call
+
+    def __post_init__(self):
+        self.stats = {
+            'hedged': 0,
+            'hedge_won': 0,
+            'skipped_no_headroom': 0,
+        }
+
+    def get_stats(self) -> Dict[str, Union[int, float]]:
+        return {
+            ** self.stats,
+            'win_rate': self.stats['hedge_won'] / self.stats['hedged'] if self.stats['hedged'] else 0.0,
+        }
+
+def configure_hedging(policy: Optional[HedgingPolicy]):
+    """
+    Opts interactive reads in to hedging: one duplicate call for any that are slower than usual, taking whichever answers
+    first. Pass None to turn it back off.
+    """
+
+    get_hedging_policy.policy = policy
+
+def get_hedging_policy() -> Optional[HedgingPolicy]:
+    if not hasattr(get_hedging_policy, 'policy'):
+        get_hedging_policy.policy = None
+
+    return get_hedging_policy.policy
@@ -0,0 +1,223 @@
+import collections
+import contextlib
+import contextvars
+import json
+import threading
+import time
+from typing import Deque, Dict, List, Optional, Union
+
+from src.utils.logger import get_logger
+from src.utils.sheets_scheduler import QUOTAS, SheetsScheduler, get_scheduler
+
+CREDENTIALS_FILEPATH = 'credentials_vermissian.json'
+
+QUOTA_WINDOW = 60 # Seconds, as Sheets quotas are per minute
+DEFAULT_COOLDOWN = 60 # Seconds to rest a key after a 429 that didn't say how long to wait
+
+current_guild_id: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar('current_guild_id', default=None)
+
+@contextlib.contextmanager
+def sheets_guild(guild_id: Optional[int]):
+    """
+    Makes Sheets calls inside the block on the guild's own API key, if it's brought one.
+    """
+
+    token = current_guild_id.set(guild_id)
+
+    try:
+        yield
+    finally:
+        current_guild_id.reset(token)
+
+class ApiKey:
+
+    def __init__(self, key: str, quota_per_minute: float, guild_id: Optional[int] = None):
+        self.key = key
+        self.quota_per_minute = quota_per_minute
+        self.guild_id = guild_id
+
+        self.call_times: Deque[float] = collections.deque()
+        self.cooldown_until = 0.0
+
+        self.calls = 0
+        self.rate_limited = 0
+
+    def get_used(self, now: float) -> int:
+        while len(self.call_times) and self.call_times[0] <= now - QUOTA_WINDOW:
+            self.call_times.popleft()
+
+        return len(self.call_times)
+
+    def is_available(self, now: float) -> bool:
+        return now >= self.cooldown_until and self.get_used(now) < self.quota_per_minute
+
+    def get_available_at(self, now: float) -> float:
+        available_at = self.cooldown_until
+
+        if self.get_used(now) >= self.quota_per_minute:
+            available_at = max(available_at, self.call_times[0] + QUOTA_WINDOW)
+
+        return available_at
+
+    def get_stats(self, now: float) -> Dict[str, Union[int, float, bool]]:
+        return {
+            'calls': self.calls,
+            'used_this_minute': self.get_used(now),
+            'rate_limited': self.rate_limited,
+            'cooling_down': now < self.cooldown_until,
+        }
+
+class SheetsKeyPool:
+    """
+    The operator's API keys, each with its own per-minute quota, plus any keys guilds have brought for their own trackers.
+    Calls go out on the guild's key where there is one, else on whichever operator key has used the least of its quota
+    this minute. Keys that get a 429 rest until Google says they can go again. Shared by the event loop and any threads.
+    """
+
+    def __init__(
+        self,
+        operator_keys: List[str],
+        guild_keys: Optional[Dict[int, str]] = None,
+        quota_per_minute: float = QUOTAS['read_requests_per_minute']
+    ):
+        if len(operator_keys) == 0:
+            raise ValueError('Need at least one Sheets API key.')
+
+        self.quota_per_minute = quota_per_minute
+
+        self.lock = threading.Lock()
+
+        self.operator_keys = [ApiKey(key, quota_per_minute) for key in operator_keys]
+
+        self.guild_keys: Dict[int, ApiKey] = {}
+        for guild_id, key in (guild_keys or {}).items():
+            self.set_guild_key(guild_id, key)
+
+    def _get_api_key(self, key: str) -> Optional[ApiKey]:
+        for api_key in self.operator_keys:
+            if api_key.key == key:
+                return api_key
+
+        for api_key in self.guild_keys.values():
+            if api_key.key == key:
+                return api_key
+
+        return None
+
+    def select_key(self, guild_id: Optional[int] = None) -> str:
+        """
+        The guild's own key if it has one with quota left, else the least loaded operator key. If every key is exhausted,
+        the one that frees up soonest - the scheduler will make the call wait.
+        """
+
+        with self.lock:
+            return self._select_key(guild_id)
+
+    def _select_key(self, guild_id: Optional[int]) -> str:
+        now = time.monotonic()
+
+        guild_key = self.guild_keys.get(guild_id)
+
+        if guild_key is not None and guild_key.is_available(now):
+            return guild_key.key
+
+        available_keys = [api_key for api_key in self.operator_keys if api_key.is_available(now)]
+
+        if len(available_keys):
+            return min(available_keys, key=lambda api_key: api_key.get_used(now)).key
+
+        return min(self.operator_keys, key=lambda api_key: api_key.get_available_at(now)).key
+
+    def take_key(self, guild_id: Optional[int] = None) -> str:
+        """
+        Selects a key as select_key does, and counts a call against it in the same breath so concurrent callers spread out.
+        """
+
+        with self.lock:
+            key = self._select_key(guild_id)
+
+            api_key = self._get_api_key(key)
+            api_key.call_times.append(time.monotonic())
+            api_key.calls += 1
+
+            return key
+
+    def is_available(self, key: str) -> bool:
+        with self.lock:
+            api_key = self._get_api_key(key)
+
+            return api_key is not None and api_key.is_available(time.monotonic())
+
+    def is_guild_key(self, key: str) -> bool:
+        with self.lock:
+            api_key = self._get_api_key(key)
+
+            return api_key is not None and api_key.guild_id is not None
+
+    def record_rate_limited(self, key: str, retry_after: Optional[float] = None):
+        with self.lock:
+            api_key = self._get_api_key(key)
+
+            if api_key is None:
+                return
+
+            api_key.rate_limited += 1
+            api_key.cooldown_until = time.monotonic() + (DEFAULT_COOLDOWN if retry_after is None else retry_after)
+
+        get_logger().warning(f'Sheets API key {mask_key(key)} was rate limited, resting it for {DEFAULT_COOLDOWN if retry_after is None else retry_after}s.')
+
+    def set_guild_key(self, guild_id: int, key: str):
+        with self.lock:
+            self.guild_keys[guild_id] = ApiKey(key, self.quota_per_minute, guild_id=guild_id)
+
+    def remove_guild_key(self, guild_id: int):
+        with self.lock:
+            self.guild_keys.pop(guild_id, None)
+
+    def get_stats(self) -> Dict[str, Dict[str, Union[int, float, bool]]]:
+        with self.lock:
+            now = time.monotonic()
+
+            return {
+                ** {mask_key(api_key.key): api_key.get_stats(now) for api_key in self.operator_keys},
+                ** {f'guild {guild_id}': api_key.get_stats(now) for guild_id, api_key in self.guild_keys.items()},
+            }
+
+def mask_key(key: str) -> str:
+    return f'...{key[-4:]}'
+
+def load_key_pool(filepath: str = CREDENTIALS_FILEPATH) -> SheetsKeyPool:
+    """
+    Reads "google_sheets_api_keys" (a list) and/or the original "google_sheets_api_key", plus any
+    "guild_google_sheets_api_keys" mapping guild IDs to their own keys.
+    """
+
+    with open(filepath, 'r') as f:
+        credentials = json.load(f)
+
+    operator_keys = list(credentials.get('google_sheets_api_keys', []))
+
+    if 'google_sheets_api_key' in credentials and credentials['google_sheets_api_key'] not in operator_keys:
+        operator_keys.insert(0, credentials['google_sheets_api_key'])
+
+    guild_keys = {int(guild_id): key for guild_id, key in credentials.get('guild_google_sheets_api_keys', {}).items()}
+
+    return SheetsKeyPool(operator_keys, guild_keys)
+
+def get_key_pool() -> Optional[SheetsKeyPool]:
+    if not hasattr(get_key_pool, 'pool'):
+        get_key_pool.pool = None
+
+    return get_key_pool.pool
+
+def configure_key_pool(key_pool: Optional[SheetsKeyPool]):
+    """
+    Installs the key pool, and sizes the scheduler to the quota all the operator keys have between them.
+    """
+
+    get_key_pool.pool = key_pool
+
+    if key_pool is not None:
+        get_scheduler.scheduler = SheetsScheduler.from_quotas({
+            quota: per_minute * len(key_pool.operator_keys) for quota, per_minute in QUOTAS.items()
+        })
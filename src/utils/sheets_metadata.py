@@ -0,0 +1,152 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from src.utils.logger import get_logger
+
+METADATA_FILEPATH = os.path.join('cache', 'spreadsheet_metadata.json')
+METADATA_MAX_AGE = 24 * 60 * 60 # Seconds before a spreadsheet's tabs are looked up again, in case any were added
+
+class SpreadsheetMetadataStore:
+    """
+    Each spreadsheet's GID -> tab title map, persisted to disk so that restarts don't refetch metadata for every guild.
+    Entries are only ever replaced or dropped one spreadsheet at a time. Shared by the event loop and any threads, so the
+    lock only covers the entries in memory - writing them out is done without it, and off the loop for async callers.
+    """
+
+    def __init__(self, filepath: Optional[str] = METADATA_FILEPATH, max_age: float = METADATA_MAX_AGE):
+        self.filepath = filepath
+        self.max_age = max_age
+
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock() # Keeps writes from interleaving, so the last one made has the latest entries
+
+        self.entries: Dict[str, Dict] = {}
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stale': 0,
+            'revalidations': 0,
+            'changed': 0,
+        }
+
+        self.load()
+
+    def load(self):
+        if self.filepath is None or not os.path.exists(self.filepath):
+            return
+
+        try:
+            with open(self.filepath, 'r', encoding='utf-8') as f:
+                raw_entries = json.load(f)
+
+            self.entries = {
+                spreadsheet_id: {
+                    'sheets': {int(gid): title for gid, title in entry['sheets'].items()},
+                    'fetched_at': entry['fetched_at'],
+                } for spreadsheet_id, entry in raw_entries.items()
+            }
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            get_logger().warning(f'Ignoring unreadable spreadsheet metadata at "{self.filepath}": {e}')
+
+            self.entries = {}
+
+    def save(self):
+        if self.filepath is None:
+            return
+
+        with self.save_lock:
+            with self.lock:
+                entries = dict(self.entries) # Entries are replaced rather than changed, so a shallow copy is a snapshot
+
+            dirpath = os.path.dirname(self.filepath)
+
+            if len(dirpath):
+                os.makedirs(dirpath, exist_ok=True)
+
+            # Written alongside then swapped in, so a crash mid-write can't leave a truncated file behind
+            temp_filepath = f'{self.filepath}.tmp'
+
+            with open(temp_filepath, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, indent=4)
+
+            os.replace(temp_filepath, self.filepath)
+
+    async def save_async(self):
+        if self.filepath is not None:
+            await asyncio.to_thread(self.save)
+
+    def get(self, spreadsheet_id: str) -> Optional[Dict[int, str]]:
+        """
+        The spreadsheet's known tabs, or None if they're unknown or due revalidating.
+        """
+
+        with self.lock:
+            entry = self.entries.get(spreadsheet_id)
+
+            if entry is None:
+                self.stats['misses'] += 1
+
+                return None
+
+            if time.time() - entry['fetched_at'] > self.max_age:
+                self.stats['stale'] += 1
+
+                return None
+
+            self.stats['hits'] += 1
+
+            return dict(entry['sheets'])
+
+    def _update(self, spreadsheet_id: str, metadata: Dict[int, str]):
+        with self.lock:
+            previous_entry = self.entries.get(spreadsheet_id)
+
+            if previous_entry is not None:
+                self.stats['revalidations'] += 1
+
+                if previous_entry['sheets'] != metadata:
+                    self.stats['changed'] += 1
+
+            self.entries[spreadsheet_id] = {
+                'sheets': dict(metadata),
+                'fetched_at': time.time(),
+            }
+
+    def set(self, spreadsheet_id: str, metadata: Dict[int, str]) -> Dict[int, str]:
+        self._update(spreadsheet_id, metadata)
+
+        self.save()
+
+        return metadata
+
+    async def set_async(self, spreadsheet_id: str, metadata: Dict[int, str]) -> Dict[int, str]:
+        self._update(spreadsheet_id, metadata)
+
+        await self.save_async()
+
+        return metadata
+
+    def invalidate(self, spreadsheet_id: str):
+        with self.lock:
+            removed = self.entries.pop(spreadsheet_id, None) is not None
+
+        if removed:
+            self.save()
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                **self.stats,
+                'spreadsheets': len(self.entries),
+            }
+
+def get_metadata_store() -> SpreadsheetMetadataStore:
+    if not hasattr(get_metadata_store, 'store'):
+        get_metadata_store.store = SpreadsheetMetadataStore()
+
+    return get_metadata_store.store
@@ -0,0 +1,185 @@
+import collections
+import enum
+import os
+import urllib.parse
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from src.utils.sheet_grid import SheetGrid
+
+SHEETS_API_URL = 'https://sheets.googleapis.com/v4/spreadsheets'
+SHEETS_API_URL_VARIABLE = 'SHEETS_API_URL' # Set to point at something else, e.g. benchmarks/fake_sheets_api.py
+
+MAX_RANGES_PER_REQUEST = 100
+MAX_URL_LENGTH = 8000 # Google's front end starts rejecting URLs somewhere past this
+
+RangeKey = Tuple[str, str] # (sheet_name, range_or_cell)
+
+class ValueRenderOption(enum.Enum):
+    FORMATTED_VALUE = 'FORMATTED_VALUE' # What the sheet shows, always as strings
+    UNFORMATTED_VALUE = 'UNFORMATTED_VALUE' # Checkboxes as bools and numbers as numbers, for reads that want typed values
+
+def get_sheets_api_url() -> str:
+    return os.environ.get(SHEETS_API_URL_VARIABLE, SHEETS_API_URL).rstrip('/')
+
+def encode_range(sheet_name: str, range_or_cell: str) -> str:
+    """
+    Percent-encodes a sheet's range for a URL, path or query alike. Everything but the A1 separators gets encoded, so sheet
+    names with "/", "&", "#", "%", "+" or "?" in them reach the API intact.
+    """
+
+    return urllib.parse.quote(f'{sheet_name}!{range_or_cell}', safe='!:')
+
+def _to_typed_value(value: Union[str, bool, int, float]) -> Optional[Union[str, bool, int, float]]:
+    if value.__class__ is float and value.is_integer(): # Sheets has no integers, but stress and traits always are
+        return int(value)
+    elif value == '':
+        return None
+
+    return value
+
+def _to_typed_row(row: List[Union[str, bool, int, float]]) -> List[Optional[Union[str, bool, int, float]]]:
+    # Inlined, as this runs for every cell of every range
+    return [
+        None if value == '' else int(value) if value.__class__ is float and value.is_integer() else value for value in row
+    ]
+
+@dataclass(frozen=True)
+class ValuesRequest:
+    url: str
+    keys: Tuple[RangeKey, ...] # In the order the API returns them
+    value_render_option: ValueRenderOption = ValueRenderOption.FORMATTED_VALUE
+
+    def parse_response(self, response_json: Dict) -> Dict[str, Dict[str, Optional[Union[str, bool, int, float, SheetGrid]]]]:
+        if len(self.keys) == 1:
+            raw_response_data = [ response_json ]
+        else:
+            raw_response_data = response_json['valueRanges']
+
+        is_typed = ( self.value_render_option == ValueRenderOption.UNFORMATTED_VALUE )
+
+        response_data = collections.defaultdict(dict)
+        for (sheet_name, range_or_cell), response_datum in zip(self.keys, raw_response_data):
+            if 'values' in response_datum:
+                is_range = ( ':' in range_or_cell )
+
+                if is_range and is_typed:
+                    response_data[sheet_name][range_or_cell] = SheetGrid(
+                        [_to_typed_row(row) for row in response_datum['values']], blank_value=None, origin=range_or_cell
+                    )
+                elif is_range:
+                    response_data[sheet_name][range_or_cell] = SheetGrid(response_datum['values'], origin=range_or_cell)
+                elif is_typed:
+                    response_data[sheet_name][range_or_cell] = _to_typed_value(response_datum['values'][0][0])
+                else:
+                    response_data[sheet_name][range_or_cell] = response_datum['values'][0][0]
+            else:
+                response_data[sheet_name][range_or_cell] = None
+
+        return response_data
+
+def _get_query(api_key: str, value_render_option: ValueRenderOption, is_batch: bool) -> str:
+    """
+    Asks for just the values - not the ranges and dimensions echoed back around them - rendered as requested.
+    """
+
+    query = f'key={api_key}&majorDimension=ROWS&valueRenderOption={value_render_option.value}'
+
+    if value_render_option == ValueRenderOption.UNFORMATTED_VALUE:
+        query += '&dateTimeRenderOption=FORMATTED_STRING' # Rather than days since 1899
+
+    if is_batch:
+        query += '&fields=valueRanges(values)'
+    else:
+        query += '&fields=values'
+
+    return query
+
+def _get_batch_get_url(spreadsheet_id: str, api_key: str, value_render_option: ValueRenderOption) -> str:
+    return f'{get_sheets_api_url()}/{spreadsheet_id}/values:batchGet?{_get_query(api_key, value_render_option, is_batch=True)}'
+
+def _build_values_request(spreadsheet_id: str, api_key: str, keys: List[RangeKey], value_render_option: ValueRenderOption) -> ValuesRequest:
+    if len(keys) == 1:
+        url = f'{get_sheets_api_url()}/{spreadsheet_id}/values/{encode_range(*keys[0])}?{_get_query(api_key, value_render_option, is_batch=False)}'
+    else:
+        range_expression = '&'.join(f'ranges={encode_range(*key)}' for key in keys)
+
+        url = f'{_get_batch_get_url(spreadsheet_id, api_key, value_render_option)}&{range_expression}'
+
+    return ValuesRequest(url=url, keys=tuple(keys), value_render_option=value_render_option)
+
+def measure_values_request(
+    spreadsheet_id: str,
+    api_key: str,
+    keys: Iterable[RangeKey],
+    value_render_option: ValueRenderOption = ValueRenderOption.FORMATTED_VALUE
+) -> int:
+    """
+    Length of the URL a single batchGet for all of these would need.
+    """
+
+    return len(_get_batch_get_url(spreadsheet_id, api_key, value_render_option)) + sum(len('&ranges=') + len(encode_range(*key)) for key in keys)
+
+def build_values_requests(
+    spreadsheet_id: str,
+    api_key: str,
+    keys: List[RangeKey],
+    value_render_option: ValueRenderOption = ValueRenderOption.FORMATTED_VALUE,
+    max_ranges: int = MAX_RANGES_PER_REQUEST,
+    max_url_length: int = MAX_URL_LENGTH
+) -> List[ValuesRequest]:
+    """
+    As few GETs as it takes to read every range, with each one kept under the range and URL length limits.
+    """
+
+    if len(keys) == 0:
+        raise ValueError(f'Must pass at least one range or cell to query.')
+
+    base_length = len(_get_batch_get_url(spreadsheet_id, api_key, value_render_option))
+
+    chunks = []
+    current_chunk = []
+    current_length = base_length
+
+    for key in keys:
+        parameter_length = len('&ranges=') + len(encode_range(*key))
+
+        if len(current_chunk) and (len(current_chunk) >= max_ranges or current_length + parameter_length > max_url_length):
+            chunks.append(current_chunk)
+
+            current_chunk = []
+            current_length = base_length
+
+        current_chunk.append(key)
+        current_length += parameter_length
+
+    chunks.append(current_chunk)
+
+    return [_build_values_request(spreadsheet_id, api_key, chunk, value_render_option) for chunk in chunks]
+
+def count_cells(response_data: Dict[str, Dict[str, Optional[Union[str, bool, int, float, SheetGrid]]]]) -> int:
+    """
+    How many non-empty cells came back.
+    """
+
+    num_cells = 0
+
+    for sheet_data in response_data.values():
+        for value in sheet_data.values():
+            if isinstance(value, SheetGrid):
+                num_cells += sum(value.row_lengths)
+            elif value is not None:
+                num_cells += 1
+
+    return num_cells
+
+def merge_values_responses(
+    responses: Iterable[Dict[str, Dict[str, Optional[Union[str, int, float, List]]]]]
+) -> Dict[str, Dict[str, Optional[Union[str, int, float, List]]]]:
+    merged_data = collections.defaultdict(dict)
+
+    for response_data in responses:
+        for sheet_name, sheet_data in response_data.items():
+            merged_data[sheet_name].update(sheet_data)
+
+    return merged_data
@@ -0,0 +1,156 @@
+import aiohttp
+import requests
+
+import asyncio
+import contextlib
+import contextvars
+import datetime
+import email.utils
+import random
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
+
+from src.utils.exceptions import TooManyRequestsError
+from src.utils.deadline import get_remaining_time
+from src.utils.logger import get_logger
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_retries: int
+    base_delay: float # Seconds
+    max_delay: float # Seconds
+
+RETRY_POLICIES = {
+    'rate_limited': RetryPolicy(max_retries=3, base_delay=1, max_delay=8),
+    'server_error': RetryPolicy(max_retries=2, base_delay=0.25, max_delay=2),
+    'connection_error': RetryPolicy(max_retries=1, base_delay=0.1, max_delay=1),
+}
+
+BACKGROUND_RETRY_BUDGET = 30 # Seconds, for calls made outside of a command e.g. restoring games on startup
+
+@dataclass
+class CommandRetries:
+    command_name: str
+    retries: int = 0
+    added_latency: float = 0.0
+
+current_command_retries: contextvars.ContextVar[Optional[CommandRetries]] = contextvars.ContextVar('current_command_retries', default=None)
+
+def get_retry_metrics() -> Dict[str, Dict[str, Union[int, float]]]:
+    """
+    Retries and the latency they added, totalled per command.
+    """
+
+    if not hasattr(get_retry_metrics, 'metrics'):
+        get_retry_metrics.metrics = {}
+
+    return get_retry_metrics.metrics
+
+@contextlib.contextmanager
+def track_command_retries(command_name: str):
+    command_retries = CommandRetries(command_name=command_name)
+
+    token = current_command_retries.set(command_retries)
+
+    try:
+        yield command_retries
+    finally:
+        current_command_retries.reset(token)
+
+        metrics = get_retry_metrics().setdefault(command_name, {'calls': 0, 'retries': 0, 'added_latency': 0.0})
+
+        metrics['calls'] += 1
+        metrics['retries'] += command_retries.retries
+        metrics['added_latency'] += command_retries.added_latency
+
+def parse_retry_after(retry_after: Optional[str]) -> Optional[float]:
+    """
+    Retry-After can be a number of seconds, or an HTTP date.
+    """
+
+    if retry_after is None:
+        return None
+
+    try:
+        return max(float(retry_after), 0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+
+    return max((retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds(), 0)
+
+def classify_error(error: BaseException) -> Optional[str]:
+    if isinstance(error, TooManyRequestsError):
+        return 'rate_limited'
+    elif isinstance(error, requests.HTTPError) and error.response is not None and error.response.status_code >= 500:
+        return 'server_error'
+    elif isinstance(error, aiohttp.ClientResponseError) and error.status >= 500:
+        return 'server_error'
+    elif isinstance(error, (requests.ConnectionError, requests.Timeout, aiohttp.ClientConnectionError, asyncio.TimeoutError)):
+        return 'connection_error'
+
+    return None
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    if isinstance(error, TooManyRequestsError):
+        return error.retry_after
+    elif isinstance(error, requests.HTTPError) and error.response is not None:
+        return parse_retry_after(error.response.headers.get('Retry-After'))
+    elif isinstance(error, aiohttp.ClientResponseError) and error.headers is not None:
+        return parse_retry_after(error.headers.get('Retry-After'))
+
+    return None
+
+def compute_delay(policy: RetryPolicy, retry_number: int, retry_after: Optional[float] = None) -> float:
+    """
+    Capped exponential backoff with full jitter, unless the server told us how long to wait.
+    """
+
+    if retry_after is not None:
+        return retry_after
+
+    return random.uniform(0, min(policy.max_delay, policy.base_delay * (2 ** retry_number)))
+
+def get_remaining_budget() -> float:
+    remaining_time = get_remaining_time()
+
+    if remaining_time is None:
+        return BACKGROUND_RETRY_BUDGET
+
+    return remaining_time
+
+def get_retry_delay(error: BaseException, retry_number: int) -> Optional[float]:
+    """
+    How long to wait before retrying after this error, or None if it shouldn't be retried - either because it's not a
+    transient error, the policy's out of retries, or waiting would blow the command's deadline.
+    """
+
+    error_class = classify_error(error)
+
+    if error_class is None:
+        return None
+
+    policy = RETRY_POLICIES[error_class]
+
+    if retry_number >= policy.max_retries:
+        return None
+
+    delay = compute_delay(policy, retry_number, get_retry_after(error))
+
+    if delay > get_remaining_budget():
+        get_logger().info(f'Not retrying {error_class} error as waiting {delay:.2f}s would miss the deadline.')
+
+        return None
+
+    return delay
+
+def record_retry(delay: float):
+    command_retries = current_command_retries.get()
+
+    if command_retries is not None:
+        command_retries.retries += 1
+        command_retries.added_latency += delay
@@ -0,0 +1,218 @@
+import asyncio
+import contextlib
+import contextvars
+import enum
+import threading
+import time
+from typing import Dict, List, Optional, Union
+
+from src.utils.logger import get_logger
+
+class Priority(enum.IntEnum):
+    HIGH = 0 # Interactive commands, where someone is waiting on the response
+    LOW = 1 # /link scans, restoring games on startup, prefetches
+
+sheets_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar('sheets_priority', default=Priority.HIGH)
+
+@contextlib.contextmanager
+def sheets_priority_lane(priority: Priority):
+    """
+    Runs any Sheets calls made inside the block, including in threads started with asyncio.to_thread, in the given lane.
+    """
+
+    token = sheets_priority.set(priority)
+
+    try:
+        yield
+    finally:
+        sheets_priority.reset(token)
+
+# Google's default per-minute read quota for a project.
+QUOTAS = {
+    'read_requests_per_minute': 300,
+}
+
+LOW_PRIORITY_RESERVE = 0.2 # Fraction of each bucket that low priority calls can't use, so rolls don't queue behind a /link
+SLOW_WAIT_WARNING = 1 # Seconds
+
+class TokenBucket:
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.refill_per_second)
+        self.last_refill = now
+
+    def time_until(self, tokens_needed: float) -> float:
+        self._refill()
+
+        if self.tokens >= tokens_needed:
+            return 0
+
+        return (tokens_needed - self.tokens) / self.refill_per_second
+
+    def take(self, tokens: float = 1):
+        self._refill()
+
+        self.tokens -= tokens
+
+    def drain(self):
+        self._refill()
+
+        self.tokens = 0
+
+class SheetsScheduler:
+    """
+    Models the Sheets quotas as token buckets, and makes callers queue for a token rather than hitting a 429. Shared by
+    the event loop and any threads, hence the threading lock rather than an asyncio one.
+    """
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, buckets: List[TokenBucket], low_priority_reserve: float = LOW_PRIORITY_RESERVE):
+        self.buckets = buckets
+        self.low_priority_reserve = low_priority_reserve
+
+        self.lock = threading.Lock()
+
+        self.waiting = {priority: 0 for priority in Priority}
+
+        self.stats = {
+            priority: {
+                'granted': 0,
+                'queued': 0,
+                'total_wait': 0.0,
+                'max_wait': 0.0,
+            } for priority in Priority
+        }
+        self.rate_limited = 0
+
+    @classmethod
+    def from_quotas(cls, quotas: Dict[str, float]) -> 'SheetsScheduler':
+        return cls([TokenBucket(capacity=per_minute, refill_per_second=per_minute / 60) for per_minute in quotas.values()])
+
+    def _try_acquire(self, priority: Priority) -> float:
+        """
+        Takes a token from every bucket and returns 0 if possible, otherwise returns how long to wait before trying again.
+        """
+
+        with self.lock:
+            if priority == Priority.LOW and self.waiting[Priority.HIGH] > 0:
+                return self.POLL_INTERVAL
+
+            wait = 0
+            for bucket in self.buckets:
+                reserve = bucket.capacity * self.low_priority_reserve if priority == Priority.LOW else 0
+
+                wait = max(wait, bucket.time_until(1 + reserve))
+
+            if wait > 0:
+                return max(wait, self.POLL_INTERVAL) if priority == Priority.LOW else wait
+
+            for bucket in self.buckets:
+                bucket.take()
+
+            return 0
+
+    def _start_waiting(self, priority: Priority):
+        with self.lock:
+            self.waiting[priority] += 1
+
+    def _stop_waiting(self, priority: Priority, waited: float):
+        with self.lock:
+            self.waiting[priority] -= 1
+
+            lane_stats = self.stats[priority]
+            lane_stats['granted'] += 1
+            lane_stats['total_wait'] += waited
+            lane_stats['max_wait'] = max(lane_stats['max_wait'], waited)
+
+            if waited > 0:
+                lane_stats['queued'] += 1
+
+        if waited > SLOW_WAIT_WARNING:
+            get_logger().warning(f'Sheets call in the {priority.name} lane queued for {waited:.2f}s for quota: {self.get_stats()}')
+
+    def acquire(self, priority: Optional[Priority] = None):
+        priority = sheets_priority.get() if priority is None else priority
+
+        start_time = time.monotonic()
+
+        self._start_waiting(priority)
+
+        try:
+            while (wait := self._try_acquire(priority)) > 0:
+                time.sleep(wait)
+        finally:
+            self._stop_waiting(priority, time.monotonic() - start_time)
+
+    async def acquire_async(self, priority: Optional[Priority] = None):
+        priority = sheets_priority.get() if priority is None else priority
+
+        start_time = time.monotonic()
+
+        self._start_waiting(priority)
+
+        try:
+            while (wait := self._try_acquire(priority)) > 0:
+                await asyncio.sleep(wait)
+        finally:
+            self._stop_waiting(priority, time.monotonic() - start_time)
+
+    def estimate_wait(self, priority: Priority = Priority.HIGH) -> float:
+        """
+        Roughly how long a call joining the given lane now would queue for, counting everyone already waiting ahead of it.
+        """
+
+        with self.lock:
+            ahead = self.waiting[Priority.HIGH] + (self.waiting[Priority.LOW] if priority == Priority.LOW else 0)
+
+            return max(bucket.time_until(1 + ahead) for bucket in self.buckets)
+
+    def has_headroom(self, fraction: float) -> bool:
+        """
+        Whether nothing's queueing and at least this fraction of every bucket is spare, i.e. quota isn't under any pressure.
+        """
+
+        with self.lock:
+            if any(self.waiting.values()):
+                return False
+
+            return all(bucket.time_until(bucket.capacity * fraction) == 0 for bucket in self.buckets)
+
+    def record_rate_limited(self):
+        """
+        Google says we're over quota regardless of what the buckets think, so empty them and make everyone queue.
+        """
+
+        with self.lock:
+            self.rate_limited += 1
+
+            for bucket in self.buckets:
+                bucket.drain()
+
+    def get_stats(self) -> Dict[str, Union[int, float, Dict]]:
+        with self.lock:
+            return {
+                'rate_limited': self.rate_limited,
+                **{
+                    priority.name: {
+                        **self.stats[priority],
+                        'queue_depth': self.waiting[priority],
+                        'mean_wait': self.stats[priority]['total_wait'] / self.stats[priority]['granted'] if self.stats[priority]['granted'] else 0.0
+                    } for priority in Priority
+                }
+            }
+
+def get_scheduler() -> SheetsScheduler:
+    if not hasattr(get_scheduler, 'scheduler'):
+        get_scheduler.scheduler = SheetsScheduler.from_quotas(QUOTAS)
+
+    return get_scheduler.scheduler
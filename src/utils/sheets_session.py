@@ -0,0 +1,202 @@
+import aiohttp
+import requests
+import requests.adapters
+
+import asyncio
+import ssl
+from typing import Dict, Tuple, Union
+
+from src.utils.logger import get_logger
+from src.utils.deadline import get_remaining_time
+
+SESSION_CONFIG = {
+    'pool_size': 20,
+    'connect_timeout': 3.05,
+    'read_timeout': 10,
+    'keepalive_timeout': 60,
+}
+
+MIN_REQUEST_TIMEOUT = 0.5 # Seconds, so a call made right at the deadline still has a chance
+
+SHEETS_HEADERS = {
+    'Accept-Encoding': 'gzip',
+    'User-Agent': 'Vermissian (gzip)', # Google only compresses responses for user agents which mention gzip
+}
+
+def configure_sessions(**config: Union[int, float]):
+    """
+    Overrides the pool size and timeouts used by the shared Sheets sessions. Any existing sessions are dropped so the
+    new settings apply to the next request.
+    """
+
+    unknown_keys = set(config.keys()) - set(SESSION_CONFIG.keys())
+
+    if len(unknown_keys):
+        raise ValueError(f'Unknown session config keys: {sorted(unknown_keys)}')
+
+    SESSION_CONFIG.update(config)
+
+    if hasattr(get_session, 'session'):
+        get_session.session.close()
+        del get_session.session
+
+    if hasattr(get_async_session, 'session'):
+        if not get_async_session.session.closed and not get_async_session.loop.is_closed():
+            # Can't await the close from here, so hand it to the session's own loop and open a new session next time
+            get_async_session.loop.create_task(get_async_session.session.close())
+
+        del get_async_session.session
+
+def get_timeout() -> Tuple[float, float]:
+    return SESSION_CONFIG['connect_timeout'], SESSION_CONFIG['read_timeout']
+
+def get_request_timeout() -> Tuple[float, float]:
+    """
+    Connect and read timeouts for a call made now: the configured ones, cut short to whatever the current command has
+    left so a hung connection can't outlast the interaction.
+    """
+
+    connect_timeout, read_timeout = get_timeout()
+
+    remaining_time = get_remaining_time()
+
+    if remaining_time is None:
+        return connect_timeout, read_timeout
+
+    remaining_time = max(remaining_time, MIN_REQUEST_TIMEOUT)
+
+    return min(connect_timeout, remaining_time), min(read_timeout, remaining_time)
+
+def get_async_request_timeout() -> aiohttp.ClientTimeout:
+    connect_timeout, read_timeout = get_request_timeout()
+
+    remaining_time = get_remaining_time()
+
+    return aiohttp.ClientTimeout(
+        total=None if remaining_time is None else max(remaining_time, MIN_REQUEST_TIMEOUT),
+        sock_connect=connect_timeout,
+        sock_read=read_timeout
+    )
+
+def get_ssl_context() -> ssl.SSLContext:
+    if not hasattr(get_ssl_context, 'context'):
+        get_ssl_context.context = ssl.create_default_context()
+
+    return get_ssl_context.context
+
+def get_session() -> requests.Session:
+    """
+    Process-wide keep-alive session for synchronous Sheets reads (sheet construction, scripts).
+    """
+
+    if not hasattr(get_session, 'session'):
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=SESSION_CONFIG['pool_size'],
+            pool_maxsize=SESSION_CONFIG['pool_size']
+        )
+
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.headers.update(SHEETS_HEADERS)
+
+        get_session.session = session
+        get_session.adapter = adapter
+
+    return get_session.session
+
+def _record_stat(name: str):
+    if not hasattr(_record_stat, 'stats'):
+        _record_stat.stats = {
+            'requests': 0,
+            'connections_created': 0,
+            'connections_reused': 0,
+        }
+
+    _record_stat.stats[name] += 1
+
+async def _on_request_start(session, context, params):
+    _record_stat('requests')
+
+async def _on_connection_create_end(session, context, params):
+    _record_stat('connections_created')
+
+async def _on_connection_reuseconn(session, context, params):
+    _record_stat('connections_reused')
+
+def get_async_session() -> aiohttp.ClientSession:
+    """
+    Process-wide keep-alive session for the bots' Sheets reads. Must be called from inside the running event loop; a new
+    session is opened if the loop has changed since the last call.
+    """
+
+    loop = asyncio.get_running_loop()
+
+    if (
+        not hasattr(get_async_session, 'session') or
+        get_async_session.session.closed or
+        get_async_session.loop is not loop
+    ):
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(_on_request_start)
+        trace_config.on_connection_create_end.append(_on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(_on_connection_reuseconn)
+
+        connector = aiohttp.TCPConnector(
+            limit=SESSION_CONFIG['pool_size'],
+            keepalive_timeout=SESSION_CONFIG['keepalive_timeout'],
+            ssl=get_ssl_context(),
+            ttl_dns_cache=300,
+        )
+
+        get_async_session.session = aiohttp.ClientSession(
+            connector=connector,
+            headers=SHEETS_HEADERS,
+            timeout=aiohttp.ClientTimeout(
+                sock_connect=SESSION_CONFIG['connect_timeout'],
+                sock_read=SESSION_CONFIG['read_timeout']
+            ),
+            trace_configs=[trace_config]
+        )
+        get_async_session.loop = loop
+
+        get_logger().debug(f'Opened shared Sheets session with config {SESSION_CONFIG}')
+
+    return get_async_session.session
+
+async def close_sessions():
+    if hasattr(get_async_session, 'session') and not get_async_session.session.closed:
+        await get_async_session.session.close()
+
+    if hasattr(get_session, 'session'):
+        get_session.session.close()
+        del get_session.session
+
+def get_pool_stats() -> Dict[str, Union[int, float]]:
+    """
+    Connection reuse across both sessions, plus how many connections are currently open.
+    """
+
+    stats = dict(getattr(_record_stat, 'stats', {'requests': 0, 'connections_created': 0, 'connections_reused': 0}))
+
+    open_connections = 0
+
+    if hasattr(get_async_session, 'session') and not get_async_session.session.closed:
+        connector = get_async_session.session.connector
+
+        open_connections += len(getattr(connector, '_acquired', []))
+        open_connections += sum(len(conns) for conns in getattr(connector, '_conns', {}).values())
+
+    if hasattr(get_session, 'session'):
+        pools = get_session.adapter.poolmanager.pools
+
+        for pool in filter(None, [pools.get(pool_key) for pool_key in pools.keys()]):
+            stats['requests'] += pool.num_requests
+            stats['connections_created'] += pool.num_connections
+            stats['connections_reused'] += max(pool.num_requests - pool.num_connections, 0)
+
+            open_connections += pool.pool.qsize() - pool.pool.queue.count(None)
+
+    stats['reuse_rate'] = stats['connections_reused'] / stats['requests'] if stats['requests'] else 0.0
+    stats['open_connections'] = open_connections
+
+    return stats
@@ -0,0 +1,93 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+class FetchAbandonedError(Exception):
+    """
+    Handed to anyone waiting on a fetch whose caller was cancelled before it finished, so that they fetch it themselves.
+    """
+
+class SingleFlight:
+    """
+    Shares in-flight fetches between concurrent callers. Each caller asks for a set of keys; any key already being fetched
+    is waited on rather than fetched again, and only the rest are passed on to the caller's fetch function.
+    """
+
+    def __init__(self):
+        self.in_flight: Dict[Hashable, asyncio.Future] = {}
+
+        self.stats = {
+            'requests': 0, # Calls to get_many
+            'hits': 0, # Calls served entirely by fetches that were already in flight
+            'keys_requested': 0,
+            'keys_merged': 0, # Keys served by another caller's fetch
+            'fetches': 0, # Calls actually made to a fetch function
+        }
+
+    async def get_many(self, keys: List[Hashable], fetch: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]) -> Dict[Hashable, Any]:
+        unique_keys = list(dict.fromkeys(keys))
+
+        waiting = {key: self.in_flight[key] for key in unique_keys if key in self.in_flight}
+        keys_to_fetch = [key for key in unique_keys if key not in waiting]
+
+        self.stats['requests'] += 1
+        self.stats['keys_requested'] += len(unique_keys)
+        self.stats['keys_merged'] += len(waiting)
+
+        if len(keys_to_fetch) == 0:
+            self.stats['hits'] += 1
+
+        results = {}
+
+        if len(keys_to_fetch):
+            loop = asyncio.get_running_loop()
+
+            futures = {key: loop.create_future() for key in keys_to_fetch}
+
+            self.in_flight.update(futures)
+
+            self.stats['fetches'] += 1
+
+            try:
+                fetched = await fetch(keys_to_fetch)
+
+                for key, future in futures.items():
+                    results[key] = fetched.get(key)
+
+                    future.set_result(results[key])
+            except BaseException as e:
+                for future in futures.values():
+                    if future.done():
+                        continue
+
+                    if isinstance(e, asyncio.CancelledError): # Only the caller gave up, not whoever else was waiting on it
+                        future.set_exception(FetchAbandonedError())
+                    else:
+                        future.set_exception(e)
+
+                    future.exception() # Marks it as retrieved, otherwise asyncio complains if nobody was waiting
+
+                raise e
+            finally:
+                for key, future in futures.items():
+                    if self.in_flight.get(key) is future:
+                        del self.in_flight[key]
+
+        abandoned_keys = []
+
+        for key, future in waiting.items():
+            # Shielded so that one caller being cancelled doesn't cancel the fetch for everyone else
+            try:
+                results[key] = await asyncio.shield(future)
+            except FetchAbandonedError:
+                abandoned_keys.append(key)
+
+        if len(abandoned_keys):
+            results.update(await self.get_many(abandoned_keys, fetch))
+
+        return results
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            **self.stats,
+            'in_flight': len(self.in_flight),
+        }
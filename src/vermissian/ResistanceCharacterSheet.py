@@ -3,8 +3,8 @@ import enum
 from typing import Dict, Tuple, Optional, Literal, Union
 
 from src.CharacterSheet import CharacterSheet
-from src.utils.google_sheets import get_from_spreadsheet_api
 from src.utils.exceptions import BotError
+from src.utils.sheets_requests import ValueRenderOption
 
 class SpireSkill(enum.Enum):
     COMPEL      = 'Compel'
@@ -82,29 +82,26 @@ class HeartDomain(enum.Enum):
          raise ValueError(f'Unknown Heart Domain: {name}')
 
 class ResistanceCharacterSheet(CharacterSheet, abc.ABC):
+    CACHE_TTL = 15 # Stress changes mid-scene, so keep this short
 
-    def check_skill_and_domain(self, skill: Union[SpireSkill, HeartSkill], domain: Union[SpireDomain, HeartDomain]) -> Tuple[bool, bool]:
+    async def check_skill_and_domain(self, skill: Union[SpireSkill, HeartSkill], domain: Union[SpireDomain, HeartDomain]) -> Tuple[bool, bool]:
         skill_reference = self.CELL_REFERENCES['skills'][skill.value.title()]
         domain_reference = self.CELL_REFERENCES['domains'][domain.value.title()]
 
-        raw_skills_domains = get_from_spreadsheet_api(
-            spreadsheet_id=self.spreadsheet_id,
+        results = await self.read_cells(
             raw_sheet_name_data={
                 self.sheet_name: [
                     skill_reference,
                     domain_reference
                 ]
-            }
-        )[self.sheet_name]
-
-        has_skill = False
-        has_domain = False
+            },
+            value_render_option=ValueRenderOption.UNFORMATTED_VALUE # Checkboxes come back as bools
+        )
 
-        if raw_skills_domains[skill_reference] == 'TRUE':
-            has_skill = True
+        raw_skills_domains = results[self.sheet_name]
 
-        if raw_skills_domains[domain_reference] == 'TRUE':
-            has_domain = True
+        has_skill = raw_skills_domains[skill_reference] is True
+        has_domain = raw_skills_domains[domain_reference] is True
 
         return has_skill, has_domain
 
@@ -190,7 +187,7 @@ class SpireCharacter(ResistanceCharacterSheet):
 
     RESISTANCES = ['Blood', 'Mind', 'Silver', 'Shadow', 'Reputation']
 
-    def get_fallout_stress(self, less_lethal: bool = False, resistance: Optional[Literal['Blood', 'Mind', 'Silver', 'Shadow', 'Reputation']] = None) -> int:
+    async def get_fallout_stress(self, less_lethal: bool = False, resistance: Optional[Literal['Blood', 'Mind', 'Silver', 'Shadow', 'Reputation']] = None) -> int:
         if resistance is not None and resistance not in self.RESISTANCES: # TODO Test the None bit of this
             raise ValueError(f'Unknown resistance: "{resistance}"')
 
@@ -202,12 +199,17 @@ class SpireCharacter(ResistanceCharacterSheet):
         else:
             ranges_or_cells = self.CELL_REFERENCES['stress']['Total']['fallout']
 
-        stress = get_from_spreadsheet_api(
-            spreadsheet_id=self.spreadsheet_id,
+        results = await self.read_cells(
             raw_sheet_name_data={
                 self.sheet_name: ranges_or_cells
-            }
-        )[self.sheet_name][ranges_or_cells]
+            },
+            value_render_option=ValueRenderOption.UNFORMATTED_VALUE
+        )
+
+        stress = results[self.sheet_name][ranges_or_cells]
+
+        if stress is None: # Unformatted reads leave blank cells out entirely
+            stress = 0
 
         stress = int(stress)
 
@@ -292,15 +294,20 @@ class HeartCharacter(ResistanceCharacterSheet):
 
     RESISTANCES = ['Blood', 'Echo', 'Mind', 'Fortune', 'Supplies']
 
-    def get_fallout_stress(self) -> int:
+    async def get_fallout_stress(self) -> int:
         ranges_or_cells = self.CELL_REFERENCES['stress']['Total']['fallout']
 
-        stress = get_from_spreadsheet_api(
-            spreadsheet_id=self.spreadsheet_id,
+        results = await self.read_cells(
             raw_sheet_name_data={
                 self.sheet_name: ranges_or_cells
-            }
-        )[self.sheet_name][ranges_or_cells]
+            },
+            value_render_option=ValueRenderOption.UNFORMATTED_VALUE
+        )
+
+        stress = results[self.sheet_name][ranges_or_cells]
+
+        if stress is None: # Unformatted reads leave blank cells out entirely
+            stress = 0
 
         stress = int(stress)
 
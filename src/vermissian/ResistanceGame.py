@@ -151,10 +151,10 @@ class SpireGame(ResistanceGame):
 
         self.less_lethal = less_lethal
 
-    def roll_check(self, username: str, skill: SpireSkill, domain: SpireDomain, initial_roll: Roll) -> Tuple[int, List[str], str, int, bool, bool, bool]:
+    async def roll_check(self, username: str, skill: SpireSkill, domain: SpireDomain, initial_roll: Roll) -> Tuple[int, List[str], str, int, bool, bool, bool]:
         roll = initial_roll
 
-        has_skill, has_domain = self.get_character(username).check_skill_and_domain(skill, domain)
+        has_skill, has_domain = await self.get_character(username).check_skill_and_domain(skill, domain)
 
         if has_skill:
             roll.num_dice += 1
@@ -170,11 +170,11 @@ class SpireGame(ResistanceGame):
 
         return highest, formatted_results, outcome, total, has_skill, has_domain, did_downgrade
 
-    def roll_fallout(self, username: str, resistance: Optional[Literal['Blood', 'Mind', 'Silver', 'Shadow', 'Reputation']]) -> Tuple[int, Literal['no', 'Minor', 'Moderate', 'Severe'], int, int]:
+    async def roll_fallout(self, username: str, resistance: Optional[Literal['Blood', 'Mind', 'Silver', 'Shadow', 'Reputation']]) -> Tuple[int, Literal['no', 'Minor', 'Moderate', 'Severe'], int, int]:
 
         character = self.get_character(username)
 
-        stress = character.get_fallout_stress(self.less_lethal, resistance)
+        stress = await character.get_fallout_stress(self.less_lethal, resistance)
 
         rolled = random.randint(1, 10)
 
@@ -493,10 +493,10 @@ class HeartGame(ResistanceGame):
 
         return use_difficult_actions_table, new_difficulty
 
-    def roll_check(self, username: str, skill: HeartSkill, domain: HeartDomain, initial_roll: Roll) -> Tuple[int, List[str], str, int, bool, bool, bool]:
+    async def roll_check(self, username: str, skill: HeartSkill, domain: HeartDomain, initial_roll: Roll) -> Tuple[int, List[str], str, int, bool, bool, bool]:
         roll = initial_roll
 
-        has_skill, has_domain = self.get_character(username).check_skill_and_domain(skill, domain)
+        has_skill, has_domain = await self.get_character(username).check_skill_and_domain(skill, domain)
 
         if has_skill:
             roll.num_dice += 1
@@ -510,10 +510,10 @@ class HeartGame(ResistanceGame):
 
         return highest, formatted_results, outcome, total, has_skill, has_domain, use_difficult_actions_table
 
-    def roll_fallout(self, username: str) -> Tuple[int, Literal['no', 'Minor', 'Major'], Optional[str], int]:
+    async def roll_fallout(self, username: str) -> Tuple[int, Literal['no', 'Minor', 'Major'], Optional[str], int]:
         character = self.get_character(username)
 
-        stress = character.get_fallout_stress()
+        stress = await character.get_fallout_stress()
 
         rolled = random.randint(1, 12)
 
@@ -993,7 +993,7 @@ def add_character(game: ResistanceGame, discord_username: str, discord_display_n
 
     return response
 
-def roll_spire_action(
+async def roll_spire_action(
     game: SpireGame,
     username: str,
     skill: str,
@@ -1020,7 +1020,7 @@ def roll_spire_action(
     skill_to_use = SpireSkill.get(skill)
     domain_to_use = SpireDomain.get(domain)
 
-    highest, results, outcome, total, had_skill, had_domain, did_downgrade = game.roll_check(
+    highest, results, outcome, total, had_skill, had_domain, did_downgrade = await game.roll_check(
         username=username,
         initial_roll=roll,
         skill=skill_to_use,
@@ -1054,7 +1054,7 @@ def roll_spire_action(
 
     return response, view
 
-def roll_heart_action(game: HeartGame, username: str, skill: str, domain: str, mastery: bool = False, num_helpers: int = 0, difficulty: int = 0):
+async def roll_heart_action(game: HeartGame, username: str, skill: str, domain: str, mastery: bool = False, num_helpers: int = 0, difficulty: int = 0):
     if game.system != System.HEART:
         raise WrongGameError(expected_system=System.HEART, used_system=game.system)
 
@@ -1073,7 +1073,7 @@ def roll_heart_action(game: HeartGame, username: str, skill: str, domain: str, m
     skill_to_use = HeartSkill.get(skill)
     domain_to_use = HeartDomain.get(domain)
 
-    highest, results, outcome, total, had_skill, had_domain, used_difficult_actions_table = game.roll_check(
+    highest, results, outcome, total, had_skill, had_domain, used_difficult_actions_table = await game.roll_check(
         username=username,
         initial_roll=roll,
         skill=skill_to_use,
@@ -1182,11 +1182,11 @@ def roll_circulation(
     return response, view
 
 
-def spire_fallout(game: SpireGame, username: str, resistance: Literal['Blood', 'Mind', 'Silver', 'Shadow', 'Reputation']):
+async def spire_fallout(game: SpireGame, username: str, resistance: Literal['Blood', 'Mind', 'Silver', 'Shadow', 'Reputation']):
     if not isinstance(game, SpireGame):
         raise WrongGameError(expected_system=System.HEART, used_system=game.system)
 
-    rolled, level, stress_removed, original_stress = game.roll_fallout(username, resistance)
+    rolled, level, stress_removed, original_stress = await game.roll_fallout(username, resistance)
 
     response = f'You rolled a {rolled} for fallout, against {original_stress} stress '
 
@@ -1197,11 +1197,11 @@ def spire_fallout(game: SpireGame, username: str, resistance: Literal['Blood', '
 
     return response
 
-def heart_fallout(game: HeartGame, username: str):
+async def heart_fallout(game: HeartGame, username: str):
     if not isinstance(game, HeartGame):
         raise WrongGameError(expected_system=System.HEART, used_system=game.system)
 
-    rolled, level, stress_removed, original_stress = game.roll_fallout(username)
+    rolled, level, stress_removed, original_stress = await game.roll_fallout(username)
 
     response = f'You rolled a {rolled} for fallout, against {original_stress} stress '
 
@@ -0,0 +1,267 @@
+import unittest
+from unittest import mock
+
+import asyncio
+import logging
+import string
+
+from src.astir.AstirCharacterSheet import AstirCharacter, AstirTrait, StartingMoves
+from src.astir.AstirMove import AstirMove
+from src.astir.utils import MoveIndex, get_move_index
+from src.utils.sheet_grid import SheetGrid
+from src.utils.exceptions import BotError
+from src.utils.sheets_breaker import SpreadsheetBreaker, get_spreadsheet_breaker
+
+class TestAstirCharacter(unittest.TestCase):
+
+    @staticmethod
+    def get_sheet_data(playbook_name: str, name_label: str = AstirCharacter.EXPECTED_NAME_LABEL):
+        return {
+            AstirCharacter.CELL_REFERENCES['name_label']: name_label,
+            AstirCharacter.CELL_REFERENCES['biography']['discord_username']: 'Username',
+            AstirCharacter.CELL_REFERENCES['biography']['character_name']: 'Character Name',
+            AstirCharacter.CELL_REFERENCES['playbook_name']: playbook_name,
+        }
+
+    @mock.patch('src.astir.AstirCharacterSheet.get_from_spreadsheet_api', autospec=True)
+    @mock.patch('src.CharacterSheet.get_from_spreadsheet_api', autospec=True)
+    def test_bulk_create(self, mock_get: mock.Mock, mock_get_playbook: mock.Mock):
+        mock_get.return_value = {
+            'Character 1': self.get_sheet_data('witch'),
+            'Character 2': self.get_sheet_data('Captain'),
+            'Rules': self.get_sheet_data('', name_label='Rules'),
+            'New Character': self.get_sheet_data(None), # Playbook not picked yet
+        }
+
+        characters = AstirCharacter.bulk_create('spreadsheet id', ['Character 1', 'Character 2', 'Rules', 'New Character'], [1, 2, 3, 4])
+
+        with self.subTest('One call for every character'):
+            mock_get.assert_called_once()
+            mock_get_playbook.assert_not_called()
+
+        with self.subTest('Playbooks read'):
+            self.assertEqual(characters['Character 1'].playbook_name, 'Witch')
+            self.assertEqual(characters['Character 2'].playbook_name, 'Captain')
+            self.assertNotIn('Rules', characters)
+
+        with self.subTest('Blank playbooks skipped without reading again'):
+            self.assertNotIn('New Character', characters)
+
+        with self.subTest('Playbook saved'):
+            self.assertEqual(characters['Character 1'].info()['playbook_name'], 'Witch')
+
+        mock_get.reset_mock()
+
+        with self.subTest('Restored without any calls'):
+            character = AstirCharacter.load(characters['Character 1'].info())
+
+            mock_get.assert_not_called()
+            mock_get_playbook.assert_not_called()
+
+            self.assertEqual(character, characters['Character 1'])
+
+    @mock.patch('src.astir.AstirCharacterSheet.get_from_spreadsheet_api', autospec=True)
+    @mock.patch('src.CharacterSheet.get_from_spreadsheet_api', autospec=True)
+    def test_create(self, mock_get: mock.Mock, mock_get_playbook: mock.Mock):
+        mock_get.return_value = {'Character 1': self.get_sheet_data('Adrift')}
+
+        with self.subTest('Playbook read with the names'):
+            character = AstirCharacter('spreadsheet id', 'Character 1', sheet_gid=1)
+
+            mock_get.assert_called_once()
+            mock_get_playbook.assert_not_called()
+
+            self.assertEqual(character.playbook_name, 'Adrift')
+
+        mock_get_playbook.return_value = {'Character 1': self.get_sheet_data('Arcanist')}
+
+        with self.subTest('Saved without a playbook'):
+            character = AstirCharacter.load({
+                'discord_username': 'username',
+                'character_name': 'Character Name',
+                'spreadsheet_id': 'spreadsheet id',
+                'sheet_gid': 1,
+                'sheet_name': 'Character 1',
+            })
+
+            mock_get_playbook.assert_called_once()
+
+            self.assertEqual(character.playbook_name, 'Arcanist')
+
+        mock_get.return_value = {'Character 1': self.get_sheet_data(None)}
+        mock_get_playbook.reset_mock()
+
+        with self.subTest('Blank playbook'):
+            with self.assertRaises(BotError):
+                AstirCharacter('spreadsheet id', 'Character 1', sheet_gid=1)
+
+            mock_get_playbook.assert_not_called()
+
+    @mock.patch('src.CharacterSheet.get_from_spreadsheet_api', autospec=True)
+    def test_playbook_layouts(self, mock_get: mock.Mock):
+        mock_get.return_value = {
+            'Adrift': self.get_sheet_data('Adrift'),
+            'Revenant': self.get_sheet_data('Revenant'),
+            'Captain': self.get_sheet_data('Captain'),
+        }
+
+        characters = AstirCharacter.bulk_create('spreadsheet id', ['Adrift', 'Revenant', 'Captain'], [1, 2, 3])
+
+        with self.subTest('Layouts kept apart'):
+            self.assertIn(AstirTrait.HOME, characters['Adrift'].CELL_REFERENCES['traits'])
+            self.assertNotIn(AstirTrait.HOME, characters['Captain'].CELL_REFERENCES['traits'])
+
+            self.assertEqual(characters['Adrift'].CELL_REFERENCES['approach'], 'AJ11')
+            self.assertEqual(characters['Captain'].CELL_REFERENCES['approach'], 'AL16')
+
+            self.assertNotIn('approach', AstirCharacter.CELL_REFERENCES)
+
+        with self.subTest('Shared between characters'):
+            character = AstirCharacter.load(characters['Captain'].info())
+
+            self.assertIs(character.layout, characters['Captain'].layout)
+
+        with self.subTest('Starting moves'):
+            self.assertEqual(characters['Revenant'].layout.starting_moves, StartingMoves.TWO)
+            self.assertEqual(characters['Revenant'].CELL_REFERENCES['starting_move_two'], 'BY23')
+            self.assertEqual(AstirCharacter.PLAYBOOK_LAYOUTS['Scout'].starting_moves, StartingMoves.ONE_OF_TWO)
+            self.assertEqual(characters['Captain'].layout.starting_moves, StartingMoves.ONE)
+
+        with self.subTest('Read only'):
+            with self.assertRaises(TypeError):
+                characters['Captain'].CELL_REFERENCES['traits'][AstirTrait.HOME] = 'AL16'
+
+        with self.subTest('Unknown playbook'):
+            with self.assertRaises(BotError):
+                AstirCharacter.load({** characters['Captain'].info(), 'playbook_name': 'Not a Playbook'})
+
+    @staticmethod
+    def get_moves():
+        return {
+            playbook: {
+                move_name.lower(): AstirMove(name=move_name, description_template=string.Template(''), playbook=playbook) for move_name in move_names
+            } for playbook, move_names in {
+                'Scout': ['Field Scout', 'Sharpshooter'],
+                'Witch': ['Hex', 'Hex Storm'],
+            }.items()
+        }
+
+    def test_move_index(self):
+        move_index = MoveIndex(self.get_moves())
+
+        grid = SheetGrid([
+            ['TRUE', ' sharpshooter ', 5],
+            ['Hex Storm (Multiclass)', '', None],
+            ['When you use Field Scout, take +1 forward and mark a danger. Then roll +Sense to see what you can learn.'],
+        ])
+
+        found = move_index.find_moves(grid)
+
+        with self.subTest('Exact names'):
+            self.assertIn('sharpshooter', found)
+            self.assertEqual(found['sharpshooter'].playbook, 'Scout')
+
+        with self.subTest('Names in short cells'):
+            self.assertIn('hex storm', found)
+
+        with self.subTest('Longest name matched'):
+            self.assertNotIn('hex', found)
+
+        with self.subTest('Not from descriptions'):
+            self.assertNotIn('field scout', found)
+
+        with self.subTest('Not from inside words'):
+            self.assertEqual(move_index.find_moves(SheetGrid([['Hexagon']])), {})
+
+    @mock.patch('src.CharacterSheet.get_from_spreadsheet_api_async', autospec=True)
+    @mock.patch('src.CharacterSheet.get_from_spreadsheet_api', autospec=True)
+    def test_get_all_moves(self, mock_get: mock.Mock, mock_get_async: mock.AsyncMock):
+        get_move_index.index = MoveIndex(self.get_moves())
+
+        mock_get.return_value = {'Character 1': self.get_sheet_data('Witch')}
+
+        character = AstirCharacter('spreadsheet id', 'Character 1', sheet_gid=1)
+
+        mock_get_async.return_value = {
+            'Character 1': {
+                character.CELL_REFERENCES['all_non_astir_moves_range']: [['Field Scout', 'FALSE'], ['Hex', '']],
+                character.CELL_REFERENCES['astir_move_label']: 'Hex Storm',
+            }
+        }
+
+        with mock.patch.object(get_move_index.index, 'find_moves', wraps=get_move_index.index.find_moves) as mock_find_moves:
+            moves = self.loop.run_until_complete(character.get_all_moves())
+
+            self.assertEqual(set(moves), {'field scout', 'hex', 'hex storm'})
+
+            with self.subTest('Only worked out again once the cells change'):
+                self.loop.run_until_complete(character.get_all_moves())
+
+                self.assertEqual(mock_find_moves.call_count, 2) # Once for each range
+
+                mock_get_async.return_value['Character 1'][character.CELL_REFERENCES['astir_move_label']] = 'Sharpshooter'
+
+                self.assertIn('sharpshooter', self.loop.run_until_complete(character.get_all_moves()))
+
+    @mock.patch('src.CharacterSheet.get_from_spreadsheet_api_async', autospec=True)
+    @mock.patch('src.CharacterSheet.get_from_spreadsheet_api', autospec=True)
+    def test_channel_trait(self, mock_get: mock.Mock, mock_get_async: mock.AsyncMock):
+        mock_get.return_value = {
+            'Witch': self.get_sheet_data('Witch'),
+            'Impostor': self.get_sheet_data('Impostor'),
+        }
+
+        characters = AstirCharacter.bulk_create('spreadsheet id', ['Witch', 'Impostor'], [1, 2])
+
+        dangers = SheetGrid([['Hunted'], [], ['Cursed']])
+
+        def get_from_spreadsheet_api_async(spreadsheet_id: str, raw_sheet_name_data, ** kwargs):
+            return {
+                sheet_name: {
+                    'AM16': '0',
+                    'AL14': 'Channel',
+                    AstirCharacter.CELL_REFERENCES['dangers']: dangers
+                } for sheet_name in raw_sheet_name_data
+            }
+
+        mock_get_async.side_effect = get_from_spreadsheet_api_async
+
+        with self.subTest('Dangers added'):
+            self.assertEqual(self.loop.run_until_complete(characters['Witch'].get_trait(AstirTrait.CHANNEL)), (2, ''))
+
+        with self.subTest('Moves not read'):
+            references = mock_get_async.call_args.args[1]['Witch']
+
+            self.assertNotIn(AstirCharacter.CELL_REFERENCES['all_non_astir_moves_range'], references)
+            self.assertNotIn(AstirCharacter.CELL_REFERENCES['playbook_name'], references)
+
+        with self.subTest('Dangers only counted again once they change'):
+            dangers = SheetGrid([['Hunted'], [], ['Cursed']])
+
+            self.loop.run_until_complete(characters['Witch'].get_trait(AstirTrait.CHANNEL))
+            self.assertIsNot(characters['Witch'].state.dangers, dangers)
+
+            dangers = SheetGrid([['Hunted']])
+
+            self.assertEqual(self.loop.run_until_complete(characters['Witch'].get_trait(AstirTrait.CHANNEL)), (1, ''))
+
+        with self.subTest('Not for Impostors'):
+            self.assertEqual(self.loop.run_until_complete(characters['Impostor'].get_trait(AstirTrait.CHANNEL)), (0, ''))
+            self.assertNotIn(AstirCharacter.CELL_REFERENCES['dangers'], mock_get_async.call_args.args[1]['Impostor'])
+
+    def setUp(self) -> None:
+        logging.disable(logging.ERROR)
+
+        self.loop = asyncio.new_event_loop()
+
+        get_spreadsheet_breaker.breaker = SpreadsheetBreaker()
+
+    def tearDown(self) -> None:
+        del get_spreadsheet_breaker.breaker
+
+        if hasattr(get_move_index, 'index'):
+            del get_move_index.index
+
+        self.loop.close()
+
+        logging.disable(logging.NOTSET)
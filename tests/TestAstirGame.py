@@ -0,0 +1,98 @@
+import unittest
+from unittest import mock
+
+import asyncio
+import logging
+
+from src.astir.AstirGame import AstirGame
+from src.astir.AstirCharacterSheet import AstirTrait
+from src.utils.sheets_cache import SheetsCache, get_sheets_cache
+
+class TestAstirGame(unittest.TestCase):
+    ASTIR_GAME_DATA = {
+        'guild_id': 123,
+        'system': 'astir',
+        'spreadsheet_id': 'spreadsheet id',
+        'characters': {
+            discord_username: {
+                'discord_username': discord_username,
+                'character_name': f'{discord_username} Character',
+                'spreadsheet_id': 'spreadsheet id',
+                'sheet_name': sheet_name,
+                'sheet_gid': sheet_gid,
+                'playbook_name': 'Captain',
+            } for discord_username, sheet_name, sheet_gid in [('user a', 'Character A', 1), ('user b', 'Character B', 2)]
+        }
+    }
+
+    @mock.patch('src.utils.google_sheets._coalesced_fetch_from_spreadsheet_api_async', autospec=True)
+    def test_shared_tabs(self, mock_fetch: mock.AsyncMock):
+        mock_fetch.return_value = {
+            'Cause / Factions': {
+                'AP13:AQ15': [['Crew'], [], ['', '2']]
+            }
+        }
+
+        with self.subTest('Shared by every character'):
+            self.assertEqual(self.astir_game.shared_tabs.tab_ranges, {'Cause / Factions': 'AP13:AQ15'})
+
+            for character in self.astir_game.character_sheets.values():
+                self.assertIs(character.shared_tabs, self.astir_game.shared_tabs)
+
+        with self.subTest('Crew rolls read the shared tab'):
+            for username in ['user a', 'user b']:
+                self.assertEqual(self.loop.run_until_complete(self.astir_game.get_character(username).get_trait(AstirTrait.CREW)), (2, ''))
+
+        with self.subTest('Fetched once for the whole crew'):
+            mock_fetch.assert_awaited_once()
+            self.assertEqual(mock_fetch.call_args.args[1], {'Cause / Factions': ['AP13:AQ15']})
+
+    @mock.patch('src.utils.google_sheets._coalesced_fetch_from_spreadsheet_api_async', autospec=True)
+    def test_read_cells_concurrently(self, mock_fetch: mock.AsyncMock):
+        in_flight = []
+        most_in_flight = []
+
+        async def fetch(spreadsheet_id, raw_sheet_name_data, *args):
+            in_flight.append(raw_sheet_name_data)
+            most_in_flight.append(len(in_flight))
+
+            await asyncio.sleep(0.01)
+
+            in_flight.remove(raw_sheet_name_data)
+
+            return {
+                sheet_name: {range_or_cell: None for range_or_cell in ranges_or_cells}
+                    for sheet_name, ranges_or_cells in raw_sheet_name_data.items()
+            }
+
+        mock_fetch.side_effect = fetch
+
+        character = self.astir_game.get_character('user a')
+
+        results = self.loop.run_until_complete(character.read_cells({
+            'Cause / Factions': ['AQ15'],
+            'Character A': ['D16'],
+        }))
+
+        with self.subTest('Both read'):
+            self.assertEqual(set(results), {'Cause / Factions', 'Character A'})
+
+        with self.subTest('Shared and own tabs read at the same time'):
+            self.assertEqual(mock_fetch.await_count, 2)
+            self.assertEqual(max(most_in_flight), 2)
+
+    def setUp(self) -> None:
+        logging.disable(logging.ERROR)
+
+        self.loop = asyncio.new_event_loop()
+
+        get_sheets_cache.cache = SheetsCache()
+
+        self.astir_game = AstirGame.from_data(self.ASTIR_GAME_DATA)
+
+    def tearDown(self) -> None:
+        del get_sheets_cache.cache
+
+        self.loop.close()
+
+        logging.disable(logging.NOTSET)
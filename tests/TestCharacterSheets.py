@@ -1,6 +1,8 @@
 import unittest
 from unittest import mock
 
+import asyncio
+
 import dataclasses
 import itertools
 import abc
@@ -10,6 +12,7 @@ from typing import Dict
 import requests
 
 from src.vermissian.ResistanceCharacterSheet import ResistanceCharacterSheet, SpireCharacter, SpireSkill, SpireDomain, HeartCharacter, HeartSkill, HeartDomain
+from src.utils.sheets_requests import ValueRenderOption
 
 @dataclasses.dataclass
 class MockResponse:
@@ -83,23 +86,23 @@ class TestCharacterSheet(abc.ABC):
             with self.subTest('Mock used'):
                 self.assertTrue(mock_get.called)
 
-    @unittest.mock.patch('src.vermissian.ResistanceCharacterSheet.get_from_spreadsheet_api', autospec=True)
+    @unittest.mock.patch('src.CharacterSheet.get_from_spreadsheet_api_async', autospec=True)
     def test_check_skill_and_domain(self, mock_get: mock.Mock):
         for expected_has_skill, expected_has_domain in itertools.product([False, True], [False, True]):
             for skill, domain in itertools.product(self.skills, self.domains):
                 valid_response = {
                     self.valid_unnamed_character.sheet_name: {
-                        self.character_sheet_cls.CELL_REFERENCES['skills'][skill.value]: 'TRUE' if expected_has_skill else 'FALSE',
-                        self.character_sheet_cls.CELL_REFERENCES['domains'][domain.value]: 'TRUE' if expected_has_domain else 'FALSE'
+                        self.character_sheet_cls.CELL_REFERENCES['skills'][skill.value]: expected_has_skill,
+                        self.character_sheet_cls.CELL_REFERENCES['domains'][domain.value]: expected_has_domain
                     }
                 }
 
                 mock_get.return_value = valid_response
 
-                has_skill, has_domain = self.valid_unnamed_character.check_skill_and_domain(
+                has_skill, has_domain = self.loop.run_until_complete(self.valid_unnamed_character.check_skill_and_domain(
                     skill=skill,
                     domain=domain
-                )
+                ))
 
                 with self.subTest('Mock Used'):
                     self.assertTrue(mock_get.called)
@@ -210,7 +213,7 @@ class TestSpireCharacter(TestCharacterSheet, unittest.TestCase):
 
     character_sheet_cls = SpireCharacter
 
-    @unittest.mock.patch('src.vermissian.ResistanceCharacterSheet.get_from_spreadsheet_api', autospec=True)
+    @unittest.mock.patch('src.CharacterSheet.get_from_spreadsheet_api_async', autospec=True)
     def test_get_fallout_stress(self, mock_get: unittest.mock.Mock):
         stresses = [5, 2, 3, 4, 7]
 
@@ -229,14 +232,16 @@ class TestSpireCharacter(TestCharacterSheet, unittest.TestCase):
                     }
                 }
 
-                fallout_stress = self.valid_unnamed_character.get_fallout_stress(less_lethal, resistance)
+                fallout_stress = self.loop.run_until_complete(self.valid_unnamed_character.get_fallout_stress(less_lethal, resistance))
 
                 with self.subTest(f'Queried spreadsheet with args - {less_lethal, resistance}'):
                     mock_get.assert_called_with(
                         self.valid_unnamed_character.spreadsheet_id,
                         {
                             self.valid_unnamed_character.sheet_name: ranges_or_cells
-                        }
+                        },
+                        cache_ttl=self.valid_unnamed_character.CACHE_TTL,
+                        value_render_option=ValueRenderOption.UNFORMATTED_VALUE
                     )
 
                 with self.subTest(f'Correct stress value - {less_lethal, resistance}'):
@@ -245,12 +250,16 @@ class TestSpireCharacter(TestCharacterSheet, unittest.TestCase):
                         expected_stress
                     )
 
+            with self.subTest(f'Blank stress - {less_lethal}'):
+                mock_get.return_value = {self.valid_unnamed_character.sheet_name: {ranges_or_cells: None}}
+
+                self.assertEqual(self.loop.run_until_complete(self.valid_unnamed_character.get_fallout_stress(less_lethal, resistance)), 0)
+
             with self.subTest(f'Errors for invalid resistances - {less_lethal}'):
                 self.assertRaises(
                     ValueError,
-                    self.valid_named_character.get_fallout_stress,
-                    less_lethal,
-                    'Bad Resistance'
+                    self.loop.run_until_complete,
+                    self.valid_named_character.get_fallout_stress(less_lethal, 'Bad Resistance')
                 )
 
     @unittest.mock.patch('src.vermissian.ResistanceCharacterSheet.SpireCharacter.initialise')
@@ -319,6 +328,9 @@ class TestSpireCharacter(TestCharacterSheet, unittest.TestCase):
     def setUp(self, mock_initialise: unittest.mock.Mock) -> None:
         logging.disable(logging.ERROR)
 
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
         self.test_character_name = 'Test Character Name'
         self.test_discord_username = 'test discord username'
 
@@ -348,7 +360,7 @@ class TestHeartCharacter(TestCharacterSheet, unittest.TestCase):
 
     character_sheet_cls = HeartCharacter
 
-    @unittest.mock.patch('src.vermissian.ResistanceCharacterSheet.get_from_spreadsheet_api', autospec=True)
+    @unittest.mock.patch('src.CharacterSheet.get_from_spreadsheet_api_async', autospec=True)
     def test_get_fallout_stress(self, mock_get: unittest.mock.Mock):
         expected_stress = 4
 
@@ -360,14 +372,16 @@ class TestHeartCharacter(TestCharacterSheet, unittest.TestCase):
             }
         }
 
-        fallout_stress = self.valid_unnamed_character.get_fallout_stress()
+        fallout_stress = self.loop.run_until_complete(self.valid_unnamed_character.get_fallout_stress())
 
         with self.subTest(f'Queried spreadsheet with args'):
             mock_get.assert_called_with(
                 self.valid_unnamed_character.spreadsheet_id,
                 {
                     self.valid_unnamed_character.sheet_name: ranges_or_cells
-                }
+                },
+                cache_ttl=self.valid_unnamed_character.CACHE_TTL,
+                value_render_option=ValueRenderOption.UNFORMATTED_VALUE
             )
 
         with self.subTest(f'Correct stress value'):
@@ -376,6 +390,11 @@ class TestHeartCharacter(TestCharacterSheet, unittest.TestCase):
                 expected_stress
             )
 
+        with self.subTest('Blank stress'):
+            mock_get.return_value = {self.valid_unnamed_character.sheet_name: {ranges_or_cells: None}}
+
+            self.assertEqual(self.loop.run_until_complete(self.valid_unnamed_character.get_fallout_stress()), 0)
+
     @unittest.mock.patch('src.vermissian.ResistanceCharacterSheet.HeartCharacter.initialise')
     def test_load(self, mock_initialise: unittest.mock.Mock):
         valid_info_including_name = {
@@ -443,6 +462,9 @@ class TestHeartCharacter(TestCharacterSheet, unittest.TestCase):
     def setUp(self, mock_initialise: unittest.mock.Mock) -> None:
         logging.disable(logging.ERROR)
 
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
         self.test_character_name = 'Test Character Name'
         self.test_discord_username = 'test discord username'
 
@@ -0,0 +1,102 @@
+import unittest
+from unittest import mock
+
+import asyncio
+import logging
+
+from src.utils.deadline import (
+    Deadline, command_deadline, get_remaining_time, get_command_deadline, auto_deferring, INTERACTION_DEADLINE,
+    DEADLINE_MARGIN, DEFERRED_DEADLINE
+)
+from src.utils.sheets_session import get_request_timeout, get_async_request_timeout, get_timeout, MIN_REQUEST_TIMEOUT
+
+class TestDeadline(unittest.TestCase):
+
+    @mock.patch('src.utils.deadline.time.monotonic')
+    def test_deadline(self, mock_monotonic: mock.Mock):
+        mock_monotonic.return_value = 0
+
+        with self.subTest('No deadline outside commands'):
+            self.assertIsNone(get_remaining_time())
+
+        with command_deadline(3) as deadline:
+            mock_monotonic.return_value = 1
+
+            with self.subTest('Counts down'):
+                self.assertEqual(deadline.get_remaining(), 2)
+                self.assertEqual(get_remaining_time(), 2 - DEADLINE_MARGIN)
+
+            deadline.defer()
+
+            with self.subTest('Extended once deferred'):
+                self.assertTrue(deadline.deferred)
+                self.assertEqual(deadline.get_remaining(), DEFERRED_DEADLINE)
+
+        with self.subTest('Per command'):
+            self.assertEqual(get_command_deadline('roll_command'), INTERACTION_DEADLINE)
+            self.assertGreater(get_command_deadline('link_command'), INTERACTION_DEADLINE)
+
+    @mock.patch('src.utils.deadline.time.monotonic')
+    def test_request_timeout(self, mock_monotonic: mock.Mock):
+        mock_monotonic.return_value = 0
+
+        with self.subTest('Configured timeouts outside commands'):
+            self.assertEqual(get_request_timeout(), get_timeout())
+            self.assertIsNone(get_async_request_timeout().total)
+
+        with command_deadline(2):
+            with self.subTest('Cut short to what the command has left'):
+                self.assertEqual(get_request_timeout(), (2 - DEADLINE_MARGIN, 2 - DEADLINE_MARGIN))
+                self.assertEqual(get_async_request_timeout().total, 2 - DEADLINE_MARGIN)
+
+            mock_monotonic.return_value = 5
+
+            with self.subTest('Never below the minimum'):
+                self.assertEqual(get_request_timeout(), (MIN_REQUEST_TIMEOUT, MIN_REQUEST_TIMEOUT))
+
+    def test_auto_defer(self):
+        ctx = mock.Mock()
+        ctx.defer = mock.AsyncMock()
+        ctx.response.is_done.return_value = False
+
+        async def run(deadline: Deadline, command_time: float, command_ctx: mock.Mock = ctx):
+            async with auto_deferring(command_ctx, deadline):
+                await asyncio.sleep(command_time)
+
+        with self.subTest('Quick commands not deferred'):
+            deadline = Deadline(1.05)
+
+            self.loop.run_until_complete(run(deadline, 0))
+
+            ctx.defer.assert_not_called()
+            self.assertFalse(deadline.deferred)
+
+        with self.subTest('Slow commands deferred'):
+            deadline = Deadline(1.05)
+
+            self.loop.run_until_complete(run(deadline, 0.1))
+
+            ctx.defer.assert_awaited_once()
+            self.assertTrue(deadline.deferred)
+            self.assertGreater(deadline.get_remaining(), INTERACTION_DEADLINE)
+
+        ctx.defer.reset_mock()
+        ctx.response.is_done.return_value = True
+
+        with self.subTest('Not deferred once responded'):
+            self.loop.run_until_complete(run(Deadline(1.05), 0.1))
+
+            ctx.defer.assert_not_called()
+
+        with self.subTest('Autocompletes left alone'):
+            self.loop.run_until_complete(run(Deadline(0), 0.1, mock.Mock(spec=['interaction'])))
+
+    def setUp(self) -> None:
+        logging.disable(logging.ERROR)
+
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self) -> None:
+        self.loop.close()
+
+        logging.disable(logging.NOTSET)
@@ -0,0 +1,152 @@
+import unittest
+from unittest import mock
+
+import asyncio
+import logging
+import os
+
+from aiohttp import web
+
+from benchmarks.fake_sheets_api import FakeSheetsApi, FaultConfig, FakeSpreadsheet, generate_tracker, API_PREFIX
+from src.utils.google_sheets import get_spreadsheet_metadata_async, get_from_spreadsheet_api_async
+from src.utils.sheets_requests import ValueRenderOption, SHEETS_API_URL_VARIABLE, get_sheets_api_url
+from src.utils.sheets_retry import RETRY_POLICIES, RetryPolicy
+from src.utils.sheets_session import close_sessions
+from src.utils.sheets_scheduler import SheetsScheduler, TokenBucket, get_scheduler
+from src.utils.sheets_breaker import SpreadsheetBreaker, get_spreadsheet_breaker
+from src.utils.exceptions import ForbiddenSpreadsheetError, TooManyRequestsError
+from src.vermissian.ResistanceCharacterSheet import SpireCharacter
+
+class TestFakeSheetsApi(unittest.TestCase):
+
+    def test_generate_tracker(self):
+        spreadsheet = generate_tracker('spire-500', 'spire', 500)
+
+        with self.subTest('Every tab generated'):
+            self.assertEqual(len(spreadsheet.sheets), 501)
+
+        with self.subTest('Characters look like characters'):
+            sheet = spreadsheet.get_sheet('Character 2')
+
+            self.assertEqual(sheet.get_rows(SpireCharacter.CELL_REFERENCES['name_label']), [[SpireCharacter.EXPECTED_NAME_LABEL]])
+            self.assertEqual(sheet.get_rows(SpireCharacter.CELL_REFERENCES['biography']['discord_username']), [['player2']])
+
+        with self.subTest('Round trips through a recording'):
+            recorded = FakeSpreadsheet.from_json(spreadsheet.to_json())
+
+            self.assertEqual(recorded.get_sheet('Character 2').cells, sheet.cells)
+
+    def test_sheets_client(self):
+        api = FakeSheetsApi()
+
+        spreadsheet_id = 'spire-3'
+
+        with self.subTest('Metadata'):
+            metadata = self.loop.run_until_complete(get_spreadsheet_metadata_async(spreadsheet_id))
+
+            self.assertEqual(list(metadata.values()), ['Cover', 'Character 1', 'Character 2', 'Character 3'])
+
+        name_label = SpireCharacter.CELL_REFERENCES['name_label']
+        compel = SpireCharacter.CELL_REFERENCES['skills']['Compel']
+
+        expected_compel = api.get_spreadsheet(spreadsheet_id).get_sheet('Character 1').cells.get((compel.column, compel.row))
+
+        with self.subTest('Formatted values'):
+            data = self.loop.run_until_complete(get_from_spreadsheet_api_async(
+                spreadsheet_id, {'Character 1': [name_label, compel], 'Character 2': 'A1:B2'}
+            ))
+
+            self.assertEqual(data['Character 1'][name_label], SpireCharacter.EXPECTED_NAME_LABEL)
+            self.assertEqual(data['Character 1'][compel], 'TRUE' if expected_compel else 'FALSE')
+            self.assertIsNone(data['Character 2']['A1:B2'])
+
+        with self.subTest('Typed values'):
+            data = self.loop.run_until_complete(get_from_spreadsheet_api_async(
+                spreadsheet_id, {'Character 1': compel}, value_render_option=ValueRenderOption.UNFORMATTED_VALUE
+            ))
+
+            self.assertIs(data['Character 1'][compel], expected_compel)
+
+        with self.subTest('Sheet names needing encoding'):
+            data = self.loop.run_until_complete(get_from_spreadsheet_api_async('astir', {'Cause / Factions': 'AP13'}))
+
+            self.assertEqual(data['Cause / Factions']['AP13'], 'Crew')
+
+    @mock.patch.dict(RETRY_POLICIES, {'rate_limited': RetryPolicy(max_retries=0, base_delay=0, max_delay=0)})
+    def test_faults(self):
+        with self.subTest('Forbidden'):
+            self.start_server(FakeSheetsApi(FaultConfig(forbidden_spreadsheet_ids=('heart',))))
+
+            self.assertRaises(
+                ForbiddenSpreadsheetError,
+                self.loop.run_until_complete, get_spreadsheet_metadata_async('heart')
+            )
+
+        get_spreadsheet_breaker().reset('heart')
+
+        with self.subTest('Rate limited'):
+            api = FakeSheetsApi(FaultConfig(rate_limit=1, retry_after=0))
+
+            self.start_server(api)
+
+            self.assertRaises(
+                TooManyRequestsError,
+                self.loop.run_until_complete, get_from_spreadsheet_api_async('heart', {'Character 1': 'B4'})
+            )
+
+            self.assertEqual(api.stats['rate_limited'], 1)
+
+    def test_get_sheets_api_url(self):
+        with mock.patch.dict(os.environ, {SHEETS_API_URL_VARIABLE: 'http://localhost:8765/v4/spreadsheets/'}):
+            self.assertEqual(get_sheets_api_url(), 'http://localhost:8765/v4/spreadsheets')
+
+    def start_server(self, api: FakeSheetsApi):
+        runner = web.AppRunner(api.make_app())
+
+        self.loop.run_until_complete(runner.setup())
+
+        site = web.TCPSite(runner, 'localhost', 0)
+
+        self.loop.run_until_complete(site.start())
+
+        self.runners.append(runner)
+
+        port = runner.addresses[0][1]
+
+        self.environ_patcher.stop()
+        self.environ_patcher = mock.patch.dict(os.environ, {SHEETS_API_URL_VARIABLE: f'http://localhost:{port}{API_PREFIX}'})
+        self.environ_patcher.start()
+
+    def setUp(self) -> None:
+        logging.disable(logging.ERROR)
+
+        self.loop = asyncio.new_event_loop()
+
+        self.runners = []
+
+        self.environ_patcher = mock.patch.dict(os.environ, {})
+        self.environ_patcher.start()
+
+        self.key_patcher = mock.patch('src.utils.google_sheets.get_key', return_value='key')
+        self.key_patcher.start()
+
+        get_scheduler.scheduler = SheetsScheduler([TokenBucket(capacity=100, refill_per_second=100)])
+        get_spreadsheet_breaker.breaker = SpreadsheetBreaker()
+
+        self.start_server(FakeSheetsApi())
+
+    def tearDown(self) -> None:
+        self.loop.run_until_complete(close_sessions())
+
+        for runner in self.runners:
+            self.loop.run_until_complete(runner.cleanup())
+
+        self.key_patcher.stop()
+        self.environ_patcher.stop()
+
+        del get_scheduler.scheduler
+        del get_spreadsheet_breaker.breaker
+
+        self.loop.close()
+
+        logging.disable(logging.NOTSET)
@@ -13,11 +13,17 @@ from src.utils.google_sheets import (
     get_key, get_sheet_name_from_gid, _compute_num_new_columns, offset_reference
 )
 from src.utils.exceptions import ForbiddenSpreadsheetError, TooManyRequestsError
+from src.utils.sheets_session import get_timeout
+from src.utils.sheets_retry import RETRY_POLICIES, RetryPolicy
+from src.utils.sheets_metadata import SpreadsheetMetadataStore, get_metadata_store
+from src.utils.sheets_breaker import SpreadsheetBreaker, get_spreadsheet_breaker
+from src.utils.sheets_keys import get_key_pool
 
 @dataclasses.dataclass
 class MockResponse:
     content: Dict
     status_code: int
+    headers: Dict = dataclasses.field(default_factory=dict)
 
     def raise_for_status(self):
         if self.status_code != 200:
@@ -174,9 +180,11 @@ class TestGoogleSheets(unittest.TestCase):
                 valid_spreadsheet_id
             )
 
-    @mock.patch('src.utils.google_sheets.requests.get', autospec=True)
+    @mock.patch('src.utils.google_sheets.get_session', autospec=True)
     @mock.patch('src.utils.google_sheets.get_key', autospec=True)
-    def test_get_spreadsheet_metadata(self, mock_get_key: mock.Mock, mock_requests_get: mock.Mock):
+    def test_get_spreadsheet_metadata(self, mock_get_key: mock.Mock, mock_get_session: mock.Mock):
+        mock_requests_get = mock_get_session.return_value.get
+
         mock_key = '123'
         mock_get_key.return_value = mock_key
 
@@ -208,7 +216,7 @@ class TestGoogleSheets(unittest.TestCase):
             mock_get_key.assert_called()
 
         with self.subTest('Metadata Call made'):
-            mock_requests_get.assert_called_with(f'https://sheets.googleapis.com/v4/spreadsheets/{valid_spreadsheet_id}?key={mock_key}&fields=sheets.properties')
+            mock_requests_get.assert_called_with(f'https://sheets.googleapis.com/v4/spreadsheets/{valid_spreadsheet_id}?key={mock_key}&fields=sheets.properties(sheetId,title)', timeout=get_timeout())
 
         with self.subTest('Metadata Call - Valid Data'):
             self.assertEqual(
@@ -235,6 +243,8 @@ class TestGoogleSheets(unittest.TestCase):
                 valid_spreadsheet_id
             )
 
+        get_spreadsheet_breaker().reset(valid_spreadsheet_id) # Otherwise the rest fail fast as forbidden
+
         mock_requests_get.return_value = MockResponse(
             status_code=429,
             content={
@@ -267,6 +277,8 @@ class TestGoogleSheets(unittest.TestCase):
                 valid_spreadsheet_id
             )
 
+        get_spreadsheet_breaker().reset(valid_spreadsheet_id)
+
         mock_requests_get.return_value = MockResponse(
             status_code=403,
             content={
@@ -299,11 +311,14 @@ class TestGoogleSheets(unittest.TestCase):
                 valid_spreadsheet_id
             )
 
-    @mock.patch('src.utils.google_sheets.requests.get', autospec=True)
+    @mock.patch('src.utils.google_sheets.get_session', autospec=True)
     @mock.patch('src.utils.google_sheets.get_key', autospec=True)
-    def test_get_from_spreadsheet_api(self, mock_get_key: mock.Mock, mock_requests_get: mock.Mock):
+    def test_get_from_spreadsheet_api(self, mock_get_key: mock.Mock, mock_get_session: mock.Mock):
+        mock_requests_get = mock_get_session.return_value.get
+
         valid_spreadsheet_id = '1saogmy4eNNKng32Pf39b7K3Ko4uHEuWClm7UM-7Kd8I'
         valid_sheet_name = 'Example Character Sheet'
+        encoded_sheet_name = 'Example%20Character%20Sheet'
 
         mock_key = '123'
         mock_get_key.return_value = mock_key
@@ -319,7 +334,7 @@ class TestGoogleSheets(unittest.TestCase):
 
         for valid_range_cell in valid_ranges_cells:
             with self.subTest(range_cell=valid_range_cell):
-                data_range = f'{valid_sheet_name}!{valid_range_cell}'
+                data_range = f'{encoded_sheet_name}!{valid_range_cell}'
 
                 get_from_spreadsheet_api(
                     spreadsheet_id=valid_spreadsheet_id,
@@ -328,12 +343,12 @@ class TestGoogleSheets(unittest.TestCase):
                     }
                 )
 
-                mock_requests_get.assert_called_with(f'https://sheets.googleapis.com/v4/spreadsheets/{valid_spreadsheet_id}/values/{data_range}?key={mock_key}')
+                mock_requests_get.assert_called_with(f'https://sheets.googleapis.com/v4/spreadsheets/{valid_spreadsheet_id}/values/{data_range}?key={mock_key}&majorDimension=ROWS&valueRenderOption=FORMATTED_VALUE&fields=values', timeout=get_timeout())
 
         with self.subTest(all_range_cells=valid_ranges_cells):
 
             range_expression = '&'.join([
-                f'ranges={valid_sheet_name}!{valid_cell_range}' for valid_cell_range in valid_ranges_cells
+                f'ranges={encoded_sheet_name}!{valid_cell_range}' for valid_cell_range in valid_ranges_cells
             ])
 
             get_from_spreadsheet_api(
@@ -343,7 +358,7 @@ class TestGoogleSheets(unittest.TestCase):
                 }
             )
 
-            mock_requests_get.assert_called_with(f'https://sheets.googleapis.com/v4/spreadsheets/{valid_spreadsheet_id}/values:batchGet?key={mock_key}&{range_expression}')
+            mock_requests_get.assert_called_with(f'https://sheets.googleapis.com/v4/spreadsheets/{valid_spreadsheet_id}/values:batchGet?key={mock_key}&majorDimension=ROWS&valueRenderOption=FORMATTED_VALUE&fields=valueRanges(values)&{range_expression}', timeout=get_timeout())
 
         mock_ranges_cells =  [
             'A1',
@@ -445,10 +460,10 @@ class TestGoogleSheets(unittest.TestCase):
 
         mock_multi_sheet_return_data = {
             'Character 1': {
-                'A1:B2': [1, 2]
+                'A1:B2': [[1, 2]]
             },
             'Character 2': {
-                'A2:B3': [3, 4]
+                'A2:B3': [[3, 4]]
             }
         }
 
@@ -456,8 +471,8 @@ class TestGoogleSheets(unittest.TestCase):
             status_code=200,
             content={
                 'valueRanges': [
-                    {'values': [1, 2]},
-                    {'values': [3, 4]}
+                    {'values': [[1, 2]]},
+                    {'values': [[3, 4]]}
                 ]
             }
         )
@@ -548,7 +563,7 @@ class TestGoogleSheets(unittest.TestCase):
                     {valid_sheet_name: malformed},
                 )
 
-    @mock.patch('src.utils.google_sheets.json.load')
+    @mock.patch('src.utils.sheets_keys.json.load')
     def test_get_key(self, mock_json_load: mock.Mock):
         with self.subTest('Reads file'):
             original_key = get_key()
@@ -683,15 +698,25 @@ class TestGoogleSheets(unittest.TestCase):
                     )
 
     def setUp(self) -> None:
-        if hasattr(get_key, 'key'):
-            # TODO Ideally should be mocked for all of them anyway
-            delattr(get_key, 'key') # In case a previous test case has made it cached
+        # TODO Ideally should be mocked for all of them anyway
+        get_key_pool.pool = None # In case a previous test case has made it cached
+
+        # Retries are covered in TestSheetsRetry, here we just want the errors
+        self.retry_policies_patcher = mock.patch.dict(RETRY_POLICIES, {error_class: RetryPolicy(max_retries=0, base_delay=0, max_delay=0) for error_class in RETRY_POLICIES})
+        self.retry_policies_patcher.start()
+
+        get_metadata_store.store = SpreadsheetMetadataStore(filepath=None)
+        get_spreadsheet_breaker.breaker = SpreadsheetBreaker()
 
         logging.disable(logging.ERROR)
 
     def tearDown(self) -> None:
-        if hasattr(get_key, 'key'):
-            delattr(get_key, 'key')  # In case a previous test case has made it cached
+        get_key_pool.pool = None # In case a previous test case has made it cached
+
+        self.retry_policies_patcher.stop()
+
+        del get_metadata_store.store
+        del get_spreadsheet_breaker.breaker
 
         logging.disable(logging.NOTSET)
 
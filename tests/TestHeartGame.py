@@ -1,5 +1,6 @@
 import unittest
 import unittest.mock
+import asyncio
 import itertools
 import logging
 import shutil
@@ -77,7 +78,7 @@ class TestHeartGame(unittest.TestCase):
                                     formatted_value
                                 )
 
-    @unittest.mock.patch('src.Game.get_spreadsheet_metadata')
+    @unittest.mock.patch('src.Game.get_known_spreadsheet_metadata')
     def test_from_data(self, mock_get_spreadsheet_metadata: unittest.mock.Mock):
         mock_get_spreadsheet_metadata.return_value = {
             0: 'Example Character Sheet'
@@ -239,7 +240,7 @@ class TestHeartGame(unittest.TestCase):
                                 if character_has_domain:
                                     expected_num_dice += 1
 
-                                highest, formatted_results, outcome, total, has_skill, has_domain, use_difficult_actions_table = self.heart_game.roll_check(self.DISCORD_USERNAME, skill, domain, roll)
+                                highest, formatted_results, outcome, total, has_skill, has_domain, use_difficult_actions_table = self.loop.run_until_complete(self.heart_game.roll_check(self.DISCORD_USERNAME, skill, domain, roll))
 
                                 with self.subTest('Checked for skill and domain'):
                                     mock_get_character.check_skill_and_domain.called_with_args(
@@ -278,7 +279,7 @@ class TestHeartGame(unittest.TestCase):
                     else:
                         mock_randint.return_value = character_stress + modifier + 1
 
-                    rolled, fallout_level_triggered, stress_removed, stress = self.heart_game.roll_fallout(self.DISCORD_USERNAME)
+                    rolled, fallout_level_triggered, stress_removed, stress = self.loop.run_until_complete(self.heart_game.roll_fallout(self.DISCORD_USERNAME))
 
                     with self.subTest('get_character used'):
                         mock_get_character.assert_called_with(self.DISCORD_USERNAME)
@@ -346,7 +347,7 @@ class TestHeartGame(unittest.TestCase):
                 )
 
     @unittest.mock.patch('src.vermissian.ResistanceCharacterSheet.HeartCharacter.initialise')
-    @unittest.mock.patch('src.Game.get_spreadsheet_metadata')
+    @unittest.mock.patch('src.Game.get_known_spreadsheet_metadata')
     def test_create_character(self, mock_get_spreadsheet_metadata: unittest.mock.Mock, mock_initialise: unittest.mock.Mock):
         mock_get_spreadsheet_metadata.return_value = {
             0: 'Example Character Sheet'
@@ -382,7 +383,7 @@ class TestHeartGame(unittest.TestCase):
                 invalid_character_data['sheet_gid']
             )
 
-    @unittest.mock.patch('src.Game.get_spreadsheet_metadata')
+    @unittest.mock.patch('src.Game.get_known_spreadsheet_metadata')
     def setUp(self, mock_get_spreadsheet_metadata: unittest.mock.Mock) -> None:
         mock_get_spreadsheet_metadata.return_value = {
             0: 'Example Character Sheet'
@@ -392,7 +393,11 @@ class TestHeartGame(unittest.TestCase):
 
         logging.disable(logging.ERROR)
 
+        self.loop = asyncio.new_event_loop()
+
     def tearDown(self) -> None:
+        self.loop.close()
+
         logging.disable(logging.NOTSET)
 
     @classmethod
@@ -0,0 +1,107 @@
+import unittest
+
+import logging
+import pickle
+import sys
+
+from src.utils.sheet_grid import SheetGrid, to_sheet_grid
+from src.utils.sheets_cache import estimate_size
+from src.astir.AstirCharacterSheet import AstirCharacter
+
+class TestSheetGrid(unittest.TestCase):
+
+    def test_rows(self):
+        rows = [['a', 'b'], [], ['', '', '', 'c']]
+
+        grid = SheetGrid(rows)
+
+        with self.subTest('Shape'):
+            self.assertEqual((grid.num_rows, grid.num_columns), (3, 4))
+
+        with self.subTest('Reads as the ragged rows'):
+            self.assertEqual(grid, rows)
+            self.assertEqual(rows, grid)
+            self.assertEqual(list(grid), rows)
+            self.assertEqual(grid[1], [])
+            self.assertEqual(grid[-1], ['', '', '', 'c'])
+            self.assertEqual(len(grid), 3)
+
+        with self.subTest('Out of range row'):
+            self.assertRaises(IndexError, grid.__getitem__, 3)
+
+        with self.subTest('Pickles'):
+            self.assertEqual(pickle.loads(pickle.dumps(grid)), rows)
+
+        with self.subTest('Immutable'):
+            self.assertRaises(AttributeError, setattr, grid, 'cells', ())
+
+    def test_get(self):
+        grid = SheetGrid([['a', 'b'], [], ['', '', '', 'c']], origin='B2:E4')
+
+        with self.subTest('By offset'):
+            self.assertEqual(grid.get(1, 0), 'b')
+            self.assertEqual(grid.get(3, 2), 'c')
+
+        with self.subTest('Blank past the end of a row'):
+            self.assertEqual(grid.get(2, 0), '')
+            self.assertEqual(grid.get(10, 10), '')
+
+        with self.subTest('By reference'):
+            self.assertEqual(grid.get_cell('C2'), 'b')
+            self.assertEqual(grid.get_cell('E4'), 'c')
+
+        with self.subTest('No origin'):
+            self.assertRaises(ValueError, SheetGrid([['a']]).get_cell, 'A1')
+
+        with self.subTest('Typed blanks'):
+            self.assertIsNone(SheetGrid([[True]], blank_value=None).get(1, 0))
+
+    def test_interned(self):
+        rows = [[''.join(['Sharp', 'shooter']) for _ in range(3)] for _ in range(100)]
+
+        grid = SheetGrid(rows)
+
+        with self.subTest('Repeated strings held once'):
+            self.assertEqual(len({id(value) for value in grid.cells}), 1)
+
+        with self.subTest('Smaller than the nested lists'):
+            self.assertLess(sys.getsizeof(grid), estimate_size(rows))
+
+    def test_contains_value(self):
+        grid = SheetGrid([['  Sharpshooter ', 'TRUE'], ['Read The Room']])
+
+        with self.subTest('Normalised on both sides'):
+            self.assertTrue(grid.contains_value('sharpshooter'))
+            self.assertTrue(grid.contains_value('Read the room '))
+
+        with self.subTest('Missing'):
+            self.assertFalse(grid.contains_value('Field Scout'))
+
+        with self.subTest('Lowercase view lines up with cells'):
+            self.assertEqual(grid.normalised_cells[:2], ('sharpshooter', 'true'))
+
+    def test_to_sheet_grid(self):
+        for data, expected_rows in [
+            (None, []),
+            ('Sharpshooter', [['Sharpshooter']]),
+            (['a', 'b'], [['a', 'b']]),
+            ([['a'], ['b']], [['a'], ['b']]),
+        ]:
+            with self.subTest(data=data):
+                self.assertEqual(to_sheet_grid(data), expected_rows)
+
+        grid = SheetGrid([['a']])
+
+        with self.subTest('Grids passed through'):
+            self.assertIs(to_sheet_grid(grid), grid)
+
+        with self.subTest('Astir move check'):
+            self.assertTrue(AstirCharacter._check_spreadsheet_range_or_cell(SheetGrid([['x', ' Sharpshooter']]), 'SHARPSHOOTER'))
+            self.assertTrue(AstirCharacter._check_spreadsheet_range_or_cell('Sharpshooter', 'sharpshooter'))
+            self.assertFalse(AstirCharacter._check_spreadsheet_range_or_cell(None, 'sharpshooter'))
+
+    def setUp(self) -> None:
+        logging.disable(logging.ERROR)
+
+    def tearDown(self) -> None:
+        logging.disable(logging.NOTSET)
@@ -0,0 +1,93 @@
+import unittest
+
+import pickle
+
+from src.utils.sheet_references import (
+    CellRef, RangeRef, to_reference, column_offset_to_column_name, column_name_to_column_offset, get_bounding_box
+)
+from src.utils.google_sheets import _compute_new_column_alpha, check_is_valid_range_or_cell
+from src.vermissian.ResistanceCharacterSheet import SpireCharacter
+from src.astir.AstirCharacterSheet import AstirCharacter, AstirTrait
+
+class TestSheetReferences(unittest.TestCase):
+
+    def test_column_tables(self):
+        for column in range(0, 18278, 7):
+            with self.subTest(column=column):
+                self.assertEqual(column_name_to_column_offset(column_offset_to_column_name(column)), column)
+
+    def test_compute_new_column_alpha(self):
+        for column_alpha, column_offset, expected in [('A', 1, 'B'), ('Z', 1, 'AA'), ('AB', 1, 'AC'), ('BY', 2, 'CA'), ('CA', -1, 'BZ'), ('ES', 0, 'ES')]:
+            with self.subTest(column_alpha=column_alpha, column_offset=column_offset):
+                self.assertEqual(_compute_new_column_alpha(column_alpha, column_offset), expected)
+
+    def test_cell_ref(self):
+        cell_ref = to_reference('BY5')
+
+        with self.subTest('Parsed'):
+            self.assertIsInstance(cell_ref, CellRef)
+            self.assertEqual((cell_ref.column, cell_ref.row, cell_ref.column_name), (76, 5, 'BY'))
+
+        with self.subTest('Equal and hashed the same as the string'):
+            self.assertEqual(cell_ref, 'BY5')
+            self.assertEqual({'BY5': 1}[cell_ref], 1)
+
+        with self.subTest('Parsed once'):
+            self.assertIs(to_reference('BY5'), cell_ref)
+
+        with self.subTest('Immutable'):
+            with self.assertRaises(AttributeError):
+                cell_ref.row = 6
+
+        with self.subTest('Offset'):
+            self.assertEqual(cell_ref.offset(column_offset=-1, row_offset=-2), 'BX3')
+
+        with self.subTest('Pickles'):
+            self.assertEqual(pickle.loads(pickle.dumps(cell_ref)).row, 5)
+
+        with self.subTest('Invalid'):
+            self.assertRaises(ValueError, to_reference, 'by5')
+            self.assertRaises(ValueError, to_reference, 'B5:')
+
+    def test_sheet_name(self):
+        cell_ref = to_reference('Cause / Factions!AQ15')
+
+        with self.subTest('Sheet name split off'):
+            self.assertEqual(cell_ref.sheet_name, 'Cause / Factions')
+            self.assertEqual(cell_ref.local, 'AQ15')
+
+        with self.subTest('Rejected when querying'):
+            self.assertRaises(ValueError, check_is_valid_range_or_cell, cell_ref)
+
+    def test_range_ref(self):
+        range_ref = to_reference('C4:B2')
+
+        with self.subTest('Parsed'):
+            self.assertIsInstance(range_ref, RangeRef)
+            self.assertEqual((range_ref.min_column, range_ref.min_row, range_ref.max_column, range_ref.max_row), (1, 2, 2, 4))
+
+        with self.subTest('Cells'):
+            self.assertEqual(list(range_ref.cells()), ['B2', 'C2', 'B3', 'C3', 'B4', 'C4'])
+
+        with self.subTest('Contains'):
+            self.assertTrue(range_ref.contains('B3'))
+            self.assertTrue(range_ref.contains('B2:C3'))
+            self.assertFalse(range_ref.contains('D3'))
+
+        with self.subTest('Union'):
+            self.assertEqual(range_ref.union('AA1'), 'B1:AA4')
+
+        with self.subTest('Bounding box'):
+            self.assertEqual(get_bounding_box(['D5', 'H11', 'B4', 'L3:L19', 'X23:X32']), 'B3:X32')
+
+    def test_cell_references_pre_parsed(self):
+        for character_cls in [SpireCharacter, AstirCharacter]:
+            with self.subTest(character_cls=character_cls.__name__):
+                self.assertIsInstance(character_cls.CELL_REFERENCES['name_label'], CellRef)
+                self.assertIsInstance(character_cls.CELL_REFERENCES['biography']['character_name'], CellRef)
+
+        with self.subTest('Ranges'):
+            self.assertIsInstance(SpireCharacter.CELL_REFERENCES['abilities'], RangeRef)
+
+        with self.subTest('Other sheets'):
+            self.assertEqual(AstirCharacter.CELL_REFERENCES['traits'][AstirTrait.CREW].sheet_name, 'Cause / Factions')
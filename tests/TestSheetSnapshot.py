@@ -0,0 +1,120 @@
+import unittest
+from unittest import mock
+
+import asyncio
+import logging
+
+from src.utils.sheet_snapshot import SheetSnapshot
+from src.utils.sheets_requests import ValueRenderOption
+from src.utils.google_sheets import get_bounding_box, column_name_to_column_offset
+from src.vermissian.ResistanceCharacterSheet import SpireCharacter, SpireSkill, SpireDomain
+
+class TestSheetSnapshot(unittest.TestCase):
+
+    def test_column_name_to_column_offset(self):
+        for column_alpha, expected_offset in [('A', 0), ('Z', 25), ('AA', 26), ('AZ', 51), ('BA', 52), ('ES', 148), ('ZZ', 701), ('AAA', 702)]:
+            with self.subTest(column_alpha=column_alpha):
+                self.assertEqual(column_name_to_column_offset(column_alpha), expected_offset)
+
+    def test_get_bounding_box(self):
+        with self.subTest('Cells and ranges'):
+            self.assertEqual(get_bounding_box(['D5', 'H11', 'B4', 'L3:L19', 'X23:X32']), 'B3:X32')
+
+        with self.subTest('Reversed range'):
+            self.assertEqual(get_bounding_box(['B7:A3']), 'A3:B7')
+
+        with self.subTest('Empty'):
+            self.assertRaises(ValueError, get_bounding_box, [])
+
+    def test_get(self):
+        snapshot = SheetSnapshot('B2:E5', [
+            ['a', 'b'],
+            [],
+            ['', '', '', 'c'],
+        ])
+
+        with self.subTest('Cell'):
+            self.assertEqual(snapshot.get('C2'), 'b')
+
+        with self.subTest('Empty cell past a ragged row'):
+            self.assertIsNone(snapshot.get('E2'))
+
+        with self.subTest('Empty cell past the last row'):
+            self.assertIsNone(snapshot.get('B5'))
+
+        with self.subTest('Range trims like the API'):
+            self.assertEqual(snapshot.get('B2:E5'), [['a', 'b'], [], ['', '', '', 'c']])
+            self.assertEqual(snapshot.get('B2:D4'), [['a', 'b']])
+
+        with self.subTest('Empty range'):
+            self.assertIsNone(snapshot.get('B3:E3'))
+
+        with self.subTest('Outside snapshot'):
+            self.assertFalse(snapshot.contains('A1'))
+            self.assertFalse(snapshot.contains('B2:F2'))
+            self.assertRaises(IndexError, snapshot.get, 'A1')
+
+        with self.subTest('Empty snapshot'):
+            self.assertIsNone(SheetSnapshot('B2:E5', None).get('C3'))
+
+        typed_snapshot = SheetSnapshot('B2:E3', [[True, None, 4]], blank_value=None)
+
+        with self.subTest('Typed snapshot'):
+            self.assertIs(typed_snapshot.get('B2'), True)
+            self.assertIsNone(typed_snapshot.get('C2'))
+            self.assertEqual(typed_snapshot.get('B2:C2'), [[True]])
+            self.assertEqual(typed_snapshot.get('B2:E3'), [[True, None, 4]])
+
+    @mock.patch('src.CharacterSheet.get_from_spreadsheet_api_async', autospec=True)
+    def test_read_cells_snapshot_mode(self, mock_get: mock.Mock):
+        character = SpireCharacter(
+            spreadsheet_id='1saogmy4eNNKng32Pf39b7K3Ko4uHEuWClm7UM-7Kd8I',
+            sheet_name='Example Character Sheet',
+            character_name='Test Character',
+            discord_username='test discord username'
+        )
+
+        snapshot_range = character.get_snapshot_range()
+
+        rows = [[None] * 23 for _ in range(30)]
+        rows[11 - 3][ord('H') - ord('B')] = True # Compel
+        rows[11 - 3][ord('J') - ord('B')] = False # Academia
+        rows[18 - 3][ord('E') - ord('B')] = 4 # Total fallout
+
+        mock_get.return_value = {
+            character.sheet_name: {
+                snapshot_range: rows
+            }
+        }
+
+        with mock.patch.object(SpireCharacter, 'SNAPSHOT_MODE', True):
+            has_skill, has_domain = self.loop.run_until_complete(character.check_skill_and_domain(SpireSkill.COMPEL, SpireDomain.ACADEMIA))
+            stress = self.loop.run_until_complete(character.get_fallout_stress())
+
+        with self.subTest('Getters served from the snapshot'):
+            self.assertEqual((has_skill, has_domain, stress), (True, False, 4))
+
+        with self.subTest('Only the snapshot range was queried'):
+            for call in mock_get.call_args_list:
+                self.assertEqual(call.kwargs['raw_sheet_name_data'], {character.sheet_name: snapshot_range})
+
+        with self.subTest('Typed snapshot used'):
+            self.assertEqual(list(character.snapshots.keys()), [ValueRenderOption.UNFORMATTED_VALUE])
+
+        with self.subTest('Snapshot reused while the cached rows are unchanged'):
+            snapshot = character.snapshots[ValueRenderOption.UNFORMATTED_VALUE]
+
+            with mock.patch.object(SpireCharacter, 'SNAPSHOT_MODE', True):
+                self.loop.run_until_complete(character.get_fallout_stress())
+
+            self.assertIs(character.snapshots[ValueRenderOption.UNFORMATTED_VALUE], snapshot)
+
+    def setUp(self) -> None:
+        logging.disable(logging.ERROR)
+
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self) -> None:
+        self.loop.close()
+
+        logging.disable(logging.NOTSET)
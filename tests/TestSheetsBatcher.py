@@ -0,0 +1,201 @@
+import unittest
+from unittest import mock
+
+import asyncio
+import logging
+
+from src.utils.sheets_batcher import SheetsBatcher
+from src.utils.single_flight import SingleFlight
+from src.utils.sheets_requests import build_values_requests
+from src.utils.google_sheets import get_from_spreadsheet_api_async, configure_batching, get_batcher, get_single_flight, _chunk_range_keys
+from src.utils.deadline import command_deadline, get_remaining_time
+from src.utils.sheets_budget import track_command_usage, charge_call, record_usage, current_command_usage
+from src.utils.sheets_keys import sheets_guild, current_guild_id
+
+class TestSheetsBatcher(unittest.TestCase):
+
+    @staticmethod
+    async def mock_fetch(spreadsheet_id, raw_sheet_name_data, **fetch_kwargs):
+        return {
+            sheet_name: {range_or_cell: f'{sheet_name}!{range_or_cell}' for range_or_cell in ranges_or_cells}
+                for sheet_name, ranges_or_cells in raw_sheet_name_data.items()
+        }
+
+    @staticmethod
+    def mock_chunk(spreadsheet_id, keys, max_ranges, max_url_length):
+        return [keys[start:start + max_ranges] for start in range(0, len(keys), max_ranges)]
+
+    def test_read_merges(self):
+        fetch = mock.AsyncMock(side_effect=self.mock_fetch)
+
+        batcher = SheetsBatcher(window=0.005, fetch=fetch, chunk=self.mock_chunk)
+
+        async def run():
+            return await asyncio.gather(
+                batcher.read(self.spreadsheet_id, {'Sheet1': ['A1', 'B2']}),
+                batcher.read(self.spreadsheet_id, {'Sheet1': ['B2'], 'Sheet2': ['C3']}),
+                batcher.read('other spreadsheet', {'Sheet1': ['A1']}),
+            )
+
+        first, second, other = self.loop.run_until_complete(run())
+
+        with self.subTest('One call per spreadsheet'):
+            self.assertEqual(fetch.await_count, 2)
+
+            fetch.assert_any_await(self.spreadsheet_id, {'Sheet1': ['A1', 'B2'], 'Sheet2': ['C3']})
+
+        with self.subTest('Results split back per caller'):
+            self.assertEqual(first, {'Sheet1': {'A1': 'Sheet1!A1', 'B2': 'Sheet1!B2'}})
+            self.assertEqual(second, {'Sheet1': {'B2': 'Sheet1!B2'}, 'Sheet2': {'C3': 'Sheet2!C3'}})
+            self.assertEqual(other, {'Sheet1': {'A1': 'Sheet1!A1'}})
+
+        with self.subTest('Stats'):
+            self.assertEqual(batcher.get_stats()['reads'], 3)
+            self.assertEqual(batcher.get_stats()['batches'], 2)
+            self.assertEqual(batcher.get_stats()['api_calls'], 2)
+
+    @mock.patch('src.utils.google_sheets.get_key', return_value='key')
+    def test_chunk(self, mock_get_key: mock.Mock):
+        keys = [(f'Sheet {sheet_number}', 'B4') for sheet_number in range(250)]
+
+        with self.subTest('Range limit'):
+            chunks = _chunk_range_keys(self.spreadsheet_id, keys[:4], max_ranges=3, max_url_length=100000)
+
+            self.assertEqual([len(chunk) for chunk in chunks], [3, 1])
+
+        with self.subTest('URL length limit'):
+            chunks = _chunk_range_keys(self.spreadsheet_id, keys, max_ranges=1000, max_url_length=2000)
+
+            self.assertEqual(chunks, [list(values_request.keys) for values_request in build_values_requests(self.spreadsheet_id, 'key', keys, max_ranges=1000, max_url_length=2000)])
+            self.assertGreater(len(chunks), 1)
+
+        with self.subTest('Nothing dropped'):
+            self.assertEqual([key for chunk in chunks for key in chunk], keys)
+
+        with self.subTest('One key per chunking'):
+            self.assertEqual(mock_get_key.call_count, 2)
+
+    def test_read_error(self):
+        async def fetch(spreadsheet_id, raw_sheet_name_data):
+            if 'Bad Sheet' in raw_sheet_name_data:
+                raise ValueError('Mock error')
+
+            return await self.mock_fetch(spreadsheet_id, raw_sheet_name_data)
+
+        batcher = SheetsBatcher(window=0.005, fetch=fetch, chunk=self.mock_chunk, max_ranges=1)
+
+        async def run():
+            return await asyncio.gather(
+                batcher.read(self.spreadsheet_id, {'Sheet1': ['A1']}),
+                batcher.read(self.spreadsheet_id, {'Bad Sheet': ['A1']}),
+                return_exceptions=True
+            )
+
+        good, bad = self.loop.run_until_complete(run())
+
+        with self.subTest('Callers in other chunks unaffected'):
+            self.assertEqual(good, {'Sheet1': {'A1': 'Sheet1!A1'}})
+
+        with self.subTest('Callers in the failed chunk get the error'):
+            self.assertIsInstance(bad, ValueError)
+
+    def test_read_shared_context(self):
+        fetch_contexts = []
+
+        async def fetch(spreadsheet_id, raw_sheet_name_data):
+            fetch_contexts.append((get_remaining_time(), current_command_usage.get(), current_guild_id.get()))
+
+            charge_call()
+            record_usage(num_bytes=100)
+
+            return await self.mock_fetch(spreadsheet_id, raw_sheet_name_data)
+
+        batcher = SheetsBatcher(window=0.005, fetch=fetch, chunk=self.mock_chunk)
+
+        async def read(command_name: str, seconds: float, guild_id: int, sheet_name_data):
+            with track_command_usage(command_name, budget=1) as command_usage, command_deadline(seconds), sheets_guild(guild_id):
+                await batcher.read(self.spreadsheet_id, sheet_name_data)
+
+            return command_usage
+
+        async def run():
+            return await asyncio.gather(
+                read('first_command', seconds=0.6, guild_id=1, sheet_name_data={'Sheet1': ['A1']}),
+                read('second_command', seconds=5, guild_id=2, sheet_name_data={'Sheet1': ['B2', 'C3', 'D4']}),
+            )
+
+        first_usage, second_usage = self.loop.run_until_complete(run())
+
+        remaining_time, fetch_usage, fetch_guild_id = fetch_contexts[0]
+
+        with self.subTest('Not the first read\'s context'):
+            self.assertGreater(remaining_time, 4)
+            self.assertNotIn(fetch_usage, [first_usage, second_usage])
+            self.assertIsNone(fetch_guild_id)
+
+        with self.subTest('Each read charged its share'):
+            self.assertEqual((first_usage.calls, first_usage.bytes), (1, 25))
+            self.assertEqual((second_usage.calls, second_usage.bytes), (1, 75))
+
+    @mock.patch('src.utils.google_sheets.get_key', return_value='123')
+    @mock.patch('src.utils.google_sheets._fetch_from_spreadsheet_api_async')
+    def test_get_from_spreadsheet_api_async_batched(self, mock_fetch: mock.AsyncMock, mock_get_key: mock.Mock):
+        mock_fetch.side_effect = self.mock_fetch
+
+        configure_batching(window_ms=5)
+
+        async def run():
+            return await asyncio.gather(
+                get_from_spreadsheet_api_async(spreadsheet_id=self.spreadsheet_id, raw_sheet_name_data={'Sheet1': ['H11', 'J11']}),
+                get_from_spreadsheet_api_async(spreadsheet_id=self.spreadsheet_id, raw_sheet_name_data={'Sheet2': 'E18'}),
+            )
+
+        first, second = self.loop.run_until_complete(run())
+
+        with self.subTest('One call'):
+            self.assertEqual(mock_fetch.await_count, 1)
+
+        with self.subTest('Results'):
+            self.assertEqual(first, {'Sheet1': {'H11': 'Sheet1!H11', 'J11': 'Sheet1!J11'}})
+            self.assertEqual(second, {'Sheet2': {'E18': 'Sheet2!E18'}})
+
+        with self.subTest('Invalid ranges rejected before batching'):
+            self.assertRaises(
+                ValueError,
+                self.loop.run_until_complete,
+                get_from_spreadsheet_api_async(spreadsheet_id=self.spreadsheet_id, raw_sheet_name_data={'Sheet1': 'not a cell'})
+            )
+
+    def test_configure_batching(self):
+        with self.subTest('Off by default'):
+            self.assertIsNone(get_batcher())
+
+        with self.subTest('Window'):
+            configure_batching(window_ms=20)
+
+            self.assertAlmostEqual(get_batcher().window, 0.02)
+
+        with self.subTest('Turned off'):
+            configure_batching(window_ms=None)
+
+            self.assertIsNone(get_batcher())
+
+        with self.subTest('Invalid window'):
+            self.assertRaises(ValueError, configure_batching, window_ms=0)
+
+    def setUp(self) -> None:
+        logging.disable(logging.ERROR)
+
+        self.spreadsheet_id = '1saogmy4eNNKng32Pf39b7K3Ko4uHEuWClm7UM-7Kd8I'
+
+        self.loop = asyncio.new_event_loop()
+
+        configure_batching(window_ms=None)
+        get_single_flight.single_flight = SingleFlight()
+
+    def tearDown(self) -> None:
+        configure_batching(window_ms=None)
+
+        self.loop.close()
+
+        logging.disable(logging.NOTSET)
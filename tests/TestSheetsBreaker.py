@@ -0,0 +1,226 @@
+import unittest
+from unittest import mock
+
+import asyncio
+import logging
+
+import requests
+
+from src.utils.sheets_breaker import SpreadsheetBreaker, CircuitState, get_spreadsheet_breaker, OPEN_FOR
+from src.utils.sheets_retry import RETRY_POLICIES, RetryPolicy
+from src.utils.google_sheets import get_spreadsheet_metadata, get_from_spreadsheet_api, _request_json_async
+from src.utils.exceptions import ForbiddenSpreadsheetError, SpreadsheetUnavailableError, TooManyRequestsError
+from src.vermissian.ResistanceCharacterSheet import SpireCharacter
+
+def make_server_error() -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = 500
+
+    return requests.HTTPError(response=response)
+
+class TestSheetsBreaker(unittest.TestCase):
+
+    @mock.patch('src.utils.sheets_breaker.time.monotonic')
+    def test_circuit(self, mock_monotonic: mock.Mock):
+        mock_monotonic.return_value = 0
+
+        breaker = SpreadsheetBreaker()
+
+        with self.subTest('Transient errors tolerated'):
+            breaker.record_failure('abc', make_server_error())
+            breaker.record_failure('abc', make_server_error())
+
+            self.assertEqual(breaker.get_state('abc'), CircuitState.CLOSED)
+
+        with self.subTest('Quota errors not counted'):
+            breaker.record_failure('abc', TooManyRequestsError())
+
+            self.assertEqual(breaker.get_state('abc'), CircuitState.CLOSED)
+
+        breaker.record_failure('abc', make_server_error())
+
+        with self.subTest('Opens once failing consistently'):
+            self.assertEqual(breaker.get_state('abc'), CircuitState.OPEN)
+            self.assertRaises(SpreadsheetUnavailableError, breaker.before_call, 'abc')
+
+        mock_monotonic.return_value = OPEN_FOR
+
+        with self.subTest('Half open lets one probe through'):
+            breaker.before_call('abc')
+
+            self.assertEqual(breaker.get_state('abc'), CircuitState.HALF_OPEN)
+            self.assertRaises(SpreadsheetUnavailableError, breaker.before_call, 'abc')
+
+        breaker.record_failure('abc', make_server_error())
+
+        with self.subTest('Failed probe backs off for longer'):
+            mock_monotonic.return_value = OPEN_FOR * 2
+
+            self.assertRaises(SpreadsheetUnavailableError, breaker.before_call, 'abc')
+
+            mock_monotonic.return_value = OPEN_FOR * 3
+
+            breaker.before_call('abc')
+
+        breaker.record_success('abc')
+
+        with self.subTest('Successful probe closes'):
+            self.assertEqual(breaker.get_state('abc'), CircuitState.CLOSED)
+
+            breaker.before_call('abc')
+
+        with self.subTest('Forbidden opens straight away'):
+            breaker.record_failure('def', ForbiddenSpreadsheetError(spreadsheet_id='def'))
+
+            self.assertRaises(ForbiddenSpreadsheetError, breaker.before_call, 'def')
+
+        with self.subTest('Reset'):
+            breaker.reset('def')
+
+            breaker.before_call('def')
+
+    @mock.patch('src.utils.sheets_breaker.time.monotonic')
+    def test_non_character_tabs(self, mock_monotonic: mock.Mock):
+        mock_monotonic.return_value = 0
+
+        breaker = SpreadsheetBreaker(non_character_tab_ttl=10)
+
+        breaker.mark_non_character_tab('abc', 'Cover')
+
+        with self.subTest('Remembered'):
+            self.assertTrue(breaker.is_known_non_character_tab('abc', 'Cover'))
+            self.assertFalse(breaker.is_known_non_character_tab('abc', 'Character 1'))
+            self.assertFalse(breaker.is_known_non_character_tab('def', 'Cover'))
+
+        mock_monotonic.return_value = 10
+
+        with self.subTest('Forgotten'):
+            self.assertFalse(breaker.is_known_non_character_tab('abc', 'Cover'))
+
+    @mock.patch('src.utils.google_sheets.get_session', autospec=True)
+    @mock.patch('src.utils.google_sheets.get_key', autospec=True)
+    def test_forbidden_spreadsheet(self, mock_get_key: mock.Mock, mock_get_session: mock.Mock):
+        mock_get_key.return_value = '123'
+
+        forbidden_response = mock.Mock(status_code=403, headers={})
+        forbidden_response.json.return_value = {'error': {'status': 'PERMISSION_DENIED'}}
+
+        mock_get_session.return_value.get.return_value = forbidden_response
+
+        self.assertRaises(ForbiddenSpreadsheetError, get_spreadsheet_metadata, 'spreadsheet id')
+
+        with self.subTest('Fails fast'):
+            self.assertRaises(ForbiddenSpreadsheetError, get_spreadsheet_metadata, 'spreadsheet id')
+            self.assertRaises(ForbiddenSpreadsheetError, get_from_spreadsheet_api, 'spreadsheet id', {'Sheet': 'A1'}, {0: 'A1'})
+
+            self.assertEqual(mock_get_session.return_value.get.call_count, 1)
+
+        with self.subTest('Other spreadsheets unaffected'):
+            self.assertRaises(ForbiddenSpreadsheetError, get_spreadsheet_metadata, 'other spreadsheet id')
+
+            self.assertEqual(mock_get_session.return_value.get.call_count, 2)
+
+    @mock.patch('src.utils.google_sheets.get_known_spreadsheet_metadata', autospec=True)
+    @mock.patch('src.utils.google_sheets._request_values', autospec=True)
+    @mock.patch('src.utils.google_sheets.get_key', autospec=True)
+    def test_no_gid_fallback_for_forbidden(self, mock_get_key: mock.Mock, mock_request_values: mock.Mock, mock_get_known_spreadsheet_metadata: mock.Mock):
+        mock_get_key.return_value = '123'
+
+        mock_request_values.side_effect = ForbiddenSpreadsheetError(spreadsheet_id='spreadsheet id')
+
+        self.assertRaises(ForbiddenSpreadsheetError, get_from_spreadsheet_api, 'spreadsheet id', {'Sheet': 'A1'}, {0: 'A1'})
+
+        mock_get_known_spreadsheet_metadata.assert_not_called()
+
+    @mock.patch('src.CharacterSheet.get_from_spreadsheet_api', autospec=True)
+    def test_bulk_create_skips_non_character_tabs(self, mock_get_from_spreadsheet_api: mock.Mock):
+        name_label = SpireCharacter.CELL_REFERENCES['name_label']
+        discord_username = SpireCharacter.CELL_REFERENCES['biography']['discord_username']
+        character_name = SpireCharacter.CELL_REFERENCES['biography']['character_name']
+
+        mock_get_from_spreadsheet_api.return_value = {
+            'Cover': {name_label: 'Welcome!', discord_username: None, character_name: None},
+            'Character 1': {name_label: SpireCharacter.EXPECTED_NAME_LABEL, discord_username: 'Player1', character_name: 'Ada'},
+        }
+
+        characters = SpireCharacter.bulk_create('spreadsheet id', ['Cover', 'Character 1'], [0, 1])
+
+        with self.subTest('Characters found'):
+            self.assertEqual(list(characters), ['Character 1'])
+            self.assertEqual(characters['Character 1'].sheet_gid, 1)
+
+        mock_get_from_spreadsheet_api.return_value = {
+            'Character 1': {name_label: SpireCharacter.EXPECTED_NAME_LABEL, discord_username: 'Player1', character_name: 'Ada'},
+        }
+
+        SpireCharacter.bulk_create('spreadsheet id', ['Cover', 'Character 1'], [0, 1])
+
+        with self.subTest('Non-character tabs not read again'):
+            self.assertEqual(list(mock_get_from_spreadsheet_api.call_args.kwargs['raw_sheet_name_data']), ['Character 1'])
+
+        with self.subTest('Adding a known non-character tab fails fast'):
+            self.assertRaises(ValueError, SpireCharacter, 'spreadsheet id', 'Cover', 0)
+
+            self.assertEqual(mock_get_from_spreadsheet_api.call_count, 2)
+
+        mock_get_from_spreadsheet_api.return_value = {
+            'Cover': {name_label: SpireCharacter.EXPECTED_NAME_LABEL, discord_username: 'Player2', character_name: 'Grace'},
+            'Character 1': {name_label: SpireCharacter.EXPECTED_NAME_LABEL, discord_username: 'Player1', character_name: 'Ada'},
+        }
+
+        get_spreadsheet_breaker().reset('spreadsheet id') # As a /link does
+
+        characters = SpireCharacter.bulk_create('spreadsheet id', ['Cover', 'Character 1'], [0, 1])
+
+        with self.subTest('Re-linking finds tabs filled in since'):
+            self.assertEqual(list(characters), ['Cover', 'Character 1'])
+
+    @mock.patch('src.utils.google_sheets._request_json_hedged_async')
+    def test_cancelled_probe(self, mock_request: mock.AsyncMock):
+        breaker = get_spreadsheet_breaker()
+
+        for _ in range(3):
+            breaker.record_failure('abc', make_server_error())
+
+        breaker.circuits['abc'].opened_at -= OPEN_FOR # Not by mocking monotonic, which the event loop needs too
+
+        async def request(url: str, spreadsheet_id: str):
+            await asyncio.sleep(10)
+
+        mock_request.side_effect = request
+
+        async def cancel_probe():
+            probe = asyncio.create_task(_request_json_async('url', 'abc'))
+
+            await asyncio.sleep(0.01)
+
+            probe.cancel()
+
+            with self.assertRaises(asyncio.CancelledError):
+                await probe
+
+        self.loop.run_until_complete(cancel_probe())
+
+        with self.subTest('Next call probes instead'):
+            breaker.before_call('abc')
+
+            self.assertEqual(breaker.get_state('abc'), CircuitState.HALF_OPEN)
+
+    def setUp(self) -> None:
+        logging.disable(logging.ERROR)
+
+        self.loop = asyncio.new_event_loop()
+
+        self.retry_policies_patcher = mock.patch.dict(RETRY_POLICIES, {error_class: RetryPolicy(max_retries=0, base_delay=0, max_delay=0) for error_class in RETRY_POLICIES})
+        self.retry_policies_patcher.start()
+
+        get_spreadsheet_breaker.breaker = SpreadsheetBreaker()
+
+    def tearDown(self) -> None:
+        del get_spreadsheet_breaker.breaker
+
+        self.retry_policies_patcher.stop()
+
+        self.loop.close()
+
+        logging.disable(logging.NOTSET)
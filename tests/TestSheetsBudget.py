@@ -0,0 +1,129 @@
+import unittest
+from unittest import mock
+
+import asyncio
+import logging
+
+from src.utils.sheets_budget import (
+    track_command_usage, charge_call, record_usage, is_over_budget, get_usage_metrics, configure_command_budget,
+    get_command_budget, COMMAND_CALL_BUDGETS, DEFAULT_CALL_BUDGET
+)
+from src.utils.sheets_cache import SheetsCache, get_sheets_cache
+from src.utils.sheets_scheduler import SheetsScheduler, TokenBucket, get_scheduler
+from src.utils.sheets_requests import ValueRenderOption
+from src.utils.google_sheets import get_spreadsheet_metadata, get_from_spreadsheet_api_async, get_revalidations
+from src.utils.exceptions import SheetsBudgetExceededError
+
+class TestSheetsBudget(unittest.TestCase):
+
+    def test_charge_call(self):
+        with self.subTest('Untracked calls are free'):
+            charge_call()
+
+            self.assertFalse(is_over_budget())
+
+        with track_command_usage('test_command', budget=2) as command_usage:
+            charge_call()
+
+            with self.subTest('Within budget'):
+                self.assertFalse(is_over_budget())
+                self.assertTrue(is_over_budget(2))
+
+            charge_call()
+
+            with self.subTest('Fails fast once spent'):
+                self.assertRaises(SheetsBudgetExceededError, charge_call)
+                self.assertEqual(command_usage.calls, 2)
+
+            record_usage(ranges=3, cells=5, num_bytes=100)
+
+        with self.subTest('Totalled per command'):
+            self.assertEqual(get_usage_metrics()['test_command'], {
+                'commands': 1, 'calls': 2, 'ranges': 3, 'cells': 5, 'bytes': 100, 'served_stale': 0, 'max_calls': 2
+            })
+
+    @mock.patch.dict(COMMAND_CALL_BUDGETS, {})
+    def test_configure_command_budget(self):
+        with self.subTest('Default'):
+            self.assertEqual(get_command_budget('test_command'), DEFAULT_CALL_BUDGET)
+
+        configure_command_budget('test_command', None)
+
+        with self.subTest('Unlimited'):
+            with track_command_usage('test_command') as command_usage:
+                for _ in range(DEFAULT_CALL_BUDGET + 1):
+                    charge_call()
+
+            self.assertIsNone(command_usage.get_remaining_calls())
+
+        with self.subTest('Invalid'):
+            self.assertRaises(ValueError, configure_command_budget, 'test_command', 0)
+
+    @mock.patch('src.utils.google_sheets.get_session', autospec=True)
+    @mock.patch('src.utils.google_sheets.get_key', autospec=True)
+    def test_sheets_calls_counted(self, mock_get_key: mock.Mock, mock_get_session: mock.Mock):
+        mock_get_key.return_value = '123'
+
+        ok_response = mock.Mock(status_code=200, headers={'Content-Length': '42'})
+        ok_response.json.return_value = {'sheets': [{'properties': {'sheetId': 1, 'title': 'abc'}}]}
+
+        mock_get_session.return_value.get.return_value = ok_response
+
+        with track_command_usage('test_command', budget=1) as command_usage:
+            get_spreadsheet_metadata('spreadsheet id')
+
+            with self.subTest('Over budget'):
+                self.assertRaises(SheetsBudgetExceededError, get_spreadsheet_metadata, 'spreadsheet id')
+
+        with self.subTest('Call and bytes counted'):
+            self.assertEqual((command_usage.calls, command_usage.bytes), (1, 42))
+
+        with self.subTest('Nothing sent once over budget'):
+            self.assertEqual(mock_get_session.return_value.get.call_count, 1)
+
+    @mock.patch('src.utils.sheets_cache.time.monotonic')
+    @mock.patch('src.utils.google_sheets.get_key', autospec=True)
+    def test_served_stale_over_budget(self, mock_get_key: mock.Mock, mock_monotonic: mock.Mock):
+        mock_get_key.return_value = '123'
+
+        mock_monotonic.return_value = 100
+
+        get_sheets_cache().set(('spreadsheet id', 'Sheet', 'A1', ValueRenderOption.FORMATTED_VALUE), 'cached', ttl=10)
+
+        mock_monotonic.return_value = 120
+
+        async def read(range_or_cell: str):
+            return await get_from_spreadsheet_api_async('spreadsheet id', {'Sheet': range_or_cell}, cache_ttl=10)
+
+        with track_command_usage('test_command', budget=1) as command_usage:
+            charge_call()
+
+            with self.subTest('Served stale'):
+                self.assertEqual(self.loop.run_until_complete(read('A1')), {'Sheet': {'A1': 'cached'}})
+                self.assertEqual(command_usage.served_stale, 1)
+
+            with self.subTest('Fails fast with nothing to fall back on'):
+                self.assertRaises(SheetsBudgetExceededError, self.loop.run_until_complete, read('B2'))
+
+        for revalidation in get_revalidations().values():
+            revalidation.cancel()
+
+        self.loop.run_until_complete(asyncio.gather(*get_revalidations().values(), return_exceptions=True))
+
+    def setUp(self) -> None:
+        logging.disable(logging.ERROR)
+
+        self.loop = asyncio.new_event_loop()
+
+        get_usage_metrics.metrics = {}
+        get_sheets_cache.cache = SheetsCache(max_stale=60)
+        get_scheduler.scheduler = SheetsScheduler([TokenBucket(capacity=100, refill_per_second=100)])
+
+    def tearDown(self) -> None:
+        get_usage_metrics.metrics = {}
+        del get_sheets_cache.cache
+        del get_scheduler.scheduler
+
+        self.loop.close()
+
+        logging.disable(logging.NOTSET)
@@ -0,0 +1,261 @@
+import unittest
+from unittest import mock
+
+import asyncio
+import logging
+
+from src.utils.sheets_cache import SheetsCache, estimate_size, get_sheets_cache
+from src.utils.sheet_grid import SheetGrid
+from src.utils.google_sheets import get_from_spreadsheet_api_async, get_revalidations
+from src.utils.sheets_budget import track_command_usage, get_stale_notice
+from src.utils.exceptions import TooManyRequestsError, ForbiddenSpreadsheetError
+from src.utils.sheets_requests import ValueRenderOption
+
+class TestSheetsCache(unittest.TestCase):
+
+    def test_get_set(self):
+        cache = SheetsCache()
+
+        key = (self.spreadsheet_id, self.sheet_name, 'A1', ValueRenderOption.FORMATTED_VALUE)
+
+        with self.subTest('Miss before set'):
+            self.assertEqual(cache.get(key), (False, None))
+
+        cache.set(key, 'TRUE', ttl=60)
+
+        with self.subTest('Hit after set'):
+            self.assertEqual(cache.get(key), (True, 'TRUE'))
+
+        empty_key = (self.spreadsheet_id, self.sheet_name, 'A2', ValueRenderOption.FORMATTED_VALUE)
+        cache.set(empty_key, None, ttl=60)
+
+        with self.subTest('Empty cells are cached too'):
+            self.assertEqual(cache.get(empty_key), (True, None))
+
+        with self.subTest('Stats'):
+            self.assertEqual(cache.get_stats()['hits'], 2)
+            self.assertEqual(cache.get_stats()['misses'], 1)
+
+    @mock.patch('src.utils.sheets_cache.time.monotonic')
+    def test_ttl(self, mock_monotonic: mock.Mock):
+        cache = SheetsCache()
+
+        key = (self.spreadsheet_id, self.sheet_name, 'A1', ValueRenderOption.FORMATTED_VALUE)
+
+        mock_monotonic.return_value = 100
+        cache.set(key, '3', ttl=15)
+
+        mock_monotonic.return_value = 114
+        with self.subTest('Fresh before TTL'):
+            self.assertEqual(cache.get(key), (True, '3'))
+
+        mock_monotonic.return_value = 115
+        with self.subTest('Expired at TTL'):
+            self.assertEqual(cache.get(key), (False, None))
+
+        with self.subTest('Expired entry removed'):
+            self.assertEqual(len(cache), 0)
+            self.assertEqual(cache.current_bytes, 0)
+
+    @mock.patch('src.utils.sheets_cache.time.monotonic')
+    def test_get_stale(self, mock_monotonic: mock.Mock):
+        cache = SheetsCache(max_stale=60)
+
+        key = (self.spreadsheet_id, self.sheet_name, 'A1', ValueRenderOption.FORMATTED_VALUE)
+
+        mock_monotonic.return_value = 100
+        cache.set(key, '3', ttl=15)
+
+        mock_monotonic.return_value = 120
+        with self.subTest('Expired for get'):
+            self.assertEqual(cache.get(key), (False, None))
+
+        with self.subTest('Kept for get_stale'):
+            self.assertEqual(cache.get_stale(key), (True, '3'))
+
+        mock_monotonic.return_value = 175
+        with self.subTest('Dropped once too stale'):
+            self.assertEqual(cache.get_stale(key), (False, None))
+            self.assertEqual(len(cache), 0)
+
+    def test_lru_eviction(self):
+        keys = [(self.spreadsheet_id, self.sheet_name, f'A{row}', ValueRenderOption.FORMATTED_VALUE) for row in range(1, 4)]
+
+        entry_size = estimate_size(keys[0]) + estimate_size('value')
+
+        cache = SheetsCache(max_bytes=entry_size * 2)
+
+        cache.set(keys[0], 'value', ttl=60)
+        cache.set(keys[1], 'value', ttl=60)
+
+        cache.get(keys[0]) # Makes keys[1] the least recently used
+
+        cache.set(keys[2], 'value', ttl=60)
+
+        with self.subTest('Least recently used evicted'):
+            self.assertFalse(cache.get(keys[1])[0])
+
+        with self.subTest('Recently used kept'):
+            self.assertTrue(cache.get(keys[0])[0])
+            self.assertTrue(cache.get(keys[2])[0])
+
+        with self.subTest('Within budget'):
+            self.assertLessEqual(cache.current_bytes, cache.max_bytes)
+
+        with self.subTest('Oversized values not cached'):
+            cache.set(keys[1], ['x' * entry_size], ttl=60)
+
+            self.assertFalse(cache.get(keys[1])[0])
+
+        with self.subTest('Grids sized by their cells'):
+            grid = SheetGrid([['x' * entry_size]])
+
+            self.assertGreater(estimate_size(grid), entry_size)
+
+            cache.set(keys[1], grid, ttl=60)
+
+            self.assertFalse(cache.get(keys[1])[0])
+
+    def test_invalidate(self):
+        cache = SheetsCache()
+
+        cache.set((self.spreadsheet_id, self.sheet_name, 'A1', ValueRenderOption.FORMATTED_VALUE), '1', ttl=60)
+        cache.set((self.spreadsheet_id, 'Other Sheet', 'A1', ValueRenderOption.FORMATTED_VALUE), '2', ttl=60)
+        cache.set(('other spreadsheet', self.sheet_name, 'A1', ValueRenderOption.FORMATTED_VALUE), '3', ttl=60)
+
+        with self.subTest('Single sheet'):
+            self.assertEqual(cache.invalidate(self.spreadsheet_id, self.sheet_name), 1)
+            self.assertFalse(cache.get((self.spreadsheet_id, self.sheet_name, 'A1', ValueRenderOption.FORMATTED_VALUE))[0])
+            self.assertTrue(cache.get((self.spreadsheet_id, 'Other Sheet', 'A1', ValueRenderOption.FORMATTED_VALUE))[0])
+
+        with self.subTest('Whole spreadsheet'):
+            self.assertEqual(cache.invalidate(self.spreadsheet_id), 1)
+            self.assertTrue(cache.get(('other spreadsheet', self.sheet_name, 'A1', ValueRenderOption.FORMATTED_VALUE))[0])
+
+    @mock.patch('src.utils.google_sheets._coalesced_fetch_from_spreadsheet_api_async')
+    def test_get_from_spreadsheet_api_async_cached(self, mock_fetch: mock.AsyncMock):
+        mock_fetch.return_value = {
+            self.sheet_name: {
+                'A1': 'TRUE',
+                'B2': 'FALSE'
+            }
+        }
+
+        first = self.loop.run_until_complete(get_from_spreadsheet_api_async(
+            spreadsheet_id=self.spreadsheet_id,
+            raw_sheet_name_data={self.sheet_name: ['A1', 'B2']},
+            cache_ttl=60
+        ))
+
+        with self.subTest('First read queries the sheet'):
+            mock_fetch.assert_awaited_once()
+            self.assertEqual(first[self.sheet_name], {'A1': 'TRUE', 'B2': 'FALSE'})
+
+        mock_fetch.reset_mock()
+        mock_fetch.return_value = {
+            self.sheet_name: {
+                'C3': '4'
+            }
+        }
+
+        second = self.loop.run_until_complete(get_from_spreadsheet_api_async(
+            spreadsheet_id=self.spreadsheet_id,
+            raw_sheet_name_data={self.sheet_name: ['A1', 'C3']},
+            cache_ttl=60
+        ))
+
+        with self.subTest('Only uncached cells queried'):
+            mock_fetch.assert_awaited_once_with(self.spreadsheet_id, {self.sheet_name: ['C3']}, None, ValueRenderOption.FORMATTED_VALUE)
+
+        with self.subTest('Cached and queried cells merged'):
+            self.assertEqual(second[self.sheet_name], {'A1': 'TRUE', 'C3': '4'})
+
+        mock_fetch.reset_mock()
+
+        self.loop.run_until_complete(get_from_spreadsheet_api_async(
+            spreadsheet_id=self.spreadsheet_id,
+            raw_sheet_name_data={self.sheet_name: 'B2'},
+            cache_ttl=60
+        ))
+
+        with self.subTest('Fully cached reads make no call'):
+            mock_fetch.assert_not_awaited()
+
+    @mock.patch('src.utils.google_sheets.REVALIDATION_DELAY', 0)
+    @mock.patch('src.utils.google_sheets._is_sheets_saturated', return_value=False) # Mocking monotonic confuses the real scheduler
+    @mock.patch('src.utils.sheets_cache.time.monotonic')
+    @mock.patch('src.utils.google_sheets._coalesced_fetch_from_spreadsheet_api_async')
+    def test_stale_while_revalidate(self, mock_fetch: mock.AsyncMock, mock_monotonic: mock.Mock, mock_is_sheets_saturated: mock.Mock):
+        key = (self.spreadsheet_id, self.sheet_name, 'A1', ValueRenderOption.FORMATTED_VALUE)
+
+        mock_monotonic.return_value = 100
+        get_sheets_cache().set(key, 'TRUE', ttl=60)
+
+        mock_monotonic.return_value = 400
+
+        async def read(range_or_cell: str = 'A1'):
+            return await get_from_spreadsheet_api_async(self.spreadsheet_id, {self.sheet_name: range_or_cell}, cache_ttl=60)
+
+        mock_fetch.side_effect = TooManyRequestsError()
+
+        with track_command_usage('test_command') as command_usage:
+            data = self.loop.run_until_complete(read())
+
+        with self.subTest('Last known value served'):
+            self.assertEqual(data[self.sheet_name], {'A1': 'TRUE'})
+
+        with self.subTest('Marked as stale'):
+            self.assertEqual(command_usage.served_stale, 1)
+            self.assertIn('5 minutes ago', get_stale_notice(command_usage))
+
+        mock_fetch.side_effect = None
+        mock_fetch.return_value = {self.sheet_name: {'A1': 'FALSE'}}
+
+        self.loop.run_until_complete(asyncio.gather(*get_revalidations().values()))
+
+        with self.subTest('Revalidated in the background'):
+            self.assertEqual(get_sheets_cache().get(key), (True, 'FALSE'))
+            self.assertEqual(len(get_revalidations()), 0)
+
+        mock_fetch.side_effect = ForbiddenSpreadsheetError(spreadsheet_id=self.spreadsheet_id)
+        mock_monotonic.return_value = 1000
+
+        with self.subTest('Only for transient errors'):
+            self.assertRaises(ForbiddenSpreadsheetError, self.loop.run_until_complete, read())
+
+        mock_fetch.side_effect = TooManyRequestsError()
+
+        with self.subTest('Nothing to fall back on'):
+            self.assertRaises(TooManyRequestsError, self.loop.run_until_complete, read('B2'))
+
+        mock_fetch.reset_mock()
+
+        mock_is_sheets_saturated.return_value = True
+
+        with self.subTest('Served straight away when quota is saturated'):
+            data = self.loop.run_until_complete(read())
+
+            self.assertEqual(data[self.sheet_name], {'A1': 'FALSE'})
+            mock_fetch.assert_not_awaited()
+
+        for revalidation in get_revalidations().values():
+            revalidation.cancel()
+
+        self.loop.run_until_complete(asyncio.gather(*get_revalidations().values(), return_exceptions=True))
+
+    def setUp(self) -> None:
+        logging.disable(logging.ERROR)
+
+        self.spreadsheet_id = '1saogmy4eNNKng32Pf39b7K3Ko4uHEuWClm7UM-7Kd8I'
+        self.sheet_name = 'Example Character Sheet'
+
+        self.loop = asyncio.new_event_loop()
+
+        get_sheets_cache().clear()
+
+    def tearDown(self) -> None:
+        del get_sheets_cache.cache
+
+        self.loop.close()
+
+        logging.disable(logging.NOTSET)
@@ -0,0 +1,101 @@
+import unittest
+from unittest import mock
+
+import asyncio
+import logging
+
+from src.utils.sheets_hedging import LatencyTracker, HedgingPolicy, configure_hedging, get_hedging_policy, get_latency_tracker
+from src.utils.sheets_scheduler import SheetsScheduler, TokenBucket, get_scheduler
+from src.utils.deadline import command_deadline
+from src.utils.google_sheets import _request_json_async
+
+class TestSheetsHedging(unittest.TestCase):
+
+    def test_latency_tracker(self):
+        latency_tracker = LatencyTracker(max_samples=100, min_samples=10)
+
+        with self.subTest('Not enough samples'):
+            latency_tracker.record('abc', 1)
+
+            self.assertIsNone(latency_tracker.get_percentile('abc'))
+
+        for latency in range(100):
+            latency_tracker.record('def', latency / 100)
+
+        with self.subTest('Percentile'):
+            self.assertEqual(latency_tracker.get_percentile('def', 0.95), 0.95)
+            self.assertEqual(latency_tracker.get_percentile('def', 0.5), 0.5)
+
+        with self.subTest('Falls back to every spreadsheet'):
+            self.assertIsNotNone(latency_tracker.get_percentile('abc'))
+
+    @mock.patch('src.utils.google_sheets._request_json_with_retries_async')
+    def test_hedging(self, mock_request: mock.AsyncMock):
+        for _ in range(20):
+            get_latency_tracker().record('abc', 0.01)
+
+        calls = []
+
+        async def request(url: str, spreadsheet_id: str):
+            calls.append(url)
+
+            if len(calls) == 1: # Only the first is slow
+                await asyncio.sleep(1)
+
+                return {'slow': True}
+
+            return {'slow': False}
+
+        mock_request.side_effect = request
+
+        async def read():
+            with command_deadline():
+                return await _request_json_async('url', 'abc')
+
+        with self.subTest('Off by default'):
+            configure_hedging(None)
+
+            self.assertEqual(self.loop.run_until_complete(read()), {'slow': True})
+            self.assertEqual(len(calls), 1)
+
+        configure_hedging(HedgingPolicy(min_delay=0.01))
+
+        calls.clear()
+
+        with self.subTest('Slow reads hedged'):
+            self.assertEqual(self.loop.run_until_complete(read()), {'slow': False})
+            self.assertEqual(len(calls), 2)
+            self.assertEqual(get_hedging_policy().stats['hedge_won'], 1)
+
+        calls.clear()
+
+        with self.subTest('Not outside commands'):
+            self.assertEqual(self.loop.run_until_complete(_request_json_async('url', 'abc')), {'slow': True})
+            self.assertEqual(len(calls), 1)
+
+        calls.clear()
+
+        get_scheduler().buckets[0].take(60)
+
+        with self.subTest('Not under quota pressure'):
+            self.assertEqual(self.loop.run_until_complete(read()), {'slow': True})
+            self.assertEqual(len(calls), 1)
+            self.assertEqual(get_hedging_policy().stats['skipped_no_headroom'], 1)
+
+    def setUp(self) -> None:
+        logging.disable(logging.ERROR)
+
+        self.loop = asyncio.new_event_loop()
+
+        get_scheduler.scheduler = SheetsScheduler([TokenBucket(capacity=100, refill_per_second=1)])
+        get_latency_tracker.tracker = LatencyTracker()
+
+    def tearDown(self) -> None:
+        configure_hedging(None)
+
+        del get_scheduler.scheduler
+        del get_latency_tracker.tracker
+
+        self.loop.close()
+
+        logging.disable(logging.NOTSET)
@@ -0,0 +1,100 @@
+import unittest
+from unittest import mock
+
+import logging
+
+from src.utils.sheets_keys import SheetsKeyPool, get_key_pool, configure_key_pool, sheets_guild, QUOTA_WINDOW
+from src.utils.sheets_scheduler import get_scheduler, QUOTAS
+from src.utils.google_sheets import get_key, get_spreadsheet_metadata
+
+class TestSheetsKeys(unittest.TestCase):
+
+    @mock.patch('src.utils.sheets_keys.time.monotonic')
+    def test_key_pool(self, mock_monotonic: mock.Mock):
+        mock_monotonic.return_value = 0
+
+        key_pool = SheetsKeyPool(['key a', 'key b'], guild_keys={123: 'guild key'}, quota_per_minute=2)
+
+        with self.subTest('Least loaded'):
+            self.assertEqual([key_pool.take_key() for _ in range(4)], ['key a', 'key b', 'key a', 'key b'])
+
+        with self.subTest('Guild keys preferred'):
+            self.assertEqual(key_pool.take_key(123), 'guild key')
+            self.assertTrue(key_pool.is_guild_key('guild key'))
+            self.assertFalse(key_pool.is_guild_key('key a'))
+
+        with self.subTest('Exhausted keys skipped'):
+            self.assertFalse(key_pool.is_available('key a'))
+            self.assertFalse(key_pool.is_available('key b'))
+
+            self.assertEqual(key_pool.take_key(123), 'guild key')
+            self.assertEqual(key_pool.take_key(123), 'key a') # Guild's out too, so falls back to whatever frees up first
+
+        mock_monotonic.return_value = QUOTA_WINDOW
+
+        with self.subTest('Quota frees up'):
+            self.assertTrue(key_pool.is_available('key a'))
+
+        key_pool.record_rate_limited('key a', retry_after=10)
+
+        with self.subTest('Rate limited keys rest'):
+            self.assertFalse(key_pool.is_available('key a'))
+            self.assertEqual(key_pool.select_key(), 'key b')
+
+        mock_monotonic.return_value = QUOTA_WINDOW + 10
+
+        with self.subTest('And come back'):
+            self.assertTrue(key_pool.is_available('key a'))
+
+    def test_configure_key_pool(self):
+        configure_key_pool(SheetsKeyPool(['key a', 'key b', 'key c']))
+
+        with self.subTest('Scheduler sized to every key'):
+            self.assertEqual(get_scheduler().buckets[0].capacity, 3 * QUOTAS['read_requests_per_minute'])
+
+        with self.subTest('Guild keys used'):
+            get_key_pool().set_guild_key(123, 'guild key')
+
+            with sheets_guild(123):
+                self.assertEqual(get_key(), 'guild key')
+
+            self.assertNotEqual(get_key(), 'guild key')
+
+    @mock.patch('src.utils.google_sheets.get_session', autospec=True)
+    def test_rate_limited_key_rotated(self, mock_get_session: mock.Mock):
+        configure_key_pool(SheetsKeyPool(['key-a', 'key-b']))
+
+        rate_limited_response = mock.Mock(status_code=429, headers={'Retry-After': '60'})
+        rate_limited_response.json.return_value = {'error': {'status': 'RESOURCE_EXHAUSTED'}}
+
+        ok_response = mock.Mock(status_code=200, headers={})
+        ok_response.json.return_value = {'sheets': [{'properties': {'sheetId': 1, 'title': 'abc'}}]}
+
+        def get(url: str, ** kwargs):
+            return rate_limited_response if 'key=key-a' in url else ok_response
+
+        mock_get_session.return_value.get.side_effect = get
+
+        with self.subTest('Retried straight away on another key'):
+            self.assertEqual(get_spreadsheet_metadata('spreadsheet id'), {1: 'abc'})
+
+        with self.subTest('Other calls kept off the rate limited key'):
+            mock_get_session.return_value.get.reset_mock()
+
+            get_spreadsheet_metadata('spreadsheet id')
+
+            self.assertIn('key=key-b', mock_get_session.return_value.get.call_args.args[0])
+
+        with self.subTest('Scheduler not drained while a key has quota'):
+            self.assertEqual(get_scheduler().get_stats()['rate_limited'], 0)
+
+    def setUp(self) -> None:
+        logging.disable(logging.ERROR)
+
+    def tearDown(self) -> None:
+        get_key_pool.pool = None
+
+        if hasattr(get_scheduler, 'scheduler'):
+            del get_scheduler.scheduler
+
+        logging.disable(logging.NOTSET)
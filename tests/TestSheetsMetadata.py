@@ -0,0 +1,153 @@
+import unittest
+from unittest import mock
+
+import asyncio
+import logging
+import os
+import tempfile
+import threading
+
+from src.utils.sheets_metadata import SpreadsheetMetadataStore, get_metadata_store
+from src.utils.google_sheets import get_sheet_name_from_gid, get_sheet_name_from_gid_async, get_known_spreadsheet_metadata
+
+class TestSheetsMetadata(unittest.TestCase):
+
+    def test_persisted(self):
+        filepath = os.path.join(self.temp_dir.name, 'cache', 'spreadsheet_metadata.json')
+
+        store = SpreadsheetMetadataStore(filepath=filepath)
+        store.set('spreadsheet 1', {0: 'Sheet 0', 123: 'Sheet 123'})
+
+        with self.subTest('Written to disk'):
+            self.assertTrue(os.path.exists(filepath))
+
+        restarted_store = SpreadsheetMetadataStore(filepath=filepath)
+
+        with self.subTest('Loaded on restart with integer GIDs'):
+            self.assertEqual(restarted_store.get('spreadsheet 1'), {0: 'Sheet 0', 123: 'Sheet 123'})
+
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write('{not json')
+
+        with self.subTest('Unreadable file ignored'):
+            self.assertIsNone(SpreadsheetMetadataStore(filepath=filepath).get('spreadsheet 1'))
+
+    def test_set_async(self):
+        filepath = os.path.join(self.temp_dir.name, 'cache', 'spreadsheet_metadata.json')
+
+        store = SpreadsheetMetadataStore(filepath=filepath)
+
+        save_threads = []
+
+        def save():
+            save_threads.append(threading.get_ident())
+
+            SpreadsheetMetadataStore.save(store)
+
+        with mock.patch.object(store, 'save', side_effect=save):
+            self.loop.run_until_complete(store.set_async('spreadsheet 1', {0: 'Sheet 0'}))
+
+        with self.subTest('Written off the event loop'):
+            self.assertEqual(len(save_threads), 1)
+            self.assertNotEqual(save_threads[0], threading.get_ident())
+
+        with self.subTest('Written to disk'):
+            self.assertEqual(SpreadsheetMetadataStore(filepath=filepath).get('spreadsheet 1'), {0: 'Sheet 0'})
+
+    def test_invalidate(self):
+        store = SpreadsheetMetadataStore(filepath=None)
+
+        store.set('spreadsheet 1', {0: 'Sheet 0'})
+        store.set('spreadsheet 2', {0: 'Other Sheet 0'})
+
+        store.invalidate('spreadsheet 1')
+
+        with self.subTest('Invalidated spreadsheet dropped'):
+            self.assertIsNone(store.get('spreadsheet 1'))
+
+        with self.subTest('Others kept'):
+            self.assertEqual(store.get('spreadsheet 2'), {0: 'Other Sheet 0'})
+
+    @mock.patch('src.utils.sheets_metadata.time.time')
+    def test_stale(self, mock_time: mock.Mock):
+        mock_time.return_value = 0
+
+        store = SpreadsheetMetadataStore(filepath=None, max_age=60)
+        store.set('spreadsheet 1', {0: 'Sheet 0'})
+
+        mock_time.return_value = 30
+
+        with self.subTest('Fresh'):
+            self.assertEqual(store.get('spreadsheet 1'), {0: 'Sheet 0'})
+
+        mock_time.return_value = 61
+
+        with self.subTest('Stale'):
+            self.assertIsNone(store.get('spreadsheet 1'))
+
+    @mock.patch('src.utils.google_sheets.get_spreadsheet_metadata', autospec=True)
+    def test_get_known_spreadsheet_metadata(self, mock_metadata: mock.Mock):
+        mock_metadata.side_effect = lambda spreadsheet_id: {0: f'{spreadsheet_id} Sheet 0'}
+
+        get_known_spreadsheet_metadata('spreadsheet 1')
+        get_known_spreadsheet_metadata('spreadsheet 2')
+        get_known_spreadsheet_metadata('spreadsheet 1')
+
+        with self.subTest('Fetched once per spreadsheet'):
+            self.assertEqual(mock_metadata.call_count, 2)
+
+        mock_metadata.side_effect = None
+        mock_metadata.return_value = {0: 'Renamed Sheet 0'}
+
+        with self.subTest('Forced revalidation'):
+            self.assertEqual(get_known_spreadsheet_metadata('spreadsheet 1', force=True), {0: 'Renamed Sheet 0'})
+
+        with self.subTest('Only that spreadsheet refetched'):
+            self.assertEqual(get_known_spreadsheet_metadata('spreadsheet 2'), {0: 'spreadsheet 2 Sheet 0'})
+            self.assertEqual(mock_metadata.call_count, 3)
+
+    @mock.patch('src.utils.google_sheets.get_spreadsheet_metadata', autospec=True)
+    def test_new_tab_revalidates(self, mock_metadata: mock.Mock):
+        mock_metadata.return_value = {0: 'Sheet 0'}
+
+        get_sheet_name_from_gid('spreadsheet 1', 0)
+
+        mock_metadata.return_value = {0: 'Sheet 0', 456: 'New Sheet'}
+
+        with self.subTest('Unknown GID refetches'):
+            self.assertEqual(get_sheet_name_from_gid('spreadsheet 1', 456), 'New Sheet')
+            self.assertEqual(mock_metadata.call_count, 2)
+
+        with self.subTest('Still unknown after refetching'):
+            self.assertRaises(IndexError, get_sheet_name_from_gid, 'spreadsheet 1', 789)
+
+    @mock.patch('src.utils.google_sheets.get_spreadsheet_metadata_async', autospec=True)
+    def test_get_sheet_name_from_gid_async(self, mock_metadata: mock.Mock):
+        mock_metadata.return_value = {0: 'Sheet 0'}
+
+        with self.subTest('Fetched'):
+            self.assertEqual(self.loop.run_until_complete(get_sheet_name_from_gid_async('spreadsheet 1', 0)), 'Sheet 0')
+
+        mock_metadata.return_value = {0: 'Renamed Sheet 0'}
+
+        with self.subTest('Stored'):
+            self.assertEqual(self.loop.run_until_complete(get_sheet_name_from_gid_async('spreadsheet 1', 0)), 'Sheet 0')
+
+        with self.subTest('Forced'):
+            self.assertEqual(self.loop.run_until_complete(get_sheet_name_from_gid_async('spreadsheet 1', 0, force=True)), 'Renamed Sheet 0')
+
+    def setUp(self) -> None:
+        logging.disable(logging.ERROR)
+
+        self.loop = asyncio.new_event_loop()
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+        get_metadata_store.store = SpreadsheetMetadataStore(filepath=None)
+
+    def tearDown(self) -> None:
+        del get_metadata_store.store
+
+        self.temp_dir.cleanup()
+        self.loop.close()
+
+        logging.disable(logging.NOTSET)
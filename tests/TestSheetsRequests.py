@@ -0,0 +1,147 @@
+import unittest
+from unittest import mock
+
+import asyncio
+import logging
+import urllib.parse
+
+from src.utils.sheets_requests import encode_range, build_values_requests, measure_values_request, merge_values_responses, SHEETS_API_URL, ValueRenderOption
+from src.utils.google_sheets import get_from_spreadsheet_api, _fetch_from_spreadsheet_api_async
+
+def mock_values_response(url: str, spreadsheet_id: str):
+    """
+    Echoes back each requested range as its value.
+    """
+
+    query = urllib.parse.parse_qs(urllib.parse.urlparse(url).query)
+
+    return {
+        'valueRanges': [{'values': [[requested_range]]} for requested_range in query['ranges']]
+    }
+
+class TestSheetsRequests(unittest.TestCase):
+
+    def test_encode_range(self):
+        for sheet_name, expected in [
+            ('Example Character Sheet', 'Example%20Character%20Sheet!A1'),
+            ('Cause / Factions', 'Cause%20%2F%20Factions!A1'),
+            ('Rock & Roll', 'Rock%20%26%20Roll!A1'),
+            ('#1 Fan', '%231%20Fan!A1'),
+            ('100% Real', '100%25%20Real!A1'),
+            ('A+', 'A%2B!A1'),
+            ('Why?', 'Why%3F!A1'),
+        ]:
+            with self.subTest(sheet_name=sheet_name):
+                self.assertEqual(encode_range(sheet_name, 'A1'), expected)
+
+    def test_build_values_requests(self):
+        with self.subTest('Single range'):
+            values_requests = build_values_requests('spreadsheet id', 'key', [('Rock & Roll', 'A1:B2')])
+
+            self.assertEqual(values_requests[0].url, f'{SHEETS_API_URL}/spreadsheet id/values/Rock%20%26%20Roll!A1:B2?key=key&majorDimension=ROWS&valueRenderOption=FORMATTED_VALUE&fields=values')
+
+        keys = [(f'Sheet {sheet_number}', 'B4') for sheet_number in range(250)]
+
+        with self.subTest('Chunked by range count'):
+            values_requests = build_values_requests('spreadsheet id', 'key', keys, max_ranges=100, max_url_length=100000)
+
+            self.assertEqual([len(values_request.keys) for values_request in values_requests], [100, 100, 50])
+
+        with self.subTest('Chunked by URL length'):
+            values_requests = build_values_requests('spreadsheet id', 'key', keys, max_ranges=1000, max_url_length=2000)
+
+            self.assertGreater(len(values_requests), 1)
+
+            for values_request in values_requests:
+                self.assertLessEqual(len(values_request.url), 2000)
+
+            self.assertEqual([key for values_request in values_requests for key in values_request.keys], keys)
+
+        with self.subTest('Measured the same as built'):
+            self.assertEqual(measure_values_request('spreadsheet id', 'key', keys[:2]), len(build_values_requests('spreadsheet id', 'key', keys[:2])[0].url))
+
+        with self.subTest('Nothing to request'):
+            self.assertRaises(ValueError, build_values_requests, 'spreadsheet id', 'key', [])
+
+    def test_parse_response(self):
+        values_request = build_values_requests('spreadsheet id', 'key', [('Rock & Roll', 'A1'), ('Rock & Roll', 'A2:B3'), ('Sheet!', 'C4')])[0]
+
+        response_data = values_request.parse_response({
+            'valueRanges': [{'values': [['a']]}, {'values': [['b', 'c']]}, {}]
+        })
+
+        self.assertEqual(response_data, {
+            'Rock & Roll': {'A1': 'a', 'A2:B3': [['b', 'c']]},
+            'Sheet!': {'C4': None},
+        })
+
+    def test_parse_typed_response(self):
+        values_request = build_values_requests(
+            'spreadsheet id', 'key', [('Sheet', 'A1'), ('Sheet', 'A2:D2'), ('Sheet', 'A3')], value_render_option=ValueRenderOption.UNFORMATTED_VALUE
+        )[0]
+
+        with self.subTest('Typed query'):
+            self.assertIn('valueRenderOption=UNFORMATTED_VALUE&dateTimeRenderOption=FORMATTED_STRING&fields=valueRanges(values)', values_request.url)
+
+        response_data = values_request.parse_response({
+            'valueRanges': [{'values': [[True]]}, {'values': [[4.0, '', 'Fix', 1.5]]}, {'values': [[-1]]}]
+        })
+
+        with self.subTest('Typed values'):
+            self.assertEqual(response_data, {
+                'Sheet': {'A1': True, 'A2:D2': [[4, None, 'Fix', 1.5]], 'A3': -1},
+            })
+
+            self.assertIsInstance(response_data['Sheet']['A2:D2'][0][0], int)
+
+    def test_merge_values_responses(self):
+        self.assertEqual(
+            merge_values_responses([{'a': {'A1': 1}}, {'a': {'A2': 2}, 'b': {'A1': 3}}]),
+            {'a': {'A1': 1, 'A2': 2}, 'b': {'A1': 3}}
+        )
+
+    @mock.patch('src.utils.google_sheets._request_json', autospec=True)
+    @mock.patch('src.utils.google_sheets.get_key', autospec=True)
+    def test_get_from_spreadsheet_api_chunked(self, mock_get_key: mock.Mock, mock_request_json: mock.Mock):
+        mock_get_key.return_value = 'key'
+        mock_request_json.side_effect = mock_values_response
+
+        sheet_names = [f'Sheet & {sheet_number}' for sheet_number in range(120)]
+
+        response_data = get_from_spreadsheet_api('spreadsheet id', {sheet_name: ['B4', 'D3'] for sheet_name in sheet_names})
+
+        with self.subTest('Split into chunks'):
+            self.assertEqual(mock_request_json.call_count, 3)
+
+        with self.subTest('Merged back together'):
+            self.assertEqual(response_data['Sheet & 119'], {'B4': 'Sheet & 119!B4', 'D3': 'Sheet & 119!D3'})
+            self.assertEqual(len(response_data), 120)
+
+    @mock.patch('src.utils.google_sheets._request_json_async', autospec=True)
+    @mock.patch('src.utils.google_sheets.get_key', autospec=True)
+    def test_fetch_from_spreadsheet_api_async_chunked(self, mock_get_key: mock.Mock, mock_request_json_async: mock.Mock):
+        mock_get_key.return_value = 'key'
+        mock_request_json_async.side_effect = mock_values_response
+
+        sheet_names = [f'Sheet #{sheet_number}' for sheet_number in range(120)]
+
+        response_data = self.loop.run_until_complete(
+            _fetch_from_spreadsheet_api_async('spreadsheet id', {sheet_name: ['B4', 'D3'] for sheet_name in sheet_names})
+        )
+
+        with self.subTest('Split into chunks'):
+            self.assertEqual(mock_request_json_async.call_count, 3)
+
+        with self.subTest('Merged back together'):
+            self.assertEqual(response_data['Sheet #0'], {'B4': 'Sheet #0!B4', 'D3': 'Sheet #0!D3'})
+            self.assertEqual(len(response_data), 120)
+
+    def setUp(self) -> None:
+        logging.disable(logging.ERROR)
+
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self) -> None:
+        self.loop.close()
+
+        logging.disable(logging.NOTSET)
@@ -0,0 +1,119 @@
+import unittest
+from unittest import mock
+
+import datetime
+import email.utils
+import logging
+
+import requests
+
+from src.utils.sheets_retry import (
+    RetryPolicy, RETRY_POLICIES, parse_retry_after, classify_error, compute_delay, get_retry_delay, track_command_retries,
+    get_retry_metrics, current_command_retries
+)
+from src.utils.deadline import command_deadline
+from src.utils.sheets_scheduler import SheetsScheduler, TokenBucket, get_scheduler
+from src.utils.google_sheets import get_spreadsheet_metadata
+from src.utils.exceptions import TooManyRequestsError, ForbiddenSpreadsheetError
+
+class TestSheetsRetry(unittest.TestCase):
+
+    def test_parse_retry_after(self):
+        with self.subTest('Seconds'):
+            self.assertEqual(parse_retry_after('7'), 7)
+
+        with self.subTest('HTTP date'):
+            retry_at = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=30)
+
+            self.assertAlmostEqual(parse_retry_after(email.utils.format_datetime(retry_at, usegmt=True)), 30, delta=2)
+
+        with self.subTest('Missing'):
+            self.assertIsNone(parse_retry_after(None))
+
+        with self.subTest('Garbage'):
+            self.assertIsNone(parse_retry_after('soon'))
+
+    def test_classify_error(self):
+        server_error_response = requests.Response()
+        server_error_response.status_code = 503
+
+        not_found_response = requests.Response()
+        not_found_response.status_code = 404
+
+        for error, expected_class in [
+            (TooManyRequestsError(), 'rate_limited'),
+            (requests.HTTPError(response=server_error_response), 'server_error'),
+            (requests.ConnectionError(), 'connection_error'),
+            (requests.Timeout(), 'connection_error'),
+            (requests.HTTPError(response=not_found_response), None),
+            (ForbiddenSpreadsheetError(spreadsheet_id='123'), None),
+            (ValueError(), None),
+        ]:
+            with self.subTest(error=repr(error)):
+                self.assertEqual(classify_error(error), expected_class)
+
+    def test_compute_delay(self):
+        policy = RetryPolicy(max_retries=5, base_delay=1, max_delay=4)
+
+        with self.subTest('Full jitter within the exponential bound'):
+            for retry_number, bound in [(0, 1), (1, 2), (2, 4), (3, 4), (10, 4)]:
+                for _ in range(20):
+                    delay = compute_delay(policy, retry_number)
+
+                    self.assertTrue(0 <= delay <= bound)
+
+        with self.subTest('Retry-After wins'):
+            self.assertEqual(compute_delay(policy, 0, retry_after=3), 3)
+
+    @mock.patch.dict(RETRY_POLICIES, {'rate_limited': RetryPolicy(max_retries=2, base_delay=0.1, max_delay=0.1)})
+    def test_get_retry_delay(self):
+        with self.subTest('Not retryable'):
+            self.assertIsNone(get_retry_delay(ValueError(), 0))
+
+        with self.subTest('Retryable'):
+            self.assertIsNotNone(get_retry_delay(TooManyRequestsError(), 0))
+
+        with self.subTest('Out of retries'):
+            self.assertIsNone(get_retry_delay(TooManyRequestsError(), 2))
+
+        with self.subTest('Would miss the deadline'):
+            with command_deadline(1):
+                self.assertIsNone(get_retry_delay(TooManyRequestsError(retry_after=5), 0))
+                self.assertEqual(get_retry_delay(TooManyRequestsError(retry_after=0.1), 0), 0.1)
+
+    @mock.patch.dict(RETRY_POLICIES, {'connection_error': RetryPolicy(max_retries=2, base_delay=0, max_delay=0)})
+    @mock.patch('src.utils.google_sheets.get_session', autospec=True)
+    @mock.patch('src.utils.google_sheets.get_key', autospec=True)
+    def test_retried_per_command(self, mock_get_key: mock.Mock, mock_get_session: mock.Mock):
+        mock_get_key.return_value = '123'
+
+        ok_response = mock.Mock(status_code=200)
+        ok_response.json.return_value = {'sheets': [{'properties': {'sheetId': 1, 'title': 'abc'}}]}
+
+        mock_get_session.return_value.get.side_effect = [requests.ConnectionError(), requests.ConnectionError(), ok_response]
+
+        with track_command_retries('test_command') as command_retries:
+            metadata = get_spreadsheet_metadata('spreadsheet id')
+
+        with self.subTest('Succeeds after transient errors'):
+            self.assertEqual(metadata, {1: 'abc'})
+
+        with self.subTest('Retries recorded for the command'):
+            self.assertEqual(command_retries.retries, 2)
+            self.assertEqual(get_retry_metrics()['test_command']['retries'], 2)
+            self.assertEqual(get_retry_metrics()['test_command']['calls'], 1)
+
+        with self.subTest('Context cleared afterwards'):
+            self.assertIsNone(current_command_retries.get())
+
+    def setUp(self) -> None:
+        logging.disable(logging.ERROR)
+
+        get_retry_metrics.metrics = {}
+        get_scheduler.scheduler = SheetsScheduler([TokenBucket(capacity=100, refill_per_second=100)])
+
+    def tearDown(self) -> None:
+        get_retry_metrics.metrics = {}
+        del get_scheduler.scheduler
+
+        logging.disable(logging.NOTSET)
@@ -0,0 +1,146 @@
+import unittest
+from unittest import mock
+
+import asyncio
+import logging
+
+from src.utils.sheets_scheduler import SheetsScheduler, TokenBucket, Priority, sheets_priority, sheets_priority_lane, get_scheduler
+from src.utils.google_sheets import get_spreadsheet_metadata
+from src.utils.exceptions import TooManyRequestsError
+from src.utils.sheets_retry import RETRY_POLICIES, RetryPolicy
+
+class TestSheetsScheduler(unittest.TestCase):
+
+    @mock.patch('src.utils.sheets_scheduler.time.monotonic')
+    def test_token_bucket(self, mock_monotonic: mock.Mock):
+        mock_monotonic.return_value = 0
+
+        bucket = TokenBucket(capacity=2, refill_per_second=1)
+
+        with self.subTest('Starts full'):
+            self.assertEqual(bucket.time_until(2), 0)
+
+        bucket.take()
+        bucket.take()
+
+        with self.subTest('Empty'):
+            self.assertEqual(bucket.time_until(1), 1)
+
+        mock_monotonic.return_value = 0.5
+
+        with self.subTest('Refills over time'):
+            self.assertAlmostEqual(bucket.time_until(1), 0.5)
+
+        mock_monotonic.return_value = 100
+
+        with self.subTest('Capped at capacity'):
+            self.assertEqual(bucket.time_until(2), 0)
+            self.assertGreater(bucket.time_until(3), 0)
+
+        bucket.drain()
+
+        with self.subTest('Drained'):
+            self.assertEqual(bucket.time_until(1), 1)
+
+    def test_acquire_queues(self):
+        scheduler = SheetsScheduler([TokenBucket(capacity=1, refill_per_second=20)], low_priority_reserve=0)
+
+        async def run():
+            await asyncio.gather(*[scheduler.acquire_async() for _ in range(3)])
+
+        self.loop.run_until_complete(run())
+
+        stats = scheduler.get_stats()
+
+        with self.subTest('All granted'):
+            self.assertEqual(stats['HIGH']['granted'], 3)
+
+        with self.subTest('Some queued'):
+            self.assertGreaterEqual(stats['HIGH']['queued'], 2)
+            self.assertGreater(stats['HIGH']['max_wait'], 0)
+
+        with self.subTest('Nothing left waiting'):
+            self.assertEqual(stats['HIGH']['queue_depth'], 0)
+
+    def test_priority_lanes(self):
+        scheduler = SheetsScheduler([TokenBucket(capacity=10, refill_per_second=50)], low_priority_reserve=0.5)
+
+        order = []
+
+        async def acquire(priority: Priority, label: str):
+            await scheduler.acquire_async(priority)
+
+            order.append(label)
+
+        async def run():
+            for _ in range(5):
+                await scheduler.acquire_async(Priority.HIGH)
+
+            # Half the bucket is left, which is all reserved for interactive calls
+            await asyncio.gather(
+                acquire(Priority.LOW, 'low'),
+                acquire(Priority.HIGH, 'high'),
+            )
+
+        self.loop.run_until_complete(run())
+
+        with self.subTest('High priority served first'):
+            self.assertEqual(order, ['high', 'low'])
+
+        with self.subTest('Low priority waited'):
+            self.assertGreater(scheduler.get_stats()['LOW']['max_wait'], 0)
+
+    def test_sheets_priority_lane(self):
+        with self.subTest('Defaults to high'):
+            self.assertEqual(sheets_priority.get(), Priority.HIGH)
+
+        with sheets_priority_lane(Priority.LOW):
+            with self.subTest('Set inside the block'):
+                self.assertEqual(sheets_priority.get(), Priority.LOW)
+
+            with self.subTest('Carried into threads'):
+                self.assertEqual(self.loop.run_until_complete(asyncio.to_thread(sheets_priority.get)), Priority.LOW)
+
+        with self.subTest('Reset afterwards'):
+            self.assertEqual(sheets_priority.get(), Priority.HIGH)
+
+    @mock.patch.dict(RETRY_POLICIES, {'rate_limited': RetryPolicy(max_retries=2, base_delay=0, max_delay=0)})
+    @mock.patch('src.utils.google_sheets.get_session', autospec=True)
+    @mock.patch('src.utils.google_sheets.get_key', autospec=True)
+    def test_rate_limited_requeued(self, mock_get_key: mock.Mock, mock_get_session: mock.Mock):
+        mock_get_key.return_value = '123'
+
+        rate_limited_response = mock.Mock(status_code=429, headers={})
+        rate_limited_response.json.return_value = {'error': {'status': 'RESOURCE_EXHAUSTED'}}
+
+        ok_response = mock.Mock(status_code=200)
+        ok_response.json.return_value = {'sheets': [{'properties': {'sheetId': 1, 'title': 'abc'}}]}
+
+        mock_get_session.return_value.get.side_effect = [rate_limited_response, ok_response]
+
+        get_scheduler.scheduler = SheetsScheduler([TokenBucket(capacity=10, refill_per_second=100)])
+
+        with self.subTest('Retried after a 429'):
+            self.assertEqual(get_spreadsheet_metadata('spreadsheet id'), {1: 'abc'})
+
+        with self.subTest('429 recorded'):
+            self.assertEqual(get_scheduler().get_stats()['rate_limited'], 1)
+
+        mock_get_session.return_value.get.side_effect = None
+        mock_get_session.return_value.get.return_value = rate_limited_response
+
+        with self.subTest('Gives up eventually'):
+            self.assertRaises(TooManyRequestsError, get_spreadsheet_metadata, 'spreadsheet id')
+
+    def setUp(self) -> None:
+        logging.disable(logging.ERROR)
+
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self) -> None:
+        if hasattr(get_scheduler, 'scheduler'):
+            del get_scheduler.scheduler
+
+        self.loop.close()
+
+        logging.disable(logging.NOTSET)
@@ -0,0 +1,88 @@
+import unittest
+import asyncio
+import logging
+
+import requests
+
+from src.utils.sheets_session import (
+    get_session, get_async_session, close_sessions, configure_sessions, get_pool_stats, get_timeout, SESSION_CONFIG,
+    SHEETS_HEADERS
+)
+
+class TestSheetsSession(unittest.TestCase):
+
+    def test_get_session(self):
+        session = get_session()
+
+        with self.subTest('Returns a requests Session'):
+            self.assertIsInstance(session, requests.Session)
+
+        with self.subTest('Session is shared'):
+            self.assertIs(session, get_session())
+
+        with self.subTest('Asks for gzip'):
+            self.assertEqual(session.headers['Accept-Encoding'], SHEETS_HEADERS['Accept-Encoding'])
+
+    def test_get_async_session(self):
+        async def get_twice():
+            first = get_async_session()
+            second = get_async_session()
+
+            return first, second
+
+        first, second = self.loop.run_until_complete(get_twice())
+
+        with self.subTest('Session is shared within a loop'):
+            self.assertIs(first, second)
+
+        other_loop = asyncio.new_event_loop()
+
+        try:
+            other, _ = other_loop.run_until_complete(get_twice())
+
+            with self.subTest('New loop gets a new session'):
+                self.assertIsNot(first, other)
+
+            other_loop.run_until_complete(close_sessions())
+        finally:
+            other_loop.close()
+
+    def test_configure_sessions(self):
+        original_config = dict(SESSION_CONFIG)
+
+        try:
+            session = get_session()
+
+            configure_sessions(connect_timeout=1, read_timeout=2)
+
+            with self.subTest('Timeouts updated'):
+                self.assertEqual(get_timeout(), (1, 2))
+
+            with self.subTest('Session replaced'):
+                self.assertIsNot(session, get_session())
+
+            with self.subTest('Unknown keys rejected'):
+                self.assertRaises(ValueError, configure_sessions, not_a_setting=1)
+        finally:
+            configure_sessions(**original_config)
+
+    def test_get_pool_stats(self):
+        stats = get_pool_stats()
+
+        for key in ['requests', 'connections_created', 'connections_reused', 'reuse_rate', 'open_connections']:
+            with self.subTest(key=key):
+                self.assertIn(key, stats)
+
+        with self.subTest('Reuse rate in range'):
+            self.assertTrue(0 <= stats['reuse_rate'] <= 1)
+
+    def setUp(self) -> None:
+        logging.disable(logging.ERROR)
+
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self) -> None:
+        self.loop.run_until_complete(close_sessions())
+        self.loop.close()
+
+        logging.disable(logging.NOTSET)
@@ -0,0 +1,222 @@
+import unittest
+from unittest import mock
+
+import asyncio
+import logging
+
+from src.utils.single_flight import SingleFlight
+from src.utils.google_sheets import get_from_spreadsheet_api_async, get_single_flight
+from src.utils.deadline import command_deadline, get_remaining_time
+from src.utils.sheets_budget import track_command_usage, charge_call, current_command_usage
+from src.utils.sheets_keys import sheets_guild, current_guild_id
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_get_many_coalesces(self):
+        single_flight = SingleFlight()
+
+        fetched_keys = []
+
+        async def fetch(keys):
+            fetched_keys.append(list(keys))
+
+            await asyncio.sleep(0.01)
+
+            return {key: key.lower() for key in keys}
+
+        async def run():
+            return await asyncio.gather(
+                single_flight.get_many(['A', 'B'], fetch),
+                single_flight.get_many(['B', 'C'], fetch),
+                single_flight.get_many(['A', 'B'], fetch),
+            )
+
+        first, second, third = self.loop.run_until_complete(run())
+
+        with self.subTest('Overlapping keys only fetched once'):
+            self.assertEqual(fetched_keys, [['A', 'B'], ['C']])
+
+        with self.subTest('Results fanned out'):
+            self.assertEqual(first, {'A': 'a', 'B': 'b'})
+            self.assertEqual(second, {'B': 'b', 'C': 'c'})
+            self.assertEqual(third, {'A': 'a', 'B': 'b'})
+
+        with self.subTest('Stats'):
+            stats = single_flight.get_stats()
+
+            self.assertEqual(stats['requests'], 3)
+            self.assertEqual(stats['hits'], 1)
+            self.assertEqual(stats['keys_requested'], 6)
+            self.assertEqual(stats['keys_merged'], 3)
+            self.assertEqual(stats['fetches'], 2)
+            self.assertEqual(stats['in_flight'], 0)
+
+    def test_get_many_sequential_not_coalesced(self):
+        single_flight = SingleFlight()
+
+        fetch = mock.AsyncMock(return_value={'A': 1})
+
+        self.loop.run_until_complete(single_flight.get_many(['A'], fetch))
+        self.loop.run_until_complete(single_flight.get_many(['A'], fetch))
+
+        self.assertEqual(fetch.await_count, 2)
+
+    def test_get_many_error(self):
+        single_flight = SingleFlight()
+
+        async def fetch(keys):
+            await asyncio.sleep(0.01)
+
+            raise ValueError('Mock error')
+
+        async def run():
+            return await asyncio.gather(
+                single_flight.get_many(['A'], fetch),
+                single_flight.get_many(['A'], fetch),
+                return_exceptions=True
+            )
+
+        results = self.loop.run_until_complete(run())
+
+        with self.subTest('Error shared with every waiter'):
+            for result in results:
+                self.assertIsInstance(result, ValueError)
+
+        with self.subTest('Nothing left in flight'):
+            self.assertEqual(len(single_flight.in_flight), 0)
+
+    def test_get_many_owner_cancelled(self):
+        single_flight = SingleFlight()
+
+        fetched_keys = []
+
+        async def fetch(keys):
+            fetched_keys.append(list(keys))
+
+            await asyncio.sleep(0.01)
+
+            return {key: key.lower() for key in keys}
+
+        async def run():
+            owner = asyncio.create_task(single_flight.get_many(['A', 'B'], fetch))
+            await asyncio.sleep(0)
+
+            waiters = [asyncio.create_task(single_flight.get_many(['A'], fetch)) for _ in range(2)]
+            await asyncio.sleep(0)
+
+            owner.cancel()
+
+            return await asyncio.gather(owner, *waiters, return_exceptions=True)
+
+        owner_result, *waiter_results = self.loop.run_until_complete(run())
+
+        with self.subTest('Owner cancelled'):
+            self.assertIsInstance(owner_result, asyncio.CancelledError)
+
+        with self.subTest('Waiters fetch it themselves'):
+            self.assertEqual(waiter_results, [{'A': 'a'}, {'A': 'a'}])
+
+        with self.subTest('Only fetched again once'):
+            self.assertEqual(fetched_keys, [['A', 'B'], ['A']])
+
+        with self.subTest('Nothing left in flight'):
+            self.assertEqual(len(single_flight.in_flight), 0)
+
+    @mock.patch('src.utils.google_sheets._fetch_from_spreadsheet_api_async')
+    def test_get_from_spreadsheet_api_async_coalesced(self, mock_fetch: mock.AsyncMock):
+        spreadsheet_id = '1saogmy4eNNKng32Pf39b7K3Ko4uHEuWClm7UM-7Kd8I'
+        sheet_name = 'Example Character Sheet'
+
+        async def fetch(spreadsheet_id, raw_sheet_name_data, **fetch_kwargs):
+            await asyncio.sleep(0.01)
+
+            return {
+                sheet_name: {range_or_cell: f'{range_or_cell} value' for range_or_cell in ranges_or_cells}
+                    for sheet_name, ranges_or_cells in raw_sheet_name_data.items()
+            }
+
+        mock_fetch.side_effect = fetch
+
+        async def run():
+            return await asyncio.gather(*[
+                get_from_spreadsheet_api_async(spreadsheet_id=spreadsheet_id, raw_sheet_name_data={sheet_name: ['H11', 'J11']})
+                    for _ in range(4)
+            ])
+
+        results = self.loop.run_until_complete(run())
+
+        with self.subTest('One HTTP call for the party'):
+            self.assertEqual(mock_fetch.await_count, 1)
+
+        with self.subTest('Everyone gets the data'):
+            for result in results:
+                self.assertEqual(result[sheet_name], {'H11': 'H11 value', 'J11': 'J11 value'})
+
+    @mock.patch('src.utils.google_sheets._fetch_from_spreadsheet_api_async')
+    def test_get_from_spreadsheet_api_async_shared_context(self, mock_fetch: mock.AsyncMock):
+        spreadsheet_id = '1saogmy4eNNKng32Pf39b7K3Ko4uHEuWClm7UM-7Kd8I'
+        sheet_name = 'Example Character Sheet'
+
+        fetch_contexts = []
+
+        async def fetch(spreadsheet_id, raw_sheet_name_data, **fetch_kwargs):
+            fetch_contexts.append((get_remaining_time(), current_command_usage.get(), current_guild_id.get()))
+
+            charge_call()
+            charge_call() # As if it had to retry
+
+            await asyncio.sleep(0.01)
+
+            return {
+                sheet_name: {range_or_cell: f'{range_or_cell} value' for range_or_cell in ranges_or_cells}
+                    for sheet_name, ranges_or_cells in raw_sheet_name_data.items()
+            }
+
+        mock_fetch.side_effect = fetch
+
+        async def read(command_name: str, seconds: float, guild_id: int, budget: int):
+            with track_command_usage(command_name, budget=budget) as command_usage, command_deadline(seconds), sheets_guild(guild_id):
+                await get_from_spreadsheet_api_async(spreadsheet_id=spreadsheet_id, raw_sheet_name_data={sheet_name: ['H11', 'J11']})
+
+            return command_usage
+
+        async def run():
+            return await asyncio.gather(
+                read('owner_command', seconds=0.6, guild_id=1, budget=1),
+                read('joiner_command', seconds=5, guild_id=2, budget=8),
+            )
+
+        owner_usage, joiner_usage = self.loop.run_until_complete(run())
+
+        remaining_time, fetch_usage, fetch_guild_id = fetch_contexts[0]
+
+        with self.subTest('One HTTP call'):
+            self.assertEqual(mock_fetch.await_count, 1)
+
+        with self.subTest('Latest deadline of everyone waiting'):
+            self.assertGreater(remaining_time, 4)
+
+        with self.subTest('Most calls of everyone waiting'):
+            self.assertIsNot(fetch_usage, owner_usage)
+            self.assertEqual(fetch_usage.budget, 8)
+
+        with self.subTest('Only the owner\'s ranges on its guild\'s key'):
+            self.assertEqual(fetch_guild_id, 1)
+
+        with self.subTest('Each command charged for its own read'):
+            for command_usage in [owner_usage, joiner_usage]:
+                self.assertEqual(command_usage.calls, 2)
+                self.assertEqual(command_usage.ranges, 2)
+                self.assertEqual(command_usage.cells, 2)
+
+    def setUp(self) -> None:
+        logging.disable(logging.ERROR)
+
+        self.loop = asyncio.new_event_loop()
+
+        get_single_flight.single_flight = SingleFlight()
+
+    def tearDown(self) -> None:
+        self.loop.close()
+
+        logging.disable(logging.NOTSET)
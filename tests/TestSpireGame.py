@@ -1,6 +1,7 @@
 import unittest
 import unittest.mock
 
+import asyncio
 import requests
 import itertools
 import logging
@@ -165,7 +166,7 @@ class TestSpireGame(unittest.TestCase):
                 0
             )
 
-    @unittest.mock.patch('src.Game.get_spreadsheet_metadata')
+    @unittest.mock.patch('src.Game.get_known_spreadsheet_metadata')
     def test_from_data(self, mock_get_spreadsheet_metadata: unittest.mock.Mock):
         mock_get_spreadsheet_metadata.return_value = {
             0: 'Example Character Sheet'
@@ -251,12 +252,12 @@ class TestSpireGame(unittest.TestCase):
 
                                 roll_str = str({'expected_num_dice': expected_num_dice, 'difficulty': difficulty})
 
-                                highest, formatted_results, outcome, total, has_skill, has_domain, did_downgrade = self.spire_game.roll_check(
+                                highest, formatted_results, outcome, total, has_skill, has_domain, did_downgrade = self.loop.run_until_complete(self.spire_game.roll_check(
                                     self.DISCORD_USERNAME,
                                     skill,
                                     domain,
                                     roll
-                                )
+                                ))
 
                                 if difficulty < expected_num_dice:
                                     expected_downgrade = 0
@@ -378,7 +379,7 @@ class TestSpireGame(unittest.TestCase):
                         else:
                             mock_randint.return_value = character_stress + modifier + 1
 
-                        rolled, fallout_level_triggered, stress_removed, stress = self.spire_game.roll_fallout(self.DISCORD_USERNAME, resistance)
+                        rolled, fallout_level_triggered, stress_removed, stress = self.loop.run_until_complete(self.spire_game.roll_fallout(self.DISCORD_USERNAME, resistance))
 
                         with self.subTest(f'get_character used - {should_trigger, modifier, fallout_level}'):
                             mock_get_character.assert_called_with(self.DISCORD_USERNAME)
@@ -417,7 +418,7 @@ class TestSpireGame(unittest.TestCase):
                             )
 
     @unittest.mock.patch('src.vermissian.ResistanceCharacterSheet.SpireCharacter.initialise')
-    @unittest.mock.patch('src.Game.get_spreadsheet_metadata')
+    @unittest.mock.patch('src.Game.get_known_spreadsheet_metadata')
     def test_create_character(self, mock_get_spreadsheet_metadata: unittest.mock.Mock, mock_initialise: unittest.mock.Mock):
         mock_get_spreadsheet_metadata.return_value = {
             123: 'Example Character Sheet'
@@ -428,8 +429,8 @@ class TestSpireGame(unittest.TestCase):
         game = SpireGame.from_data(self.SPIRE_GAME_DATA)
         game.character_sheets = {}
 
-        with self.subTest('Metadata gotten'):
-            mock_get_spreadsheet_metadata.assert_called()
+        with self.subTest('Metadata not refetched for known characters'):
+            mock_get_spreadsheet_metadata.assert_not_called()
 
         character_data = self.SPIRE_GAME_DATA['characters'][self.DISCORD_USERNAME]
 
@@ -468,7 +469,7 @@ class TestSpireGame(unittest.TestCase):
 
         return all_rolled
 
-    @unittest.mock.patch('src.Game.get_spreadsheet_metadata')
+    @unittest.mock.patch('src.Game.get_known_spreadsheet_metadata')
     def setUp(self, mock_get_spreadsheet_metadata: unittest.mock.Mock) -> None:
         mock_get_spreadsheet_metadata.return_value = {
             123: 'Example Character Sheet'
@@ -478,7 +479,11 @@ class TestSpireGame(unittest.TestCase):
 
         logging.disable(logging.ERROR)
 
+        self.loop = asyncio.new_event_loop()
+
     def tearDown(self) -> None:
+        self.loop.close()
+
         logging.disable(logging.NOTSET)
 
     @classmethod
@@ -16,7 +16,7 @@ class TestVermissian(unittest.TestCase):
     # TODO These really should do mocks for adding/removing files
 
     @unittest.mock.patch('src.CharacterSheet.get_from_spreadsheet_api')
-    @unittest.mock.patch('src.Game.get_spreadsheet_metadata')
+    @unittest.mock.patch('src.Game.get_known_spreadsheet_metadata')
     def test_create_game(self, mock_get_spreadsheet_metadata: unittest.mock.Mock, mock_get_from_spreadsheet_api: unittest.mock.Mock):
         mock_get_spreadsheet_metadata.return_value = {
             123: 'Example Character Sheet'
@@ -179,8 +179,8 @@ class TestVermissian(unittest.TestCase):
             )
 
     @unittest.mock.patch('src.CharacterSheet.get_from_spreadsheet_api')
-    @unittest.mock.patch('src.vermissian.ResistanceCharacterSheet.get_from_spreadsheet_api')
-    @unittest.mock.patch('src.Game.get_spreadsheet_metadata')
+    @unittest.mock.patch('src.CharacterSheet.get_from_spreadsheet_api_async')
+    @unittest.mock.patch('src.Game.get_known_spreadsheet_metadata')
     def setUp(self, mock_get_spreadsheet_metadata: unittest.mock.Mock, mock_resistance_get_from_spreadsheet_api: unittest.mock.Mock, mock_get_from_spreadsheet_api: unittest.mock.Mock) -> None:
         logging.disable(logging.ERROR)
 